@@ -0,0 +1,14 @@
+-- upgrade --
+CREATE TABLE IF NOT EXISTS "columnusage" (
+    "id" SERIAL NOT NULL PRIMARY KEY,
+    "column_name" VARCHAR(500) NOT NULL,
+    "usage_type" VARCHAR(50) NOT NULL,
+    "count" INT NOT NULL  DEFAULT 0,
+    "total_time_in_ms" DOUBLE PRECISION NOT NULL  DEFAULT 0,
+    "last_used_time" TIMESTAMPTZ NOT NULL  DEFAULT CURRENT_TIMESTAMP,
+    "table_id" VARCHAR(50) NOT NULL REFERENCES "table" ("table_id") ON DELETE CASCADE,
+    CONSTRAINT "uid_columnusage_table_i_b6f00f" UNIQUE ("table_id", "column_name", "usage_type")
+);
+COMMENT ON TABLE "columnusage" IS 'Model for column_usage in database';
+-- downgrade --
+DROP TABLE IF EXISTS "columnusage";
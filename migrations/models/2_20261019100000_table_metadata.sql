@@ -0,0 +1,8 @@
+-- upgrade --
+ALTER TABLE "table" ADD "geometry_type" VARCHAR(50);
+ALTER TABLE "table" ADD "bounding_box" JSONB;
+ALTER TABLE "table" ADD "center" JSONB;
+-- downgrade --
+ALTER TABLE "table" DROP COLUMN "geometry_type";
+ALTER TABLE "table" DROP COLUMN "bounding_box";
+ALTER TABLE "table" DROP COLUMN "center";
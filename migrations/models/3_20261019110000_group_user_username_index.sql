@@ -0,0 +1,4 @@
+-- upgrade --
+CREATE INDEX IF NOT EXISTS "idx_groupuser_usernam_6539cf" ON "groupuser" ("username");
+-- downgrade --
+DROP INDEX IF EXISTS "idx_groupuser_usernam_6539cf";
@@ -0,0 +1,4 @@
+-- upgrade --
+CREATE INDEX IF NOT EXISTS "idx_itemreadacc_name_337eb2" ON "itemreadaccesslist" ("name");
+-- downgrade --
+DROP INDEX IF EXISTS "idx_itemreadacc_name_337eb2";
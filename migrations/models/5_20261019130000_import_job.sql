@@ -0,0 +1,20 @@
+-- upgrade --
+CREATE TABLE IF NOT EXISTS "importjob" (
+    "process_id" VARCHAR(50) NOT NULL  PRIMARY KEY,
+    "username" VARCHAR(500) NOT NULL,
+    "job_type" VARCHAR(100) NOT NULL,
+    "parameters" JSONB NOT NULL,
+    "status" VARCHAR(20) NOT NULL  DEFAULT 'PENDING',
+    "priority" INT NOT NULL  DEFAULT 0,
+    "attempts" INT NOT NULL  DEFAULT 0,
+    "max_attempts" INT NOT NULL  DEFAULT 1,
+    "result" JSONB NOT NULL,
+    "available_time" TIMESTAMPTZ NOT NULL  DEFAULT CURRENT_TIMESTAMP,
+    "created_time" TIMESTAMPTZ NOT NULL  DEFAULT CURRENT_TIMESTAMP,
+    "started_time" TIMESTAMPTZ,
+    "modified_time" TIMESTAMPTZ NOT NULL  DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS "idx_importjob_status_4f5470" ON "importjob" ("status");
+COMMENT ON TABLE "importjob" IS 'Model for import_job in database';
+-- downgrade --
+DROP TABLE IF EXISTS "importjob";
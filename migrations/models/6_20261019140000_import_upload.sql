@@ -0,0 +1,13 @@
+-- upgrade --
+CREATE TABLE IF NOT EXISTS "importupload" (
+    "upload_id" VARCHAR(50) NOT NULL  PRIMARY KEY,
+    "username" VARCHAR(500) NOT NULL,
+    "import_type" VARCHAR(100) NOT NULL,
+    "table_id" VARCHAR(50) NOT NULL,
+    "files" JSONB NOT NULL,
+    "created_time" TIMESTAMPTZ NOT NULL  DEFAULT CURRENT_TIMESTAMP,
+    "modified_time" TIMESTAMPTZ NOT NULL  DEFAULT CURRENT_TIMESTAMP
+);
+COMMENT ON TABLE "importupload" IS 'Model for import_upload in database';
+-- downgrade --
+DROP TABLE IF EXISTS "importupload";
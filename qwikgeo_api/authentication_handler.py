@@ -1,9 +1,13 @@
+import time
 from fastapi import Request, HTTPException
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from cachetools import LRUCache
 import jwt
 
 from qwikgeo_api import config
 
+verified_token_cache = LRUCache(maxsize=config.VERIFIED_TOKEN_CACHE_SIZE)
+
 class JWTBearer(HTTPBearer):
     def __init__(self, auto_error: bool = False):
         super(JWTBearer, self).__init__(auto_error=auto_error)
@@ -13,21 +17,21 @@ class JWTBearer(HTTPBearer):
         header_credentials: HTTPAuthorizationCredentials = await super(JWTBearer, self).__call__(request)
 
         if url_path_credentials:
-            if not self.verify_jwt(request.query_params['api_key']):
-                raise HTTPException(status_code=403, detail="Invalid token or expired token.")
-            user = jwt.decode(request.query_params['api_key'], config.SECRET_KEY, algorithms=["HS256"])
-            return user['username']
-        
-        if header_credentials:
+            token = request.query_params['api_key']
+        elif header_credentials:
             if not header_credentials.scheme == "Bearer":
                 raise HTTPException(status_code=403, detail="Invalid authentication scheme.")
-            if not self.verify_jwt(header_credentials.credentials):
-                raise HTTPException(status_code=403, detail="Invalid token or expired token.")
-            user = jwt.decode(header_credentials.credentials, config.SECRET_KEY, algorithms=["HS256"])
-            return user['username']
+            token = header_credentials.credentials
         else:
             raise HTTPException(status_code=403, detail="Invalid authorization code.")
 
+        user = self.decode_jwt(token)
+
+        if user is None:
+            raise HTTPException(status_code=403, detail="Invalid token or expired token.")
+
+        return user['username']
+
     def verify_api_key_param(self, request: Request) -> bool:
 
         if 'api_key' in request.query_params:
@@ -39,12 +43,28 @@ class JWTBearer(HTTPBearer):
             return None
 
     def verify_jwt(self, jwt_token: str) -> bool:
-        is_token_valid: bool = False
+        return self.decode_jwt(jwt_token) is not None
+
+    def decode_jwt(self, jwt_token: str) -> dict:
+        """
+        Method to return the payload of a valid token or None.
+        Verified tokens are cached until they expire, so each token is only decoded once.
+
+        """
+
+        payload = verified_token_cache.get(jwt_token)
+
+        if payload is not None:
+            if 'exp' in payload and payload['exp'] <= time.time():
+                verified_token_cache.pop(jwt_token, None)
+                return None
+            return payload
 
         try:
-            payload = jwt.decode(jwt_token, config.SECRET_KEY, algorithms=["HS256"])  
-        except:
-            payload = None
-        if payload:
-            is_token_valid = True
-        return is_token_valid
\ No newline at end of file
+            payload = jwt.decode(jwt_token, config.SECRET_KEY, algorithms=["HS256"])
+        except jwt.PyJWTError:
+            return None
+
+        verified_token_cache[jwt_token] = payload
+
+        return payload
@@ -0,0 +1,307 @@
+"""QwikGeo API - Column Usage"""
+
+import asyncio
+import hashlib
+import logging
+from fastapi import FastAPI
+import asyncpg
+
+from qwikgeo_api import db_models
+from qwikgeo_api import config
+from qwikgeo_api.query_builder import quote_identifier
+
+logger = logging.getLogger(__name__)
+
+pending_column_usage = {}
+
+def record_column_usage(
+    table_id: str,
+    columns: list,
+    usage_type: str,
+    time_in_ms: float
+) -> None:
+    """
+    Method to record that columns of a table were used by a query.
+    Usage is kept in memory until it is flushed to the database.
+
+    """
+
+    for column in columns:
+        key = (table_id, column, usage_type)
+
+        if key not in pending_column_usage:
+            pending_column_usage[key] = {
+                "count": 0,
+                "total_time_in_ms": 0
+            }
+
+        pending_column_usage[key]['count'] += 1
+        pending_column_usage[key]['total_time_in_ms'] += time_in_ms
+
+async def flush_column_usage(
+    app: FastAPI
+) -> list:
+    """
+    Method to write the pending column usage to the database in one upsert and
+    return the tables that were updated.
+    Usage that fails to be written is kept for the next flush.
+
+    """
+
+    if not pending_column_usage:
+        return []
+
+    column_usage = dict(pending_column_usage)
+
+    pending_column_usage.clear()
+
+    usage_query = """
+    INSERT INTO columnusage AS usage (table_id, column_name, usage_type, count, total_time_in_ms, last_used_time)
+    SELECT pending.table_id, pending.column_name, pending.usage_type, pending.count, pending.total_time_in_ms, now()
+    FROM UNNEST($1::text[], $2::text[], $3::text[], $4::integer[], $5::double precision[])
+    AS pending (table_id, column_name, usage_type, count, total_time_in_ms)
+    WHERE EXISTS (
+        SELECT 1
+        FROM "table"
+        WHERE "table".table_id = pending.table_id
+    )
+    ON CONFLICT (table_id, column_name, usage_type) DO UPDATE
+    SET count = usage.count + EXCLUDED.count,
+    total_time_in_ms = usage.total_time_in_ms + EXCLUDED.total_time_in_ms,
+    last_used_time = now()
+    RETURNING usage.table_id;
+    """
+
+    pool = app.state.database
+
+    try:
+        async with pool.acquire() as con:
+            rows = await con.fetch(
+                usage_query,
+                [key[0] for key in column_usage],
+                [key[1] for key in column_usage],
+                [key[2] for key in column_usage],
+                [usage['count'] for usage in column_usage.values()],
+                [usage['total_time_in_ms'] for usage in column_usage.values()]
+            )
+    except Exception:
+        for key, usage in column_usage.items():
+            if key not in pending_column_usage:
+                pending_column_usage[key] = {
+                    "count": 0,
+                    "total_time_in_ms": 0
+                }
+            pending_column_usage[key]['count'] += usage['count']
+            pending_column_usage[key]['total_time_in_ms'] += usage['total_time_in_ms']
+        raise
+
+    table_ids = []
+
+    for row in rows:
+        if row['table_id'] not in table_ids:
+            table_ids.append(row['table_id'])
+
+    return table_ids
+
+def get_index_name(
+    table_id: str,
+    column: str,
+    index_type: str
+) -> str:
+    """
+    Method to return the name of an index created for a column.
+
+    """
+
+    column_hash = hashlib.md5(f"{column}:{index_type}".encode("utf-8")).hexdigest()[:8]
+
+    return f"{table_id}_{column_hash}"
+
+async def get_index_recommendations(
+    table_id: str,
+    app: FastAPI
+) -> list:
+    """
+    Method to return the usage of each column of a table and whether an index is recommended.
+
+    """
+
+    usage_rows = await db_models.ColumnUsage.filter(table_id=table_id)
+
+    columns = {}
+
+    for usage_row in usage_rows:
+        if usage_row.column_name not in columns:
+            columns[usage_row.column_name] = {
+                "column": usage_row.column_name,
+                "count": 0,
+                "total_time_in_ms": 0,
+                "usage_types": []
+            }
+        columns[usage_row.column_name]['count'] += usage_row.count
+        columns[usage_row.column_name]['total_time_in_ms'] += usage_row.total_time_in_ms
+        columns[usage_row.column_name]['usage_types'].append(usage_row.usage_type)
+
+    pool = app.state.database
+
+    async with pool.acquire() as con:
+
+        column_types_query = """
+        SELECT column_name, data_type
+        FROM information_schema.columns
+        WHERE table_schema = 'user_data'
+        AND table_name = $1;
+        """
+
+        column_types = {}
+
+        for field in await con.fetch(column_types_query, table_id):
+            column_types[field['column_name']] = field['data_type']
+
+        indexes_query = """
+        SELECT attribute.attname AS column_name, operator_class.opcname AS operator_class
+        FROM pg_index
+        JOIN pg_class ON pg_class.oid = pg_index.indrelid
+        JOIN pg_namespace ON pg_namespace.oid = pg_class.relnamespace
+        JOIN pg_attribute AS attribute ON attribute.attrelid = pg_class.oid
+            AND attribute.attnum = pg_index.indkey[0]
+        JOIN pg_opclass AS operator_class ON operator_class.oid = pg_index.indclass[0]
+        WHERE pg_namespace.nspname = 'user_data'
+        AND pg_class.relname = $1
+        AND pg_index.indisvalid;
+        """
+
+        indexes = await con.fetch(indexes_query, table_id)
+
+    recommendations = []
+
+    for column in columns.values():
+        if column['column'] not in column_types:
+            continue
+
+        trigram_usage = "autocomplete" in column['usage_types'] or "like" in column['usage_types']
+
+        if trigram_usage and column_types[column['column']] in config.TEXT_FIELDS:
+            index_type = "trigram"
+        elif "filter" in column['usage_types'] or "sortby" in column['usage_types']:
+            index_type = "btree"
+        else:
+            continue
+
+        indexed = False
+
+        for index in indexes:
+            if index['column_name'] != column['column']:
+                continue
+            if index_type == "trigram" and index['operator_class'] == "gin_trgm_ops":
+                indexed = True
+            elif index_type == "btree" and index['operator_class'] != "gin_trgm_ops":
+                indexed = True
+
+        recommendations.append({
+            "column": column['column'],
+            "usage_types": column['usage_types'],
+            "count": column['count'],
+            "average_time_in_ms": column['total_time_in_ms'] / column['count'] if column['count'] else 0,
+            "index_type": index_type,
+            "indexed": indexed,
+            "recommended": not indexed and column['count'] >= config.INDEX_RECOMMENDATION_THRESHOLD
+        })
+
+    recommendations.sort(key=lambda recommendation: recommendation['count'], reverse=True)
+
+    return recommendations
+
+async def create_index(
+    table_id: str,
+    column: str,
+    index_type: str,
+    app: FastAPI
+) -> None:
+    """
+    Method to create a btree or trigram index for a column of a table.
+    An invalid index left behind by a failed concurrent build is dropped first.
+
+    """
+
+    index_name = get_index_name(table_id, column, index_type)
+
+    pool = app.state.database
+
+    async with pool.acquire() as con:
+        invalid_index = await con.fetchval("""
+        SELECT EXISTS (
+            SELECT 1
+            FROM pg_index
+            JOIN pg_class ON pg_class.oid = pg_index.indexrelid
+            JOIN pg_namespace ON pg_namespace.oid = pg_class.relnamespace
+            WHERE pg_namespace.nspname = 'user_data'
+            AND pg_class.relname = $1
+            AND NOT pg_index.indisvalid
+        );
+        """, index_name)
+
+        if invalid_index:
+            await con.execute(f"DROP INDEX CONCURRENTLY IF EXISTS user_data.{quote_identifier(index_name)};")
+
+        if index_type == "trigram":
+            await con.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm;")
+
+            index_query = f"""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS {quote_identifier(index_name)}
+            ON user_data.{quote_identifier(table_id)}
+            USING gin ({quote_identifier(column)} gin_trgm_ops);
+            """
+        else:
+            index_query = f"""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS {quote_identifier(index_name)}
+            ON user_data.{quote_identifier(table_id)}
+            USING btree ({quote_identifier(column)});
+            """
+
+        await con.execute(index_query)
+
+async def create_recommended_indexes(
+    table_ids: list,
+    app: FastAPI
+) -> None:
+    """
+    Method to create every recommended index for a list of tables.
+
+    """
+
+    for table_id in table_ids:
+        recommendations = await get_index_recommendations(table_id, app)
+
+        for recommendation in recommendations:
+            if recommendation['recommended'] is False:
+                continue
+            try:
+                await create_index(
+                    table_id=table_id,
+                    column=recommendation['column'],
+                    index_type=recommendation['index_type'],
+                    app=app
+                )
+            except asyncpg.exceptions.PostgresError:
+                continue
+
+async def flush_column_usage_periodically(
+    app: FastAPI
+) -> None:
+    """
+    Method to flush column usage on an interval and create recommended
+    indexes when AUTO_CREATE_INDEXES is enabled.
+
+    """
+
+    while True:
+        await asyncio.sleep(config.COLUMN_USAGE_FLUSH_INTERVAL_IN_SECONDS)
+
+        try:
+            table_ids = await flush_column_usage(app)
+
+            if config.AUTO_CREATE_INDEXES:
+                await create_recommended_indexes(table_ids, app)
+        except Exception:
+            logger.exception("Failed to flush column usage.")
@@ -13,5 +13,53 @@ MAX_FEATURES_PER_TILE = int(os.getenv('MAX_FEATURES_PER_TILE'))
 SECRET_KEY = os.getenv('SECRET_KEY')
 GOOGLE_CLIENT_ID = os.getenv('GOOGLE_CLIENT_ID')
 JWT_TOKEN_EXPIRE_IN_MINUTES = os.getenv('JWT_TOKEN_EXPIRE_IN_MINUTES')
+MAX_CONCURRENT_COUNT_QUERIES = int(os.getenv('MAX_CONCURRENT_COUNT_QUERIES', '4'))
+MAX_CONCURRENT_METADATA_QUERIES = int(os.getenv('MAX_CONCURRENT_METADATA_QUERIES', '4'))
+MAX_COLLECTIONS_LIMIT = int(os.getenv('MAX_COLLECTIONS_LIMIT', '1000'))
+RESPONSE_CACHE_BACKEND = os.getenv('RESPONSE_CACHE_BACKEND', 'qwikgeo_api.response_cache.MemoryCacheBackend')
+RESPONSE_CACHE_TTL_IN_SECONDS = int(os.getenv('RESPONSE_CACHE_TTL_IN_SECONDS', '0'))
+RESPONSE_CACHE_MAX_SIZE = int(os.getenv('RESPONSE_CACHE_MAX_SIZE', '1000'))
+CQL_FILTER_CACHE_SIZE = int(os.getenv('CQL_FILTER_CACHE_SIZE', '1024'))
+ACCESS_CACHE_TTL_IN_SECONDS = int(os.getenv('ACCESS_CACHE_TTL_IN_SECONDS', '5'))
+ACCESS_CACHE_MAX_SIZE = int(os.getenv('ACCESS_CACHE_MAX_SIZE', '10000'))
+VERIFIED_TOKEN_CACHE_SIZE = int(os.getenv('VERIFIED_TOKEN_CACHE_SIZE', '10000'))
+STATEMENT_CACHE_SIZE = int(os.getenv('STATEMENT_CACHE_SIZE', '1024'))
+COLUMN_USAGE_FLUSH_INTERVAL_IN_SECONDS = int(os.getenv('COLUMN_USAGE_FLUSH_INTERVAL_IN_SECONDS', '60'))
+INDEX_RECOMMENDATION_THRESHOLD = int(os.getenv('INDEX_RECOMMENDATION_THRESHOLD', '100'))
+AUTO_CREATE_INDEXES = os.getenv('AUTO_CREATE_INDEXES', 'False').lower() == 'true'
+VIEW_COUNT_FLUSH_INTERVAL_IN_SECONDS = int(os.getenv('VIEW_COUNT_FLUSH_INTERVAL_IN_SECONDS', '5'))
+MAX_EXECUTOR_THREADS = int(os.getenv('MAX_EXECUTOR_THREADS', '8'))
+MAX_EXECUTOR_PROCESSES = int(os.getenv('MAX_EXECUTOR_PROCESSES', '2'))
+MAX_CONCURRENT_PASSWORD_CHECKS = int(os.getenv('MAX_CONCURRENT_PASSWORD_CHECKS', '4'))
+MAX_CONCURRENT_AUTH_REQUESTS = int(os.getenv('MAX_CONCURRENT_AUTH_REQUESTS', '4'))
+MAX_CONCURRENT_JSON_TASKS = int(os.getenv('MAX_CONCURRENT_JSON_TASKS', '4'))
+MAX_CONCURRENT_IMPORT_TASKS = int(os.getenv('MAX_CONCURRENT_IMPORT_TASKS', '2'))
+MAX_CONCURRENT_IMPORT_JSON_TASKS = int(os.getenv('MAX_CONCURRENT_IMPORT_JSON_TASKS', '2'))
+OGR2OGR_TIMEOUT_IN_SECONDS = int(os.getenv('OGR2OGR_TIMEOUT_IN_SECONDS', '3600'))
+IMPORT_SCHEMA_SAMPLE_ROWS = int(os.getenv('IMPORT_SCHEMA_SAMPLE_ROWS', '1000'))
+IMPORT_SCHEMA_WIDEN_ON_ERROR = os.getenv('IMPORT_SCHEMA_WIDEN_ON_ERROR', 'True').lower() == 'true'
+IMPORT_BATCH_SIZE = int(os.getenv('IMPORT_BATCH_SIZE', '10000'))
+IMPORT_JSON_CHUNK_SIZE = int(os.getenv('IMPORT_JSON_CHUNK_SIZE', '1048576'))
+IMPORT_JSON_MAX_RECORD_SIZE = int(os.getenv('IMPORT_JSON_MAX_RECORD_SIZE', '67108864'))
+ARCGIS_MAX_CONCURRENT_REQUESTS = int(os.getenv('ARCGIS_MAX_CONCURRENT_REQUESTS', '4'))
+ARCGIS_REQUEST_MAX_ATTEMPTS = int(os.getenv('ARCGIS_REQUEST_MAX_ATTEMPTS', '3'))
+ARCGIS_REQUEST_RETRY_DELAY_IN_SECONDS = int(os.getenv('ARCGIS_REQUEST_RETRY_DELAY_IN_SECONDS', '1'))
+MAX_DOWNLOAD_SIZE_IN_BYTES = int(os.getenv('MAX_DOWNLOAD_SIZE_IN_BYTES', '1073741824'))
+DOWNLOAD_CHUNK_SIZE = int(os.getenv('DOWNLOAD_CHUNK_SIZE', '1048576'))
+DOWNLOAD_TIMEOUT_IN_SECONDS = int(os.getenv('DOWNLOAD_TIMEOUT_IN_SECONDS', '3600'))
+DOWNLOAD_READ_TIMEOUT_IN_SECONDS = int(os.getenv('DOWNLOAD_READ_TIMEOUT_IN_SECONDS', '60'))
+MAX_UPLOAD_SIZE_IN_BYTES = int(os.getenv('MAX_UPLOAD_SIZE_IN_BYTES', '10737418240'))
+UPLOAD_SESSION_EXPIRE_IN_SECONDS = int(os.getenv('UPLOAD_SESSION_EXPIRE_IN_SECONDS', '86400'))
+TILE_INVALIDATION_MAX_FEATURES = int(os.getenv('TILE_INVALIDATION_MAX_FEATURES', '10000'))
+IMPORT_WORKERS = int(os.getenv('IMPORT_WORKERS', '2'))
+MAX_RUNNING_IMPORT_JOBS = int(os.getenv('MAX_RUNNING_IMPORT_JOBS', '4'))
+MAX_PENDING_IMPORT_JOBS = int(os.getenv('MAX_PENDING_IMPORT_JOBS', '100'))
+IMPORT_JOB_MAX_ATTEMPTS = int(os.getenv('IMPORT_JOB_MAX_ATTEMPTS', '3'))
+IMPORT_JOB_RETRY_DELAY_IN_SECONDS = int(os.getenv('IMPORT_JOB_RETRY_DELAY_IN_SECONDS', '30'))
+IMPORT_JOB_POLL_INTERVAL_IN_SECONDS = int(os.getenv('IMPORT_JOB_POLL_INTERVAL_IN_SECONDS', '2'))
+IMPORT_JOB_HEARTBEAT_INTERVAL_IN_SECONDS = int(os.getenv('IMPORT_JOB_HEARTBEAT_INTERVAL_IN_SECONDS', '5'))
+IMPORT_JOB_STALE_AFTER_IN_SECONDS = int(os.getenv('IMPORT_JOB_STALE_AFTER_IN_SECONDS', '60'))
 
 NUMERIC_FIELDS = ['bigint','bigserial','double precision','integer','smallint','real','smallserial','serial','numeric','money']
+
+TEXT_FIELDS = ['text','character varying','character']
@@ -1,5 +1,6 @@
 """QwikGeo API - Database Setup"""
 
+import asyncio
 from fastapi import FastAPI
 import asyncpg
 
@@ -17,10 +18,15 @@ async def connect_to_db(app: FastAPI) -> None:
         min_size=1,
         max_size=10,
         max_queries=50000,
+        statement_cache_size=config.STATEMENT_CACHE_SIZE,
         max_inactive_connection_lifetime=300,
         timeout=180 # 3 Minutes
     )
 
+    app.state.count_query_semaphore = asyncio.Semaphore(config.MAX_CONCURRENT_COUNT_QUERIES)
+
+    app.state.metadata_query_semaphore = asyncio.Semaphore(config.MAX_CONCURRENT_METADATA_QUERIES)
+
     async with app.state.database.acquire() as con:
 
         await con.fetchrow(bins_sql.EQUAL_INTERVAL_BINS_SQL)
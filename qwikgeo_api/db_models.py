@@ -41,7 +41,7 @@ class GroupUser(models.Model):
         to_field="group_id",
         on_delete='CASCADE'
     )
-    username = fields.CharField(500)
+    username = fields.CharField(500, index=True)
 
 class GroupAdmin(models.Model):
     """Model for group_user in database"""
@@ -87,7 +87,7 @@ class ItemReadAccessList(models.Model):
         to_field="portal_id",
         on_delete='CASCADE'
     )
-    name = fields.CharField(500)
+    name = fields.CharField(500, index=True)
 
 class ItemWriteAccessList(models.Model):
     """Model for item_read_access_list in database"""
@@ -117,6 +117,56 @@ class Table(models.Model):
     table_id = fields.CharField(50, pk=True)
     created_time = fields.DatetimeField(auto_now_add=True)
     modified_time = fields.DatetimeField(auto_now=True)
+    geometry_type = fields.CharField(max_length=50, null=True)
+    bounding_box = fields.JSONField(null=True)
+    center = fields.JSONField(null=True)
+
+class ColumnUsage(models.Model):
+    """Model for column_usage in database"""
+
+    id = fields.IntField(pk=True)
+    table: fields.ForeignKeyRelation[Table] = fields.ForeignKeyField(
+        model_name="models.Table",
+        related_name="column_usage",
+        to_field="table_id",
+        on_delete='CASCADE'
+    )
+    column_name = fields.CharField(max_length=500)
+    usage_type = fields.CharField(max_length=50)
+    count = fields.IntField(default=0)
+    total_time_in_ms = fields.FloatField(default=0)
+    last_used_time = fields.DatetimeField(auto_now=True)
+
+    class Meta:
+        unique_together = (("table", "column_name", "usage_type"),)
+
+class ImportJob(models.Model):
+    """Model for import_job in database"""
+
+    process_id = fields.CharField(max_length=50, pk=True)
+    username = fields.CharField(max_length=500)
+    job_type = fields.CharField(max_length=100)
+    parameters = fields.JSONField()
+    status = fields.CharField(max_length=20, default="PENDING", index=True)
+    priority = fields.IntField(default=0)
+    attempts = fields.IntField(default=0)
+    max_attempts = fields.IntField(default=1)
+    result = fields.JSONField(default={})
+    available_time = fields.DatetimeField(auto_now_add=True)
+    created_time = fields.DatetimeField(auto_now_add=True)
+    started_time = fields.DatetimeField(null=True)
+    modified_time = fields.DatetimeField(auto_now=True)
+
+class ImportUpload(models.Model):
+    """Model for import_upload in database"""
+
+    upload_id = fields.CharField(max_length=50, pk=True)
+    username = fields.CharField(max_length=500)
+    import_type = fields.CharField(max_length=100)
+    table_id = fields.CharField(max_length=50)
+    files = fields.JSONField()
+    created_time = fields.DatetimeField(auto_now_add=True)
+    modified_time = fields.DatetimeField(auto_now=True)
 
 class Map(models.Model):
     """Model for map in database"""
@@ -0,0 +1,125 @@
+"""QwikGeo API - Executor"""
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+from qwikgeo_api import config
+
+CATEGORY_LIMITS = {
+    "password": config.MAX_CONCURRENT_PASSWORD_CHECKS,
+    "auth": config.MAX_CONCURRENT_AUTH_REQUESTS,
+    "json": config.MAX_CONCURRENT_JSON_TASKS,
+    "import": config.MAX_CONCURRENT_IMPORT_TASKS,
+    "import_json": config.MAX_CONCURRENT_IMPORT_JSON_TASKS
+}
+
+thread_pool = None
+
+process_pool = None
+
+category_semaphores = {}
+
+def get_thread_pool() -> ThreadPoolExecutor:
+    """
+    Method to return the shared thread pool.
+
+    """
+
+    global thread_pool
+
+    if thread_pool is None:
+        thread_pool = ThreadPoolExecutor(
+            max_workers=config.MAX_EXECUTOR_THREADS,
+            thread_name_prefix="qwikgeo"
+        )
+
+    return thread_pool
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """
+    Method to return the shared process pool.
+
+    """
+
+    global process_pool
+
+    if process_pool is None:
+        process_pool = ProcessPoolExecutor(max_workers=config.MAX_EXECUTOR_PROCESSES)
+
+    return process_pool
+
+def get_category_semaphore(
+    category: str
+) -> asyncio.Semaphore:
+    """
+    Method to return the semaphore limiting how many tasks of a category run at once.
+
+    """
+
+    if category not in category_semaphores:
+        category_semaphores[category] = asyncio.Semaphore(CATEGORY_LIMITS[category])
+
+    return category_semaphores[category]
+
+async def run_in_thread(
+    category: str,
+    function: object,
+    *args,
+    **kwargs
+) -> object:
+    """
+    Method to run blocking work in the shared thread pool.
+    Used for work that waits on io or releases the gil such as bcrypt and subprocesses,
+    and for work on objects that can not be sent to a process, such as an open file or
+    large query results. Python code in a thread still holds the gil, so it only keeps
+    the event loop responsive between switch intervals and does not run in parallel.
+
+    """
+
+    loop = asyncio.get_running_loop()
+
+    async with get_category_semaphore(category):
+        return await loop.run_in_executor(
+            get_thread_pool(),
+            functools.partial(function, *args, **kwargs)
+        )
+
+async def run_in_process(
+    category: str,
+    function: object,
+    *args,
+    **kwargs
+) -> object:
+    """
+    Method to run cpu bound work in the shared process pool.
+    The function and its arguments must be picklable, so keep the results small.
+
+    """
+
+    loop = asyncio.get_running_loop()
+
+    async with get_category_semaphore(category):
+        return await loop.run_in_executor(
+            get_process_pool(),
+            functools.partial(function, *args, **kwargs)
+        )
+
+def shutdown() -> None:
+    """
+    Method to shut down the thread and process pools.
+
+    """
+
+    global thread_pool
+    global process_pool
+
+    if thread_pool is not None:
+        thread_pool.shutdown(wait=False)
+        thread_pool = None
+
+    if process_pool is not None:
+        process_pool.shutdown(wait=True)
+        process_pool = None
+
+    category_semaphores.clear()
@@ -1,5 +1,6 @@
 """QwikGeo API"""
 
+import asyncio
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from tortoise.contrib.fastapi import register_tortoise
@@ -7,6 +8,10 @@ from prometheus_fastapi_instrumentator import Instrumentator
 
 from qwikgeo_api import db
 from qwikgeo_api import config
+from qwikgeo_api import column_usage
+from qwikgeo_api import view_counter
+from qwikgeo_api import executor
+from qwikgeo_api.routers.imports import jobs as import_jobs
 from qwikgeo_api.routers.authentication import router as authentication_router
 from qwikgeo_api.routers.items.groups import router as groups_router
 from qwikgeo_api.routers.items.users import router as users_router
@@ -112,12 +117,42 @@ async def startup_event():
     """Application startup: register the database connection and create table list."""
     await db.connect_to_db(app)
 
+    app.state.column_usage_task = asyncio.create_task(
+        column_usage.flush_column_usage_periodically(app)
+    )
+
+    app.state.view_counter_task = asyncio.create_task(
+        view_counter.flush_views_periodically(app)
+    )
+
+    app.state.import_worker_tasks = [
+        asyncio.create_task(import_jobs.run_import_worker(app))
+        for _ in range(config.IMPORT_WORKERS)
+    ]
+
 @app.on_event("shutdown")
 async def shutdown_event():
     """Application shutdown: de-register the database connection."""
 
+    background_tasks = [
+        app.state.column_usage_task,
+        app.state.view_counter_task,
+        *app.state.import_worker_tasks
+    ]
+
+    for background_task in background_tasks:
+        background_task.cancel()
+
+    await asyncio.gather(*background_tasks, return_exceptions=True)
+
+    await column_usage.flush_column_usage(app)
+
+    await view_counter.flush_views(app)
+
     await db.close_db_connection(app)
 
+    executor.shutdown()
+
 @app.get(
     path="/api/v1/",
     tags=["Landing Page"],
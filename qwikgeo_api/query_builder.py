@@ -0,0 +1,270 @@
+"""QwikGeo API - Query Builder"""
+
+import re
+import shapely.geometry
+from pygeofilter import ast
+from pygeofilter import values
+from pygeofilter.backends.evaluator import handle
+from pygeofilter.backends.sql.evaluate import SQLEvaluator
+
+PARAMETER_PATTERN = re.compile(r"'(?:[^']|'')*'|\"(?:[^\"]|\"\")*\"|\$(\d+)")
+
+def quote_identifier(
+    identifier: str
+) -> str:
+    """
+    Method to quote an identifier such as a column or table name.
+
+    """
+
+    return '"' + str(identifier).replace('"', '""') + '"'
+
+def quote_literal(
+    value: str
+) -> str:
+    """
+    Method to quote a string literal.
+
+    """
+
+    return "'" + str(value).replace("'", "''") + "'"
+
+def renumber_parameters(
+    sql: str,
+    offset: int
+) -> str:
+    """
+    Method to shift the bind parameters of a sql fragment by an offset.
+    Parameters within quoted literals and identifiers are left alone.
+
+    """
+
+    def renumber(match):
+        if match.group(1) is None:
+            return match.group(0)
+        return f"${int(match.group(1)) + offset}"
+
+    return PARAMETER_PATTERN.sub(renumber, sql)
+
+class QueryBuilder:
+    """
+    Class used to build a sql query with bind parameters.
+
+    Values are never written into the sql text, so the same query text is
+    reused for every request and the prepared statement cache of each
+    connection can return the statement without planning it again.
+    """
+
+    def __init__(
+        self,
+        sql: str="",
+        *args
+    ):
+        self.sql = ""
+        self.args = []
+        self.add(sql, *args)
+
+    def add_param(
+        self,
+        value: object
+    ) -> str:
+        """Method to add a bind parameter and return its placeholder."""
+
+        self.args.append(value)
+
+        return f"${len(self.args)}"
+
+    def add_column_value(
+        self,
+        value: object,
+        udt_name: str
+    ) -> str:
+        """
+        Method to add a bind parameter that is cast to the type of a column.
+        Values are sent as text so numbers keep their precision for bigint and numeric columns.
+
+        """
+
+        if value is None:
+            return "NULL"
+
+        return f"{self.add_param(str(value))}::text::{quote_identifier(udt_name)}"
+
+    def add(
+        self,
+        fragment: object,
+        *args
+    ) -> "QueryBuilder":
+        """
+        Method to append sql to the query.
+        The fragment can be sql numbered from $1 with its own arguments or another QueryBuilder.
+        Sql without arguments is appended as is, so it can use placeholders from add_param.
+
+        """
+
+        if isinstance(fragment, QueryBuilder):
+            args = fragment.args
+            fragment = fragment.sql
+
+        if args and self.args:
+            fragment = renumber_parameters(fragment, len(self.args))
+
+        self.sql += fragment
+        self.args.extend(args)
+
+        return self
+
+    async def fetch(
+        self,
+        con
+    ) -> list:
+        """Method to return all rows of the query."""
+
+        return await con.fetch(self.sql, *self.args)
+
+    async def fetchrow(
+        self,
+        con
+    ) -> object:
+        """Method to return the first row of the query."""
+
+        return await con.fetchrow(self.sql, *self.args)
+
+    async def fetchval(
+        self,
+        con
+    ) -> object:
+        """Method to return the first value of the query."""
+
+        return await con.fetchval(self.sql, *self.args)
+
+    async def execute(
+        self,
+        con
+    ) -> str:
+        """Method to execute the query."""
+
+        return await con.execute(self.sql, *self.args)
+
+class ParameterizedSQLEvaluator(SQLEvaluator):
+    """
+    CQL evaluator that returns numbers, booleans and geometries as bind parameters.
+
+    Strings are written as quoted literals so Postgres can still coerce them to
+    the type of the column they are compared with.
+    """
+
+    def __init__(
+        self,
+        attribute_map: dict,
+        function_map: dict
+    ):
+        super().__init__(attribute_map, function_map)
+        self.args = []
+        self.columns = []
+        self.like_columns = []
+        self.column_uses = {}
+        self.like_uses = {}
+
+    def add_param(
+        self,
+        value: object
+    ) -> str:
+        """Method to add a bind parameter and return its placeholder."""
+
+        self.args.append(value)
+
+        return f"${len(self.args)}"
+
+    @handle(ast.Like)
+    def like(self, node, lhs):
+        pattern = node.pattern
+        if node.wildcard != '%':
+            pattern = pattern.replace(node.wildcard, '%')
+        if node.singlechar != '_':
+            pattern = pattern.replace(node.singlechar, '_')
+
+        if isinstance(node.lhs, ast.Attribute):
+            column = self.attribute_map[node.lhs.name]
+            self.like_uses[column] = self.like_uses.get(column, 0) + 1
+            if column not in self.like_columns:
+                self.like_columns.append(column)
+
+        return (
+            f"{lhs} {'NOT ' if node.not_ else ''}{'I' if node.nocase else ''}LIKE "
+            f"{self.add_param(pattern)} ESCAPE {quote_literal(node.escapechar)}"
+        )
+
+    @handle(ast.BBox)
+    def bbox(self, node, lhs):
+        return f"ST_Intersects({lhs},{self.make_envelope(node.minx, node.miny, node.maxx, node.maxy)})"
+
+    @handle(ast.Attribute)
+    def attribute(self, node: ast.Attribute):
+        column = self.attribute_map[node.name]
+        self.column_uses[column] = self.column_uses.get(column, 0) + 1
+        if column not in self.columns:
+            self.columns.append(column)
+        return quote_identifier(column)
+
+    def get_filter_columns(self) -> list:
+        """Method to return the columns used outside of like predicates."""
+
+        return [
+            column for column in self.columns
+            if self.column_uses[column] > self.like_uses.get(column, 0)
+        ]
+
+    @handle(*values.LITERALS)
+    def literal(self, node):
+        if isinstance(node, bool):
+            return f"{self.add_param(node)}::boolean"
+        if isinstance(node, int):
+            return f"{self.add_param(node)}::bigint"
+        if isinstance(node, float):
+            return f"{self.add_param(node)}::double precision"
+        if isinstance(node, list):
+            return f"ARRAY[{', '.join(self.literal(value) for value in node)}]"
+        return quote_literal(node)
+
+    @handle(values.Geometry)
+    def geometry(self, node: values.Geometry):
+        return f"ST_GeomFromWKB({self.add_param(shapely.geometry.shape(node).wkb)}, 4326)"
+
+    @handle(values.Envelope)
+    def envelope(self, node: values.Envelope):
+        return self.make_envelope(node.x1, node.y1, node.x2, node.y2)
+
+    def make_envelope(
+        self,
+        minx: float,
+        miny: float,
+        maxx: float,
+        maxy: float
+    ) -> str:
+        """Method to return an envelope with its corners as bind parameters."""
+
+        corners = [self.add_param(float(corner)) for corner in [minx, miny, maxx, maxy]]
+
+        return f"ST_MakeEnvelope({', '.join(corners)}, 4326)"
+
+def to_parameterized_sql_where(
+    root: ast.Node,
+    field_mapping: dict
+) -> tuple:
+    """
+    Method to compile a cql ast into a sql where clause, its bind parameters,
+    the columns compared by the filter and the columns matched with like.
+
+    """
+
+    evaluator = ParameterizedSQLEvaluator(field_mapping, {})
+
+    sql = evaluator.evaluate(root)
+
+    return (
+        sql,
+        tuple(evaluator.args),
+        tuple(evaluator.get_filter_columns()),
+        tuple(evaluator.like_columns)
+    )
@@ -0,0 +1,159 @@
+"""QwikGeo API - Response Cache"""
+
+import json
+import hashlib
+import importlib
+from fastapi import Request
+from cachetools import TTLCache
+
+from qwikgeo_api import config
+
+class MemoryCacheBackend:
+    """
+    Cache backend that stores responses within the memory of the current worker.
+
+    Any other backend can be used by setting RESPONSE_CACHE_BACKEND to the
+    import path of a class with the same constructor and async methods.
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        ttl: int
+    ):
+        self.responses = TTLCache(maxsize=max_size, ttl=ttl)
+        self.versions = {}
+
+    async def get(
+        self,
+        key: str
+    ) -> object:
+        """Method to return a cached response or None."""
+
+        return self.responses.get(key)
+
+    async def set(
+        self,
+        key: str,
+        value: object
+    ) -> None:
+        """Method to store a response in the cache."""
+
+        self.responses[key] = value
+
+    async def get_version(
+        self,
+        table_id: str
+    ) -> int:
+        """Method to return the data version of a table."""
+
+        return self.versions.get(table_id, 0)
+
+    async def increment_version(
+        self,
+        table_id: str
+    ) -> None:
+        """Method to increment the data version of a table."""
+
+        self.versions[table_id] = self.versions.get(table_id, 0) + 1
+
+backend = None
+
+def get_backend() -> object:
+    """
+    Method to return the configured cache backend.
+
+    """
+
+    global backend
+
+    if backend is None:
+        module_name, class_name = config.RESPONSE_CACHE_BACKEND.rsplit(".", 1)
+        backend_class = getattr(importlib.import_module(module_name), class_name)
+        backend = backend_class(
+            max_size=config.RESPONSE_CACHE_MAX_SIZE,
+            ttl=config.RESPONSE_CACHE_TTL_IN_SECONDS
+        )
+
+    return backend
+
+def cache_enabled() -> bool:
+    """
+    Method to determine if responses should be cached.
+
+    """
+
+    return config.RESPONSE_CACHE_TTL_IN_SECONDS > 0
+
+def get_request_parameters(
+    request: Request
+) -> list:
+    """
+    Method to return the query parameters of a request without the api key.
+
+    """
+
+    return sorted(
+        [key, value] for key, value in request.query_params.multi_items() if key != "api_key"
+    )
+
+async def get_cache_key(
+    endpoint: str,
+    table_id: str,
+    parameters: object
+) -> str:
+    """
+    Method to return a cache key for a response of a table.
+
+    """
+
+    if not cache_enabled():
+        return None
+
+    version = await get_backend().get_version(table_id)
+
+    normalized_parameters = json.dumps(parameters, sort_keys=True, default=str)
+
+    parameters_hash = hashlib.sha256(normalized_parameters.encode("utf-8")).hexdigest()
+
+    return f"{endpoint}:{table_id}:{version}:{parameters_hash}"
+
+async def get_response(
+    key: str
+) -> object:
+    """
+    Method to return a cached response.
+
+    """
+
+    if key is None:
+        return None
+
+    return await get_backend().get(key)
+
+async def set_response(
+    key: str,
+    value: object
+) -> None:
+    """
+    Method to store a response in the cache.
+
+    """
+
+    if key is None:
+        return
+
+    await get_backend().set(key, value)
+
+async def invalidate_table(
+    table_id: str
+) -> None:
+    """
+    Method to invalidate all cached responses for a table.
+
+    """
+
+    if not cache_enabled():
+        return
+
+    await get_backend().increment_version(table_id)
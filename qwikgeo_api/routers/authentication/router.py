@@ -11,6 +11,7 @@ from qwikgeo_api import db_models
 import qwikgeo_api.routers.authentication.models as models
 from qwikgeo_api import utilities
 from qwikgeo_api import config
+from qwikgeo_api import executor
 
 router = APIRouter()
 
@@ -90,7 +91,13 @@ async def google_token_authenticate(
     """
 
     try:
-        user = id_token.verify_oauth2_token(info.token, requests.Request(), config.GOOGLE_CLIENT_ID)
+        user = await executor.run_in_thread(
+            "auth",
+            id_token.verify_oauth2_token,
+            info.token,
+            requests.Request(),
+            config.GOOGLE_CLIENT_ID
+        )
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
 
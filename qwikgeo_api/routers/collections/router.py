@@ -2,21 +2,22 @@
 
 import os
 import json
+import time
 import shutil
 import datetime
 from typing import Optional
-from fastapi import Request, APIRouter, Depends, status, Response, HTTPException
+from fastapi import Request, APIRouter, Depends, status, Response, HTTPException, Query
 from starlette.responses import FileResponse
-from pygeofilter.backends.sql import to_sql_where
-from pygeofilter.parsers.ecql import parse
 from tortoise.expressions import Q
-import lark
 import asyncpg
 
 import qwikgeo_api.routers.collections.models as models
 from qwikgeo_api import utilities
 from qwikgeo_api import config
 from qwikgeo_api import authentication_handler
+from qwikgeo_api import response_cache
+from qwikgeo_api import column_usage
+from qwikgeo_api.query_builder import QueryBuilder, quote_identifier
 
 router = APIRouter()
 
@@ -56,6 +57,14 @@ router = APIRouter()
                                 },
                                 "itemType": "feature"
                             }
+                        ],
+                        "links": [
+                            {
+                                "type": "application/json",
+                                "rel": "next",
+                                "title": "collections (next)",
+                                "href": "http://api.qwikgeo.com/api/v1/collections?offset=10&limit=10"
+                            }
                         ]
                     }
                 }
@@ -82,6 +91,8 @@ router = APIRouter()
 
 async def collections(
     request: Request,
+    limit: int=Query(10, ge=1, le=config.MAX_COLLECTIONS_LIMIT),
+    offset: int=Query(0, ge=0),
     username: int=Depends(authentication_handler.JWTBearer())
 ):
     """
@@ -95,11 +106,18 @@ async def collections(
     
     tables = await utilities.get_multiple_items_in_database(
         username=username,
-        model_name="Table"
+        model_name="Table",
+        limit=limit,
+        offset=offset
     )
     if len(tables) > 0:
 
-        for table in tables:
+        tables_metadata = await utilities.get_multiple_table_metadata(
+            tables=tables,
+            app=request.app
+        )
+
+        for table, metadata in zip(tables, tables_metadata):
             db_tables.append(
                 {
                     "id" : f"{table.table_id}",
@@ -132,16 +150,10 @@ async def collections(
                             "href": f"{url}api/v1/collections/{table.table_id}/tiles"
                         }
                     ],
-                    "geometry": await utilities.get_table_geometry_type(
-                        table_id=table.table_id,
-                        app=request.app
-                    ),
+                    "geometry": metadata['geometry_type'],
                     "extent": {
                         "spatial": {
-                            "bbox": await utilities.get_table_bounds(
-                                table_id=table.table_id,
-                                app=request.app
-                            ),
+                            "bbox": metadata['bounding_box'],
                             "crs": "http://www.opengis.net/def/crs/OGC/1.3/CRS84"
                         }
                     },
@@ -149,7 +161,25 @@ async def collections(
                 }
             )
 
-    return {"collections": db_tables}
+    links = []
+
+    if len(tables) == limit:
+        links.append({
+            "type": "application/json",
+            "rel": "next",
+            "title": "collections (next)",
+            "href": f"{url}api/v1/collections?offset={offset+limit}&limit={limit}"
+        })
+
+    if (offset - limit) > -1:
+        links.append({
+            "type": "application/json",
+            "rel": "prev",
+            "title": "collections (prev)",
+            "href": f"{url}api/v1/collections?offset={offset-limit}&limit={limit}"
+        })
+
+    return {"collections": db_tables, "links": links}
 
 @router.get(
     path="/{table_id}",
@@ -244,6 +274,11 @@ async def collection(
 
     url = str(request.base_url)
 
+    metadata = await utilities.get_table_metadata(
+        table_id=table_id,
+        app=request.app
+    )
+
     return {
         "id": f"{table_id}",
         "title" : item_metadata.item.title,
@@ -275,16 +310,10 @@ async def collection(
                 "href": f"{url}api/v1/collections/{table_id}/tiles"
             }
         ],
-        "geometry": await utilities.get_table_geometry_type(
-            table_id=item_metadata.table_id,
-            app=request.app
-        ),
+        "geometry": metadata['geometry_type'],
         "extent": {
             "spatial": {
-                "bbox": await utilities.get_table_bounds(
-                    table_id=table_id,
-                    app=request.app
-                ),
+                "bbox": metadata['bounding_box'],
                 "crs": "http://www.opengis.net/def/crs/OGC/1.3/CRS84"
             }
         },
@@ -369,14 +398,14 @@ async def queryables(
 
     async with pool.acquire() as con:
 
-        sql_field_query = f"""
+        sql_field_query = """
             SELECT column_name, data_type
             FROM information_schema.columns
-            WHERE table_name = '{table_id}'
+            WHERE table_name = $1
             AND column_name != 'geom';
         """
 
-        db_fields = await con.fetch(sql_field_query)
+        db_fields = await con.fetch(sql_field_query, table_id)
 
         for field in db_fields:
             data_type = 'string'
@@ -476,6 +505,10 @@ async def items(
     filter: str=None,
     srid: int=4326,
     return_geometry: bool=True,
+    precision: int=None,
+    simplify: float=None,
+    zoom: int=None,
+    ids: str=None,
     username: int=Depends(authentication_handler.JWTBearer())
 ):
     """
@@ -491,7 +524,31 @@ async def items(
         username=username
     )
 
-    blacklist_query_parameters = ["bbox","limit","offset","properties","sortby","sortdesc","filter","srid"]
+    utilities.validate_precision(precision)
+
+    simplify = utilities.get_simplify_tolerance(
+        simplify=simplify,
+        zoom=zoom
+    )
+
+    gids = []
+
+    if ids is not None:
+        try:
+            gids = [int(gid) for gid in ids.split(",")]
+        except ValueError as exc:
+            raise HTTPException(
+                status_code=400,
+                detail="ids must be a comma separated list of integers."
+            ) from exc
+
+        if "limit" not in request.query_params:
+            limit = len(gids)
+
+    blacklist_query_parameters = [
+        "bbox","limit","offset","properties","sortby","sortdesc","filter","srid",
+        "precision","simplify","zoom","ids"
+    ]
 
     new_query_parameters = []
 
@@ -499,75 +556,97 @@ async def items(
         if query not in blacklist_query_parameters:
             new_query_parameters.append(query)
 
-    column_where_parameters = ""
+    cache_key = await response_cache.get_cache_key(
+        endpoint="items",
+        table_id=table_id,
+        parameters=response_cache.get_request_parameters(request)
+    )
 
-    pool = request.app.state.database
+    cached_response = await response_cache.get_response(cache_key)
 
-    async with pool.acquire() as con:
+    if cached_response is not None:
+        results = cached_response['results']
 
-        sql_field_query = f"""
-            SELECT column_name
-            FROM information_schema.columns
-            WHERE table_name = '{table_id}'
-            AND column_name != 'geom';
-        """
+        used_columns = cached_response['used_columns']
 
-        db_fields = await con.fetch(sql_field_query)
+        query_time_in_ms = 0
+    else:
 
-        fields = []
+        column_where_parameters = QueryBuilder()
 
-        for field in db_fields:
-            fields.append(field['column_name'])
+        filter_columns = []
+
+        like_columns = []
+
+        pool = request.app.state.database
+
+        async with pool.acquire() as con:
+
+            sql_field_query = """
+                SELECT column_name, udt_name
+                FROM information_schema.columns
+                WHERE table_name = $1
+                AND column_name != 'geom';
+            """
+
+            db_fields = await con.fetch(sql_field_query, table_id)
+
+            fields = []
 
-        if properties == '*':
-            properties = ""
             for field in db_fields:
-                column = field['column_name']
-                properties += f'"{column}",'
-            properties = properties[:-1]
-        else:
-            if len(properties) > 0:
-                for property in properties.split(","):
-                    if property not in fields:
-                        raise HTTPException(
-                            status_code=400,
-                            detail=f"""Column: {property} is not a column for {table_id}."""
+                fields.append(field['column_name'])
+
+            if properties == '*':
+                properties = ""
+                for field in db_fields:
+                    column = field['column_name']
+                    properties += f'{quote_identifier(column)},'
+                properties = properties[:-1]
+            else:
+                if len(properties) > 0:
+                    for property in properties.split(","):
+                        if property not in fields:
+                            raise HTTPException(
+                                status_code=400,
+                                detail=f"""Column: {property} is not a column for {table_id}."""
+                            )
+                    properties = ",".join(quote_identifier(property) for property in properties.split(","))
+
+            if new_query_parameters:
+
+                for field in db_fields:
+                    if field['column_name'] in new_query_parameters:
+                        if column_where_parameters.sql != "":
+                            column_where_parameters.add(" AND ")
+                        column_where_parameters.add(
+                            f""" {quote_identifier(field['column_name'])} = $1::text::{quote_identifier(field['udt_name'])} """,
+                            request.query_params[field['column_name']]
                         )
+                        filter_columns.append(field['column_name'])
 
-        if new_query_parameters:
+            if filter is not None:
 
-            for field in db_fields:
-                if field['column_name'] in new_query_parameters:
-                    if len(column_where_parameters) != 0:
-                        column_where_parameters += " AND "
-                    column_where_parameters += f""" {field['column_name']} = '{request.query_params[field['column_name']]}' """
+                field_mapping = {}
 
-        if filter is not None:
+                for field in db_fields:
+                    field_mapping[field['column_name']] = field['column_name']
 
-            field_mapping = {}
+                filter_columns += utilities.get_cql_filter_columns(filter, field_mapping)
+                like_columns += utilities.get_cql_like_columns(filter, field_mapping)
+                filter = utilities.get_cql_where_clause(filter, field_mapping)
 
-            for field in db_fields:
-                field_mapping[field['column_name']] = field['column_name']
-            try:
-                ast = parse(filter)
-            except lark.exceptions.UnexpectedToken as exc:
-                raise HTTPException(
-                    status_code=400,
-                    detail="Invalid operator used in filter."
-                ) from exc
-            try:
-                filter = to_sql_where(ast, field_mapping)
-            except KeyError as exc:
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"""Invalid column in filter parameter for {table_id}."""
-                ) from exc
 
+            if filter is not None and column_where_parameters.sql != "":
+                filter.add(" AND ").add(column_where_parameters)
+            elif filter is None:
+                filter = column_where_parameters
 
-        if filter is not None and column_where_parameters != "":
-            filter += f" AND {column_where_parameters}"
-        elif filter is None:
-            filter = column_where_parameters
+            if gids:
+                if filter.sql != "":
+                    filter.add(" AND ")
+                filter.add("gid = ANY($1::integer[])", gids)
+
+        start = time.perf_counter()
 
         results = await utilities.get_table_geojson(
             table_id=table_id,
@@ -580,55 +659,75 @@ async def items(
             filter=filter,
             srid=srid,
             return_geometry=return_geometry,
+            precision=precision,
+            simplify=simplify,
             app=request.app
         )
 
-        results['timeStamp'] = f"{datetime.datetime.utcnow().isoformat()}Z"
+        query_time_in_ms = (time.perf_counter() - start) * 1000
 
-        results['links'] = [
-            {
-                "type": "application/geo+json",
-                "rel": "self",
-                "title": "This document as GeoJSON",
-                "href": request.url._url
-            },
-            {
-                "type": "application/json",
-                "title": f"{table_id}",
-                "rel": "collection",
-                "href": f"{url}api/v1/collections/{table_id}"
-            }
-        ]
+        used_columns = {
+            "filter": filter_columns,
+            "like": like_columns,
+            "sortby": [sortby] if sortby != "gid" else []
+        }
 
-        extra_params = ""
+        await response_cache.set_response(cache_key, {
+            "results": results,
+            "used_columns": used_columns
+        })
 
-        for param in request.query_params:
-            if param != 'offset':
-                extra_params += f"&{param}={request.query_params[param]}"
+    for usage_type, columns in used_columns.items():
+        column_usage.record_column_usage(table_id, columns, usage_type, query_time_in_ms)
 
-        if (results['numberReturned'] + offset) < results['numberMatched']:
-            href = f"{str(request.base_url)[:-1]}{request.url.path}?offset={offset+limit}"
-            if len(extra_params)> 0:
-                href += extra_params
-            results['links'].append({
-                "type": "application/geo+json",
-                "rel": "next",
-                "title": "items (next)",
-                "href": href
-            })
+    results = dict(results)
 
-        if (offset - limit) > -1:
-            href = f"{str(request.base_url)[:-1]}{request.url.path}?offset={offset-limit}"
-            if len(extra_params)> 0:
-                href += extra_params
-            results['links'].append({
-                "type": "application/geo+json",
-                "rel": "prev",
-                "title": "items (prev)",
-                "href": href
-            })
+    results['timeStamp'] = f"{datetime.datetime.utcnow().isoformat()}Z"
 
-        return results
+    results['links'] = [
+        {
+            "type": "application/geo+json",
+            "rel": "self",
+            "title": "This document as GeoJSON",
+            "href": request.url._url
+        },
+        {
+            "type": "application/json",
+            "title": f"{table_id}",
+            "rel": "collection",
+            "href": f"{url}api/v1/collections/{table_id}"
+        }
+    ]
+
+    extra_params = ""
+
+    for param in request.query_params:
+        if param != 'offset':
+            extra_params += f"&{param}={request.query_params[param]}"
+
+    if (results['numberReturned'] + offset) < results['numberMatched']:
+        href = f"{str(request.base_url)[:-1]}{request.url.path}?offset={offset+limit}"
+        if len(extra_params)> 0:
+            href += extra_params
+        results['links'].append({
+            "type": "application/geo+json",
+            "rel": "next",
+            "title": "items (next)",
+            "href": href
+        })
+
+    if (offset - limit) > -1:
+        href = f"{str(request.base_url)[:-1]}{request.url.path}?offset={offset-limit}"
+        if len(extra_params)> 0:
+            href += extra_params
+        results['links'].append({
+            "type": "application/geo+json",
+            "rel": "prev",
+            "title": "items (prev)",
+            "href": href
+        })
+
+    return results
 
 @router.post(
     path="/{table_id}/items",
@@ -700,15 +799,15 @@ async def create_item(
 
     async with pool.acquire() as con:
 
-        sql_field_query = f"""
-        SELECT column_name, data_type
+        sql_field_query = """
+        SELECT column_name, data_type, udt_name
         FROM information_schema.columns
-        WHERE table_name = '{table_id}'
+        WHERE table_name = $1
         AND column_name != 'geom'
         AND column_name != 'gid';
         """
 
-        db_fields = await con.fetch(sql_field_query)
+        db_fields = await con.fetch(sql_field_query, table_id)
 
         db_columns = []
 
@@ -718,11 +817,14 @@ async def create_item(
             db_columns.append(field['column_name'])
             db_column_types[field['column_name']] = {
                 "used": False,
-                "type": field['data_type']
+                "type": field['data_type'],
+                "udt_name": field['udt_name']
             }
 
         string_columns = ",".join(db_columns)
 
+        query = QueryBuilder()
+
         input_columns = ""
         values = ""
 
@@ -733,11 +835,12 @@ async def create_item(
                     detail=f"""Column: {column} is not a column for {table_id}.
                     Please use one of the following columns. {string_columns}"""
                 )
-            input_columns += f""""{column}","""
-            if db_column_types[column]['type'] in config.NUMERIC_FIELDS:
-                values += f"""{float(info.properties[column])},"""
-            else:
-                values += f"""'{info.properties[column]}',"""
+            input_columns += f"""{quote_identifier(column)},"""
+            value = query.add_column_value(
+                info.properties[column],
+                db_column_types[column]['udt_name']
+            )
+            values += f"""{value},"""
 
             db_column_types[column]['used'] = True
 
@@ -751,13 +854,13 @@ async def create_item(
         input_columns = input_columns[:-1]
         values = values[:-1]
 
-        query = f"""
-            INSERT INTO user_data."{table_id}" ({input_columns})
+        query.add(f"""
+            INSERT INTO user_data.{quote_identifier(table_id)} ({input_columns})
             VALUES ({values})
             RETURNING gid;
-        """
+        """)
 
-        result = await con.fetch(query)
+        result = await query.fetch(con)
 
         geojson = {
             "type": info.geometry.type,
@@ -765,16 +868,20 @@ async def create_item(
         }
 
         geom_query = f"""
-            UPDATE user_data."{table_id}"
-            SET geom = ST_GeomFromGeoJSON('{json.dumps(geojson)}')
-            WHERE gid = {result[0]['gid']};
+            UPDATE user_data.{quote_identifier(table_id)}
+            SET geom = ST_GeomFromGeoJSON($1)
+            WHERE gid = $2;
         """
 
-        await con.fetch(geom_query)
+        await con.fetch(geom_query, json.dumps(geojson), result[0]['gid'])
+
+        await utilities.expand_table_metadata(table_id, result[0]['gid'], con)
 
         if os.path.exists(f'{os.getcwd()}/cache/user_data{table_id}'):
             shutil.rmtree(f'{os.getcwd()}/cache/user_data_{table_id}')
 
+        await response_cache.invalidate_table(table_id)
+
         info.properties['gid'] = result[0]['gid']
 
         info.id = result[0]['gid']
@@ -875,53 +982,53 @@ async def item(
 
     async with pool.acquire() as con:
 
-        sql_field_query = f"""
+        sql_field_query = """
             SELECT column_name
             FROM information_schema.columns
-            WHERE table_name = '{table_id}'
+            WHERE table_name = $1
             AND column_name != 'geom';
         """
 
-        db_fields = await con.fetch(sql_field_query)
+        db_fields = await con.fetch(sql_field_query, table_id)
 
         if properties == '*':
             properties = ""
             for field in db_fields:
                 column = field['column_name']
-                properties += f'"{column}",'
+                properties += f'{quote_identifier(column)},'
             properties = properties[:-1]
 
-        results = await utilities.get_table_geojson(
-            table_id=table_id,
-            filter=f"gid = '{id}'",
-            properties=properties,
-            return_geometry=return_geometry,
-            srid=srid,
-            app=request.app
-        )
+    results = await utilities.get_table_geojson(
+        table_id=table_id,
+        filter=QueryBuilder("gid = $1::text::integer", id),
+        properties=properties,
+        return_geometry=return_geometry,
+        srid=srid,
+        app=request.app
+    )
 
-        results['features'][0]['links'] = [
-            {
-                "type": "application/geo+json",
-                "rel": "self",
-                "title": "This document as GeoJSON",
-                "href": request.url._url
-            },
-            {
-                "type": "application/geo+json",
-                "title": "items as GeoJSON",
-                "rel": "items",
-                "href": f"{url}api/v1/collections/{table_id}/items"
-            },
-            {
-                "type": "application/json",
-                "title": f"{table_id}",
-                "rel": "collection",
-                "href": f"{url}api/v1/collections/{table_id}"
-            }
-        ]
+    results['features'][0]['links'] = [
+        {
+            "type": "application/geo+json",
+            "rel": "self",
+            "title": "This document as GeoJSON",
+            "href": request.url._url
+        },
+        {
+            "type": "application/geo+json",
+            "title": "items as GeoJSON",
+            "rel": "items",
+            "href": f"{url}api/v1/collections/{table_id}/items"
+        },
+        {
+            "type": "application/json",
+            "title": f"{table_id}",
+            "rel": "collection",
+            "href": f"{url}api/v1/collections/{table_id}"
+        }
+    ]
 
-        return results['features'][0]
+    return results['features'][0]
 
 @router.put(
     path="/{table_id}/items/{id}",
@@ -994,15 +1101,15 @@ async def update_item(
 
     async with pool.acquire() as con:
 
-        sql_field_query = f"""
-        SELECT column_name, data_type
+        sql_field_query = """
+        SELECT column_name, data_type, udt_name
         FROM information_schema.columns
-        WHERE table_name = '{table_id}'
+        WHERE table_name = $1
         AND column_name != 'geom'
         AND column_name != 'gid';
         """
 
-        db_fields = await con.fetch(sql_field_query)
+        db_fields = await con.fetch(sql_field_query, table_id)
 
         db_columns = []
 
@@ -1012,6 +1119,7 @@ async def update_item(
             db_columns.append(field['column_name'])
             db_column_types[field['column_name']] = {
                 "type": field['data_type'],
+                "udt_name": field['udt_name'],
                 "used": False,
             }
 
@@ -1019,11 +1127,11 @@ async def update_item(
 
         exist_query = f"""
         SELECT count(*)
-        FROM user_data."{table_id}"
-        WHERE gid = {id}
+        FROM user_data.{quote_identifier(table_id)}
+        WHERE gid = $1
         """
 
-        exists = await con.fetchrow(exist_query)
+        exists = await con.fetchrow(exist_query, id)
 
         if exists['count'] == 0:
             raise HTTPException(
@@ -1031,10 +1139,12 @@ async def update_item(
                     detail=f"""Item {info.id} does not exist."""
                 )
 
-        query = f"""
-            UPDATE user_data."{table_id}"
+        query = QueryBuilder(f"""
+            UPDATE user_data.{quote_identifier(table_id)}
             SET 
-        """
+        """)
+
+        set_columns = []
 
         for column in info.properties:
             if column not in db_columns:
@@ -1043,10 +1153,11 @@ async def update_item(
                     detail=f"""Column: {column} is not a column for {table_id}.
                     Please use one of the following columns. {string_columns}"""
                 )
-            if db_column_types[column]['type'] in config.NUMERIC_FIELDS:
-                query += f"{column} = {info.properties[column]},"
-            else:
-                query += f"{column} = '{info.properties[column]}',"
+            value = query.add_column_value(
+                info.properties[column],
+                db_column_types[column]['udt_name']
+            )
+            set_columns.append(f"{quote_identifier(column)} = {value}")
 
             db_column_types[column]['used'] = True
 
@@ -1057,11 +1168,11 @@ async def update_item(
                     detail=f"""Column {column} was not used. Add {column} to your properties."""
                 )
 
-        query = query[:-1]
+        query.add(",".join(set_columns))
 
-        query += f" WHERE gid = {info.id};"
+        query.add(" WHERE gid = $1;", info.id)
 
-        await con.fetch(query)
+        await query.execute(con)
 
         geojson = {
             "type": info.geometry.type,
@@ -1069,16 +1180,20 @@ async def update_item(
         }
 
         geom_query = f"""
-            UPDATE user_data."{table_id}"
-            SET geom = ST_GeomFromGeoJSON('{json.dumps(geojson)}')
-            WHERE gid = {id};
+            UPDATE user_data.{quote_identifier(table_id)}
+            SET geom = ST_GeomFromGeoJSON($1)
+            WHERE gid = $2;
         """
 
-        await con.fetch(geom_query)
+        await con.fetch(geom_query, json.dumps(geojson), id)
+
+        await utilities.expand_table_metadata(table_id, id, con)
 
         if os.path.exists(f'{os.getcwd()}/cache/user_data_{table_id}'):
             shutil.rmtree(f'{os.getcwd()}/cache/user_data_{table_id}')
 
+        await response_cache.invalidate_table(table_id)
+
         return info
 
 @router.patch(
@@ -1152,15 +1267,15 @@ async def modify_item(
 
     async with pool.acquire() as con:
 
-        sql_field_query = f"""
-        SELECT column_name, data_type
+        sql_field_query = """
+        SELECT column_name, data_type, udt_name
         FROM information_schema.columns
-        WHERE table_name = '{table_id}'
+        WHERE table_name = $1
         AND column_name != 'geom'
         AND column_name != 'gid';
         """
 
-        db_fields = await con.fetch(sql_field_query)
+        db_fields = await con.fetch(sql_field_query, table_id)
 
         db_columns = []
 
@@ -1169,18 +1284,19 @@ async def modify_item(
         for field in db_fields:
             db_columns.append(field['column_name'])
             db_column_types[field['column_name']] = {
-                "type": field['data_type']
+                "type": field['data_type'],
+                "udt_name": field['udt_name']
             }
 
         string_columns = ",".join(db_columns)
 
         exist_query = f"""
         SELECT count(*)
-        FROM user_data."{table_id}"
-        WHERE gid = {id}
+        FROM user_data.{quote_identifier(table_id)}
+        WHERE gid = $1
         """
 
-        exists = await con.fetchrow(exist_query)
+        exists = await con.fetchrow(exist_query, id)
 
         if exists['count'] == 0:
             raise HTTPException(
@@ -1188,10 +1304,12 @@ async def modify_item(
                     detail=f"""Item {info.id} does not exist."""
                 )
 
-        query = f"""
-            UPDATE user_data."{table_id}"
+        query = QueryBuilder(f"""
+            UPDATE user_data.{quote_identifier(table_id)}
             SET 
-        """
+        """)
+
+        set_columns = []
 
         for column in info.properties:
             if column not in db_columns:
@@ -1200,16 +1318,17 @@ async def modify_item(
                     detail=f"""Column: {column} is not a column for {table_id}.
                     Please use one of the following columns. {string_columns}"""
                 )
-            if db_column_types[column]['type'] in config.NUMERIC_FIELDS:
-                query += f"{column} = {info.properties[column]},"
-            else:
-                query += f"{column} = '{info.properties[column]}',"
+            value = query.add_column_value(
+                info.properties[column],
+                db_column_types[column]['udt_name']
+            )
+            set_columns.append(f"{quote_identifier(column)} = {value}")
 
-        query = query[:-1]
+        query.add(",".join(set_columns))
 
-        query += f" WHERE gid = {id};"
+        query.add(" WHERE gid = $1;", id)
 
-        await con.fetch(query)
+        await query.execute(con)
 
         geojson = {
             "type": info.geometry.type,
@@ -1217,16 +1336,20 @@ async def modify_item(
         }
 
         geom_query = f"""
-            UPDATE user_data."{table_id}"
-            SET geom = ST_GeomFromGeoJSON('{json.dumps(geojson)}')
-            WHERE gid = {id};
+            UPDATE user_data.{quote_identifier(table_id)}
+            SET geom = ST_GeomFromGeoJSON($1)
+            WHERE gid = $2;
         """
 
-        await con.fetch(geom_query)
+        await con.fetch(geom_query, json.dumps(geojson), id)
+
+        await utilities.expand_table_metadata(table_id, id, con)
 
         if os.path.exists(f'{os.getcwd()}/cache/user_data_{table_id}'):
             shutil.rmtree(f'{os.getcwd()}/cache/user_data_{table_id}')
 
+        await response_cache.invalidate_table(table_id)
+
         return info
 
 @router.delete(
@@ -1290,15 +1413,17 @@ async def delete_item(
 
     async with pool.acquire() as con:
         query = f"""
-            DELETE FROM user_data."{table_id}"
-            WHERE gid = {id};
+            DELETE FROM user_data.{quote_identifier(table_id)}
+            WHERE gid = $1;
         """
 
-        await con.fetch(query)
+        await con.fetch(query, id)
 
         if os.path.exists(f'{os.getcwd()}/cache/user_data_{table_id}'):
             shutil.rmtree(f'{os.getcwd()}/cache/user_data_{table_id}')
 
+        await response_cache.invalidate_table(table_id)
+
         return {"status": True}
 
 @router.get(
@@ -1631,14 +1756,14 @@ async def tiles_metadata(
 
     async with pool.acquire() as con:
 
-        sql_field_query = f"""
+        sql_field_query = """
             SELECT column_name, data_type
             FROM information_schema.columns
-            WHERE table_name = '{table_id}'
+            WHERE table_name = $1
             AND column_name != 'geom';
         """
 
-        db_fields = await con.fetch(sql_field_query)
+        db_fields = await con.fetch(sql_field_query, table_id)
 
         for field in db_fields:
             data_type = 'string'
@@ -1829,6 +1954,18 @@ async def statistics(
         query_filter=Q(table_id=table_id),
         username=username
     )
+
+    cache_key = await response_cache.get_cache_key(
+        endpoint="statistics",
+        table_id=table_id,
+        parameters=info.dict()
+    )
+
+    cached_response = await response_cache.get_response(cache_key)
+
+    if cached_response is not None:
+        return cached_response
+
     pool = request.app.state.database
 
     async with pool.acquire() as con:
@@ -1845,21 +1982,21 @@ async def statistics(
             else:
                 general_stats = True
                 cols.append(f"""
-                {aggregate.type }("{aggregate.column}") as {aggregate.type}_{aggregate.column}
+                {aggregate.type }({quote_identifier(aggregate.column)}) as {quote_identifier(f"{aggregate.type}_{aggregate.column}")}
                 """)
                 col_names.append(f"{aggregate.type}_{aggregate.column}")
 
         if general_stats:
             formatted_columns = ','.join(cols)
-            query = f"""
+            query = QueryBuilder(f"""
                 SELECT {formatted_columns}
-                FROM user_data."{table_id}"
-            """
+                FROM user_data.{quote_identifier(table_id)}
+            """)
 
-            query += await utilities.generate_where_clause(info, con)
+            query.add(await utilities.generate_where_clause(info, table_id, con))
 
             try:
-                data = await con.fetchrow(query)
+                data = await query.fetchrow(con)
             
             except asyncpg.exceptions.UndefinedColumnError:
                 raise HTTPException(
@@ -1873,18 +2010,18 @@ async def statistics(
         if distinct:
             for aggregate in info.aggregate_columns:
                 if aggregate.type == 'distinct':
-                    query = f"""
-                    SELECT DISTINCT("{aggregate.column}"), {aggregate.group_method}("{aggregate.group_column}") 
-                    FROM user_data."{table_id}" """
+                    query = QueryBuilder(f"""
+                    SELECT DISTINCT({quote_identifier(aggregate.column)}), {aggregate.group_method}({quote_identifier(aggregate.group_column)}) 
+                    FROM user_data.{quote_identifier(table_id)} """)
 
-                    query += await utilities.generate_where_clause(info, con)
+                    query.add(await utilities.generate_where_clause(info, table_id, con))
 
-                    query += f"""
-                    GROUP BY "{aggregate.column}"
-                    ORDER BY "{aggregate.group_method}" DESC"""
+                    query.add(f"""
+                    GROUP BY {quote_identifier(aggregate.column)}
+                    ORDER BY {quote_identifier(aggregate.group_method)} DESC""")
 
                     try:
-                        data = await con.fetchrow(query)
+                        data = await query.fetchrow(con)
                     
                     except asyncpg.exceptions.UndefinedColumnError:
                         raise HTTPException(
@@ -1896,11 +2033,15 @@ async def statistics(
                         f"""distinct_{aggregate.column}_{aggregate.group_method}_{aggregate.group_column}"""
                     ] = data
 
-        return {
+        response = {
             "results": final_results,
             "status": "SUCCESS"
         }
 
+        await response_cache.set_response(cache_key, response)
+
+        return response
+
 @router.post(
     path="/{table_id}/bins",
     responses={
@@ -1977,21 +2118,32 @@ async def bins(
         username=username
     )
 
+    cache_key = await response_cache.get_cache_key(
+        endpoint="bins",
+        table_id=table_id,
+        parameters=info.dict()
+    )
+
+    cached_response = await response_cache.get_response(cache_key)
+
+    if cached_response is not None:
+        return cached_response
+
     pool = request.app.state.database
 
     async with pool.acquire() as con:
         results = [
 
         ]
-        query = f"""
-            SELECT MIN("{info.column}"),MAX("{info.column}")
-            FROM user_data."{table_id}"
-        """
+        query = QueryBuilder(f"""
+            SELECT MIN({quote_identifier(info.column)}),MAX({quote_identifier(info.column)})
+            FROM user_data.{quote_identifier(table_id)}
+        """)
 
-        query += await utilities.generate_where_clause(info, con)        
+        query.add(await utilities.generate_where_clause(info, table_id, con))
 
         try:
-            data = await con.fetchrow(query)
+            data = await query.fetchrow(con)
         
         except asyncpg.exceptions.UndefinedColumnError as exc:
             raise HTTPException(
@@ -2001,6 +2153,8 @@ async def bins(
 
         group_size = (data['max'] - data['min']) / info.number_of_bins
 
+        where_clause = await utilities.generate_where_clause(info, table_id, con, True)
+
         for group in range(info.number_of_bins):
             if group == 0:
                 minimum = data['min']
@@ -2008,16 +2162,16 @@ async def bins(
             else:
                 minimum = group*group_size
                 maximum = (group+1)*group_size
-            query = f"""
+            query = QueryBuilder(f"""
                 SELECT COUNT(*)
-                FROM user_data."{table_id}"
-                WHERE "{info.column}" > {minimum}
-                AND "{info.column}" <= {maximum}
-            """
+                FROM user_data.{quote_identifier(table_id)}
+                WHERE {quote_identifier(info.column)} > $1::double precision
+                AND {quote_identifier(info.column)} <= $2::double precision
+            """, float(minimum), float(maximum))
 
-            query += await utilities.generate_where_clause(info, con, True)
+            query.add(where_clause)
 
-            data = await con.fetchrow(query)
+            data = await query.fetchrow(con)
 
             results.append({
                 "min": minimum,
@@ -2025,11 +2179,15 @@ async def bins(
                 "count": data['count']
             })
 
-        return {
+        response = {
             "results": results,
             "status": "SUCCESS"
         }
 
+        await response_cache.set_response(cache_key, response)
+
+        return response
+
 @router.post(
     path="/{table_id}/numeric_breaks",
     responses={
@@ -2106,6 +2264,17 @@ async def numeric_breaks(
         username=username
     )
 
+    cache_key = await response_cache.get_cache_key(
+        endpoint="numeric_breaks",
+        table_id=table_id,
+        parameters=info.dict()
+    )
+
+    cached_response = await response_cache.get_response(cache_key)
+
+    if cached_response is not None:
+        return cached_response
+
     pool = request.app.state.database
 
     async with pool.acquire() as con:
@@ -2114,20 +2283,22 @@ async def numeric_breaks(
         ]
 
         if info.break_type == "quantile":
-            query = f"""
-                SELECT {info.break_type}_bins(array_agg(CAST("{info.column}" AS integer)), {info.number_of_breaks}) 
-                FROM user_data."{table_id}"
-            """
+            query = QueryBuilder(f"""
+                SELECT {info.break_type}_bins(array_agg(CAST({quote_identifier(info.column)} AS integer)), $1::integer) 
+                FROM user_data.{quote_identifier(table_id)}
+            """, info.number_of_breaks)
         else:
-            query = f"""
-                SELECT {info.break_type}_bins(array_agg("{info.column}"), {info.number_of_breaks}) 
-                FROM user_data."{table_id}"
-            """
+            query = QueryBuilder(f"""
+                SELECT {info.break_type}_bins(array_agg({quote_identifier(info.column)}), $1::integer) 
+                FROM user_data.{quote_identifier(table_id)}
+            """, info.number_of_breaks)
 
-        query += await utilities.generate_where_clause(info, con)
+        where_clause = await utilities.generate_where_clause(info, table_id, con)
+
+        query.add(where_clause)
 
         try:
-            break_points = await con.fetchrow(query)
+            break_points = await query.fetchrow(con)
         
         except asyncpg.exceptions.UndefinedColumnError as exc:
             raise HTTPException(
@@ -2135,23 +2306,25 @@ async def numeric_breaks(
                 detail=f'Column: {info.column} does not exist for {table_id}.'
             ) from exc
 
-        min_query = f"""
-            SELECT MIN("{info.column}")
-            FROM user_data."{table_id}"
-        """
+        min_query = QueryBuilder(f"""
+            SELECT MIN({quote_identifier(info.column)})
+            FROM user_data.{quote_identifier(table_id)}
+        """)
 
-        min_query += await utilities.generate_where_clause(info, con)
+        min_query.add(where_clause)
 
-        min_number = await con.fetchrow(min_query)
+        min_number = await min_query.fetchrow(con)
 
-        max_query = f"""
-            SELECT MAX("{info.column}")
-            FROM user_data."{table_id}"
-        """
+        max_query = QueryBuilder(f"""
+            SELECT MAX({quote_identifier(info.column)})
+            FROM user_data.{quote_identifier(table_id)}
+        """)
+
+        max_query.add(where_clause)
 
-        max_query += await utilities.generate_where_clause(info, con)
+        max_table_number = await max_query.fetchrow(con)
 
-        max_table_number = await con.fetchrow(max_query)
+        count_where_clause = await utilities.generate_where_clause(info, table_id, con, True)
 
         for index, max_number in enumerate(break_points[f"{info.break_type}_bins"]):
             if index == 0:
@@ -2163,16 +2336,16 @@ async def numeric_breaks(
             else:
                 minimum = break_points[f"{info.break_type}_bins"][index-1]
                 maximum = max_number
-            query = f"""
+            query = QueryBuilder(f"""
                 SELECT COUNT(*)
-                FROM user_data."{table_id}"
-                WHERE "{info.column}" > {minimum}
-                AND "{info.column}" <= {maximum}
-            """
+                FROM user_data.{quote_identifier(table_id)}
+                WHERE {quote_identifier(info.column)} > $1::double precision
+                AND {quote_identifier(info.column)} <= $2::double precision
+            """, float(minimum), float(maximum))
 
-            query += await utilities.generate_where_clause(info, con, True)
+            query.add(count_where_clause)
 
-            data = await con.fetchrow(query)
+            data = await query.fetchrow(con)
 
             results.append({
                 "min": minimum,
@@ -2180,11 +2353,15 @@ async def numeric_breaks(
                 "count": data['count']
             })
 
-        return {
+        response = {
             "results": results,
             "status": "SUCCESS"
         }
 
+        await response_cache.set_response(cache_key, response)
+
+        return response
+
 @router.post(
     path="/{table_id}/custom_break_values",
     responses={
@@ -2261,6 +2438,17 @@ async def custom_break_values(
         username=username
     )
 
+    cache_key = await response_cache.get_cache_key(
+        endpoint="custom_break_values",
+        table_id=table_id,
+        parameters=info.dict()
+    )
+
+    cached_response = await response_cache.get_response(cache_key)
+
+    if cached_response is not None:
+        return cached_response
+
     pool = request.app.state.database
 
     async with pool.acquire() as con:
@@ -2268,21 +2456,23 @@ async def custom_break_values(
 
         ]
 
+        where_clause = await utilities.generate_where_clause(info, table_id, con, True)
+
         for break_range in info.breaks:
             minimum = break_range.min
             maximum = break_range.max
 
-            query = f"""
+            query = QueryBuilder(f"""
                 SELECT COUNT(*)
-                FROM user_data."{table_id}"
-                WHERE "{info.column}" > {minimum}
-                AND "{info.column}" <= {maximum}
-            """
+                FROM user_data.{quote_identifier(table_id)}
+                WHERE {quote_identifier(info.column)} > $1::double precision
+                AND {quote_identifier(info.column)} <= $2::double precision
+            """, float(minimum), float(maximum))
 
-            query += await utilities.generate_where_clause(info, con, True)
+            query.add(where_clause)
 
             try:
-                data = await con.fetchrow(query)
+                data = await query.fetchrow(con)
             
             except asyncpg.exceptions.UndefinedColumnError as exc:
                 raise HTTPException(
@@ -2296,11 +2486,15 @@ async def custom_break_values(
                 "count": data['count']
             })
 
-        return {
+        response = {
             "results": results,
             "status": "SUCCESS"
         }
 
+        await response_cache.set_response(cache_key, response)
+
+        return response
+
 @router.get(
     path="/{table_id}/autocomplete/",
     responses={
@@ -2366,6 +2560,23 @@ async def autocomplete(
         username=username
     )
 
+    cache_key = await response_cache.get_cache_key(
+        endpoint="autocomplete",
+        table_id=table_id,
+        parameters={
+            "column": column,
+            "q": q,
+            "limit": limit
+        }
+    )
+
+    cached_response = await response_cache.get_response(cache_key)
+
+    if cached_response is not None:
+        column_usage.record_column_usage(table_id, [column], "autocomplete", 0)
+
+        return cached_response
+
     pool = request.app.state.database
 
     async with pool.acquire() as con:
@@ -2373,15 +2584,17 @@ async def autocomplete(
         results = []
 
         query = f"""
-            SELECT distinct("{column}")
-            FROM user_data.{table_id}
-            WHERE "{column}" ILIKE '%{q}%'
-            ORDER BY "{column}"
-            LIMIT {limit}
+            SELECT distinct({quote_identifier(column)})
+            FROM user_data.{quote_identifier(table_id)}
+            WHERE {quote_identifier(column)} ILIKE $1
+            ORDER BY {quote_identifier(column)}
+            LIMIT $2
         """
 
+        start = time.perf_counter()
+
         try:
-            data = await con.fetch(query)
+            data = await con.fetch(query, f"%{q}%", limit)
         
         except asyncpg.exceptions.UndefinedColumnError:
             raise HTTPException(
@@ -2389,9 +2602,18 @@ async def autocomplete(
                 detail=f'Column: {column} does not exist for {table_id}.'
             )
 
+        column_usage.record_column_usage(
+            table_id,
+            [column],
+            "autocomplete",
+            (time.perf_counter() - start) * 1000
+        )
+
         for row in data:
             results.append(row[column])
 
+        await response_cache.set_response(cache_key, results)
+
         return results
 
 @router.get(
@@ -2462,6 +2684,9 @@ async def closest_features(
     filter: str="",
     srid: int=4326,
     return_geometry: bool=True,
+    precision: int=None,
+    simplify: float=None,
+    zoom: int=None,
     username: int=Depends(authentication_handler.JWTBearer())
 ):
     """
@@ -2477,9 +2702,27 @@ async def closest_features(
         username=username
     )
 
-    properties += f", (geom <-> ST_SetSRID(ST_MakePoint( {longitude}, {latitude} ), 4326)) * 1000 AS distance_in_kilometers"
+    utilities.validate_precision(precision)
+
+    simplify = utilities.get_simplify_tolerance(
+        simplify=simplify,
+        zoom=zoom
+    )
 
-    if filter is not None:
+    if properties not in ["*", ""]:
+        properties = ",".join(quote_identifier(property) for property in properties.split(","))
+
+    properties = QueryBuilder(properties).add(
+        ", (geom <-> ST_SetSRID(ST_MakePoint( $1::double precision, $2::double precision ), 4326)) * 1000 AS distance_in_kilometers",
+        longitude,
+        latitude
+    )
+
+    filter_columns = []
+
+    like_columns = []
+
+    if filter:
 
         db_fields = await utilities.get_table_columns(
             table_id=table_id,
@@ -2490,20 +2733,12 @@ async def closest_features(
 
         for field in db_fields:
             field_mapping[field] = field
-        try:
-            ast = parse(filter)
-        except lark.exceptions.UnexpectedToken as exc:
-            raise HTTPException(
-                status_code=400,
-                detail="Invalid operator used in filter."
-            ) from exc
-        try:
-            filter = to_sql_where(ast, field_mapping)
-        except KeyError as exc:
-            raise HTTPException(
-                status_code=400,
-                detail=f"""Invalid column in filter parameter for {table_id}."""
-            ) from exc
+
+        filter_columns = utilities.get_cql_filter_columns(filter, field_mapping)
+        like_columns = utilities.get_cql_like_columns(filter, field_mapping)
+        filter = utilities.get_cql_where_clause(filter, field_mapping)
+
+    start = time.perf_counter()
 
     results = await utilities.get_table_geojson(
         table_id=table_id,
@@ -2516,9 +2751,17 @@ async def closest_features(
         filter=filter,
         srid=srid,
         return_geometry=return_geometry,
+        precision=precision,
+        simplify=simplify,
         app=request.app
     )    
 
+    query_time_in_ms = (time.perf_counter() - start) * 1000
+
+    column_usage.record_column_usage(table_id, filter_columns, "filter", query_time_in_ms)
+
+    column_usage.record_column_usage(table_id, like_columns, "like", query_time_in_ms)
+
     return results
 
 @router.post(
@@ -2581,8 +2824,8 @@ async def add_column(
     async with pool.acquire() as con:
 
         query = f"""
-            ALTER TABLE user_data."{table_id}"
-            ADD COLUMN "{info.column_name}" {info.column_type};
+            ALTER TABLE user_data.{quote_identifier(table_id)}
+            ADD COLUMN {quote_identifier(info.column_name)} {info.column_type};
         """
 
         await con.fetch(query)
@@ -2590,6 +2833,8 @@ async def add_column(
         if os.path.exists(f'{os.getcwd()}/cache/user_data_{table_id}'):
             shutil.rmtree(f'{os.getcwd()}/cache/user_data_{table_id}')
 
+        await response_cache.invalidate_table(table_id)
+
         return {"status": True}
 
 @router.delete(
@@ -2652,8 +2897,8 @@ async def delete_column(
     async with pool.acquire() as con:
 
         query = f"""
-            ALTER TABLE user_data."{table_id}"
-            DROP COLUMN IF EXISTS "{column}";
+            ALTER TABLE user_data.{quote_identifier(table_id)}
+            DROP COLUMN IF EXISTS {quote_identifier(column)};
         """
 
         await con.fetch(query)
@@ -2661,4 +2906,75 @@ async def delete_column(
         if os.path.exists(f'{os.getcwd()}/cache/user_data_{table_id}'):
             shutil.rmtree(f'{os.getcwd()}/cache/user_data_{table_id}')
 
-        return {"status": True}
\ No newline at end of file
+        await response_cache.invalidate_table(table_id)
+
+        return {"status": True}
+
+@router.get(
+    path="/{table_id}/index_recommendations",
+    responses={
+        200: {
+            "description": "Successful Response",
+            "content": {
+                "application/json": {
+                    "example": [
+                        {
+                            "column": "state_name",
+                            "usage_types": ["filter", "autocomplete"],
+                            "count": 1250,
+                            "average_time_in_ms": 84.2,
+                            "index_type": "trigram",
+                            "indexed": False,
+                            "recommended": True
+                        }
+                    ]
+                }
+            }
+        },
+        403: {
+            "description": "Forbidden",
+            "content": {
+                "application/json": {
+                    "example": {"detail": "No access to table."}
+                }
+            }
+        },
+        404: {
+            "description": "Not Found",
+            "content": {
+                "application/json": {
+                    "example": {"detail": "Table does not exist."}
+                }
+            }
+        },
+        500: {
+            "description": "Internal Server Error",
+            "content": {
+                "application/json": {
+                    "Internal Server Error"
+                }
+            }
+        }
+    }
+)
+async def index_recommendations(
+    table_id: str,
+    request: Request,
+    username: int=Depends(authentication_handler.JWTBearer())
+):
+    """
+    Get column usage and index recommendations for a table.
+    More information at https://docs.qwikgeo.com/collections/#index-recommendations
+    """
+
+    await utilities.validate_item_access(
+        model_name="Table",
+        query_filter=Q(table_id=table_id),
+        username=username,
+        write_access=True
+    )
+
+    return await column_usage.get_index_recommendations(
+        table_id=table_id,
+        app=request.app
+    )
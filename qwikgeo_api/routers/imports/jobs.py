@@ -0,0 +1,325 @@
+"""QwikGeo API - Import Jobs"""
+
+import json
+import asyncio
+import datetime
+import logging
+from fastapi import FastAPI, HTTPException, status
+from tortoise import timezone
+from tortoise.expressions import Q
+
+import qwikgeo_api.routers.imports.utilities as utilities
+from qwikgeo_api import db_models
+from qwikgeo_api import config
+from qwikgeo_api import utilities as qwikgeo_api_utilities
+
+logger = logging.getLogger(__name__)
+
+JOB_TYPES = {
+    "get_arcgis_data": {
+        "function": utilities.get_arcgis_data,
+        "priority": 0,
+        "retry": True
+    },
+    "upload_geographic_file": {
+        "function": utilities.upload_geographic_file,
+        "priority": 1,
+        "retry": False
+    },
+    "import_geographic_data_from_csv": {
+        "function": utilities.import_geographic_data_from_csv,
+        "priority": 1,
+        "retry": False
+    },
+    "import_point_data_from_csv": {
+        "function": utilities.import_point_data_from_csv,
+        "priority": 1,
+        "retry": False
+    },
+    "import_geographic_data_from_json_file": {
+        "function": utilities.import_geographic_data_from_json_file,
+        "priority": 1,
+        "retry": False
+    },
+    "import_point_data_from_json_file": {
+        "function": utilities.import_point_data_from_json_file,
+        "priority": 1,
+        "retry": False
+    },
+    "import_geographic_data_from_json_url": {
+        "function": utilities.import_geographic_data_from_json_url,
+        "priority": 0,
+        "retry": True
+    },
+    "import_point_data_from_json_url": {
+        "function": utilities.import_point_data_from_json_url,
+        "priority": 0,
+        "retry": True
+    },
+    "import_geojson_from_url": {
+        "function": utilities.import_geojson_from_url,
+        "priority": 0,
+        "retry": True
+    }
+}
+
+def serialize_status(
+    import_status: dict
+) -> dict:
+    """
+    Method to convert the status of an import into json serializable values.
+
+    """
+
+    serialized_status = {}
+
+    for key, value in import_status.items():
+        if isinstance(value, datetime.timedelta):
+            value = value.total_seconds()
+        elif isinstance(value, (datetime.datetime, datetime.date)):
+            value = value.isoformat()
+        serialized_status[key] = value
+
+    return serialized_status
+
+async def validate_import_queue_capacity() -> None:
+    """
+    Method to validate that the import queue can accept another job.
+
+    """
+
+    pending_jobs = await db_models.ImportJob.filter(status="PENDING").count()
+
+    if pending_jobs >= config.MAX_PENDING_IMPORT_JOBS:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many imports are waiting to run. Please try again later."
+        )
+
+async def validate_merge(
+    merge: object,
+    username: str
+) -> dict:
+    """
+    Method to validate that an import can be merged into an existing table
+    and return the merge parameters of the job.
+
+    """
+
+    if merge is None:
+        return None
+
+    if merge.mode not in ["append", "upsert"]:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Please select a valid merge mode. append, upsert"
+        )
+
+    if merge.mode == "upsert" and not merge.key_columns:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Please provide key_columns to upsert rows."
+        )
+
+    await qwikgeo_api_utilities.validate_item_access(
+        model_name="Table",
+        query_filter=Q(table_id=merge.table_id),
+        username=username,
+        write_access=True
+    )
+
+    return merge.dict()
+
+async def create_import_job(
+    process_id: str,
+    job_type: str,
+    username: str,
+    parameters: dict
+) -> None:
+    """
+    Method to add an import to the job queue.
+    Imports that merge into an existing table are not retried, since a merge
+    that committed before the job failed would be applied twice.
+
+    """
+
+    retry = JOB_TYPES[job_type]['retry'] and parameters.get('merge') is None
+
+    await db_models.ImportJob.create(
+        process_id=process_id,
+        job_type=job_type,
+        username=username,
+        parameters=parameters,
+        priority=JOB_TYPES[job_type]['priority'],
+        max_attempts=config.IMPORT_JOB_MAX_ATTEMPTS if retry else 1,
+        result={}
+    )
+
+async def get_import_job_status(
+    process_id: str
+) -> dict:
+    """
+    Method to return the status of an import job.
+
+    """
+
+    job = await db_models.ImportJob.get_or_none(process_id=process_id)
+
+    if job is None:
+        return {"status": "UNKNOWN", "error": "This process_id does not exist."}
+
+    return {
+        **job.result,
+        "status": job.status
+    }
+
+async def requeue_stale_import_jobs(
+    app: FastAPI
+) -> None:
+    """
+    Method to requeue running jobs whose worker stopped sending heartbeats.
+    Jobs without attempts left are marked as failed.
+
+    """
+
+    pool = app.state.database
+
+    async with pool.acquire() as con:
+        await con.execute("""
+        UPDATE importjob
+        SET status = CASE WHEN attempts < max_attempts THEN 'PENDING' ELSE 'FAILURE' END,
+        result = result || '{"error": "The import stopped unexpectedly."}'::jsonb,
+        modified_time = now()
+        WHERE status = 'RUNNING'
+        AND modified_time < now() - make_interval(secs => $1);
+        """, config.IMPORT_JOB_STALE_AFTER_IN_SECONDS)
+
+async def claim_import_job(
+    app: FastAPI
+) -> object:
+    """
+    Method to claim the next import job or return None.
+    Claims are serialized with an advisory lock so no more than
+    MAX_RUNNING_IMPORT_JOBS run across every worker.
+
+    """
+
+    pool = app.state.database
+
+    async with pool.acquire() as con:
+        async with con.transaction():
+            await con.execute("SELECT pg_advisory_xact_lock(hashtext('importjob'));")
+
+            return await con.fetchrow("""
+            UPDATE importjob
+            SET status = 'RUNNING',
+            attempts = attempts + 1,
+            started_time = now(),
+            modified_time = now()
+            WHERE process_id = (
+                SELECT process_id
+                FROM importjob
+                WHERE status = 'PENDING'
+                AND available_time <= now()
+                ORDER BY priority DESC, created_time
+                LIMIT 1
+                FOR UPDATE SKIP LOCKED
+            )
+            AND (
+                SELECT COUNT(*)
+                FROM importjob
+                WHERE status = 'RUNNING'
+            ) < $1
+            RETURNING process_id, job_type, parameters, attempts, max_attempts;
+            """, config.MAX_RUNNING_IMPORT_JOBS)
+
+async def run_import_job(
+    job: object,
+    app: FastAPI
+) -> None:
+    """
+    Method to run an import job and store its outcome.
+    The status of the job is written to the database on an interval while it runs,
+    and the import is cancelled before the job is given up on.
+
+    """
+
+    process_id = job['process_id']
+
+    utilities.import_processes[process_id] = {
+        "status": "RUNNING"
+    }
+
+    task = asyncio.ensure_future(JOB_TYPES[job['job_type']]['function'](
+        process_id=process_id,
+        app=app,
+        **json.loads(job['parameters'])
+    ))
+
+    try:
+        while not task.done():
+            await asyncio.wait({task}, timeout=config.IMPORT_JOB_HEARTBEAT_INTERVAL_IN_SECONDS)
+
+            if not task.done():
+                try:
+                    await db_models.ImportJob.filter(process_id=process_id).update(
+                        result=serialize_status(utilities.import_processes[process_id]),
+                        modified_time=timezone.now()
+                    )
+                except Exception:
+                    logger.exception("Failed to save the status of import job %s.", process_id)
+
+        task.result()
+    except Exception as error:
+        utilities.import_processes[process_id]['status'] = "FAILURE"
+        utilities.import_processes[process_id]['error'] = str(error)
+    finally:
+        if not task.done():
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    result = serialize_status(utilities.import_processes.pop(process_id))
+
+    job_status = result.pop("status")
+
+    available_time = timezone.now()
+
+    if job_status != "SUCCESS" and job['attempts'] < job['max_attempts']:
+        job_status = "PENDING"
+        available_time += datetime.timedelta(
+            seconds=config.IMPORT_JOB_RETRY_DELAY_IN_SECONDS * 2 ** (job['attempts'] - 1)
+        )
+    elif job_status != "SUCCESS":
+        job_status = "FAILURE"
+
+    await db_models.ImportJob.filter(process_id=process_id).update(
+        status=job_status,
+        result=result,
+        available_time=available_time,
+        modified_time=timezone.now()
+    )
+
+async def run_import_worker(
+    app: FastAPI
+) -> None:
+    """
+    Method to claim and run import jobs until the application shuts down.
+    Errors are logged and the worker polls again after IMPORT_JOB_POLL_INTERVAL_IN_SECONDS.
+
+    """
+
+    while True:
+        try:
+            await requeue_stale_import_jobs(app)
+
+            job = await claim_import_job(app)
+
+            if job is None:
+                await asyncio.sleep(config.IMPORT_JOB_POLL_INTERVAL_IN_SECONDS)
+                continue
+
+            await run_import_job(job, app)
+        except Exception:
+            logger.exception("Import worker failed to run a job.")
+
+            await asyncio.sleep(config.IMPORT_JOB_POLL_INTERVAL_IN_SECONDS)
@@ -1,5 +1,6 @@
 """QwikGeo API - Imports - Models"""
 
+from typing import List
 from pydantic import BaseModel, Field
 
 class BaseResponseModel(BaseModel):
@@ -12,6 +13,18 @@ class BaseResponseModel(BaseModel):
         default="https://api.qwikgeo.com/api/v1/analysis/status/472e29dc-91a8-41d3-b05f-cee34006e3f7"
     )
 
+class MergeModel(BaseModel):
+    """Model for importing into an existing table"""
+
+    table_id: str = Field(
+        title="The table to add the imported rows to."
+    )
+    mode: str = Field(
+        default="append",
+        title="Either append to add every row or upsert to update rows that match on key_columns."
+    )
+    key_columns: list=[]
+
 class ArcgisModel(BaseModel):
     """Model for importing arcgis data"""
 
@@ -35,6 +48,7 @@ class ArcgisModel(BaseModel):
     read_access_list: list=[]
     write_access_list: list=[]
     searchable: bool=True
+    merge: MergeModel = None
 
 class PointJsonUrl(BaseModel):
     """Model for importing json data with point data"""
@@ -54,6 +68,7 @@ class PointJsonUrl(BaseModel):
     read_access_list: list=[]
     write_access_list: list=[]
     searchable: bool=True
+    merge: MergeModel = None
 
 class GeographicJsonUrl(BaseModel):
     """Model for importing json data with geographic boundaries"""
@@ -75,6 +90,7 @@ class GeographicJsonUrl(BaseModel):
     read_access_list: list=[]
     write_access_list: list=[]
     searchable: bool=True
+    merge: MergeModel = None
 
 class GeojsonUrl(BaseModel):
     """Model for importing geojson data from a url"""
@@ -91,3 +107,45 @@ class GeojsonUrl(BaseModel):
     read_access_list: list=[]
     write_access_list: list=[]
     searchable: bool=True
+    merge: MergeModel = None
+
+class UploadFileModel(BaseModel):
+    """Model for a file within a resumable upload"""
+
+    filename: str = Field(
+        title="The name of the file."
+    )
+    size: int = Field(
+        title="The size of the file in bytes."
+    )
+
+class UploadSessionModel(BaseModel):
+    """Model for creating a resumable upload"""
+
+    import_type: str = Field(
+        title="The type of import to run once the upload is complete."
+    )
+    files: List[UploadFileModel]
+
+class UploadFinalizeModel(BaseModel):
+    """Model for starting the import of a resumable upload"""
+
+    title: str = Field(
+        title="The name of the dataset within GeoPortal."
+    )
+    tags: list=[]
+    description: str = Field(
+        title="A description about the dataset.",
+        default=""
+    )
+    read_access_list: list=[]
+    write_access_list: list=[]
+    searchable: bool=True
+    merge: MergeModel = None
+    map_name: str = None
+    map_column: str = None
+    map_columns: list = None
+    table_column: str = None
+    table_columns: list = None
+    latitude: str = None
+    longitude: str = None
@@ -3,13 +3,15 @@
 import os
 import json
 from typing import List
-from fastapi import File, UploadFile, Depends, HTTPException, APIRouter, BackgroundTasks, Request, Form, status
+from fastapi import File, UploadFile, Depends, HTTPException, APIRouter, Request, Form, status
 import aiofiles
 import aiohttp
 from tortoise.expressions import Q
+from tortoise.transactions import in_transaction
 
-import qwikgeo_api.routers.imports.utilities as utilities
 import qwikgeo_api.routers.imports.models as models
+import qwikgeo_api.routers.imports.jobs as jobs
+import qwikgeo_api.routers.imports.uploads as uploads
 from qwikgeo_api import authentication_handler
 from qwikgeo_api import utilities as qwikgeo_api_utilities
 
@@ -35,7 +37,7 @@ router = APIRouter()
         },
     }
 )
-def import_status(
+async def import_status(
     process_id: str,
     username: int=Depends(authentication_handler.JWTBearer())
 ):
@@ -44,9 +46,7 @@ def import_status(
     https://docs.qwikgeo.com/imports/#import-status
     """
 
-    if process_id not in utilities.import_processes:
-        return {"status": "UNKNOWN", "error": "This process_id does not exist."}
-    return utilities.import_processes[process_id]
+    return await jobs.get_import_job_status(process_id)
 
 @router.post(
     path="/arcgis_service",
@@ -55,7 +55,6 @@ def import_status(
 async def import_arcgis_service(
     info: models.ArcgisModel,
     request: Request,
-    background_tasks: BackgroundTasks,
     username: int=Depends(authentication_handler.JWTBearer())
 ):
     """
@@ -63,6 +62,10 @@ async def import_arcgis_service(
     https://docs.qwikgeo.com/imports/#arcgis-service
     """
 
+    await jobs.validate_import_queue_capacity()
+
+    merge = await jobs.validate_merge(info.merge, username)
+
     service_url = f"{info.url}?f=json"
 
     if info.token is not None:
@@ -111,25 +114,24 @@ async def import_arcgis_service(
 
                     process_url += f"api/v1/imports/status/{process_id}"
 
-                    utilities.import_processes[process_id] = {
-                        "status": "PENDING"
-                    }
-
-                    background_tasks.add_task(
-                        utilities.get_arcgis_data,
-                        url=info.url,
-                        token=info.token,
-                        filter=info.filter,
-                        table_id=table_id,
+                    await jobs.create_import_job(
                         process_id=process_id,
+                        job_type="get_arcgis_data",
                         username=username,
-                        title=info.title,
-                        description=info.description,
-                        tags=info.tags,
-                        read_access_list=info.read_access_list,
-                        write_access_list=info.write_access_list,
-                        searchable=info.searchable,
-                        app=request.app
+                        parameters={
+                            "url": info.url,
+                            "token": info.token,
+                            "filter": info.filter,
+                            "table_id": table_id,
+                            "username": username,
+                            "title": info.title,
+                            "description": info.description,
+                            "tags": info.tags,
+                            "read_access_list": info.read_access_list,
+                            "write_access_list": info.write_access_list,
+                            "searchable": info.searchable,
+                            "merge": merge
+                        }
                     )
 
                     return {
@@ -162,7 +164,6 @@ async def import_arcgis_service(
 )
 async def import_geographic_data_from_geographic_file(
     request: Request,
-    background_tasks: BackgroundTasks,
     title: str = Form(...),
     description: str= Form(...),
     files: List[UploadFile] = File(...),
@@ -177,6 +178,8 @@ async def import_geographic_data_from_geographic_file(
     https://docs.qwikgeo.com/imports/#geographic-data-from-geographic-file
     """
 
+    await jobs.validate_import_queue_capacity()
+
     new_table_id = qwikgeo_api_utilities.get_new_table_id()
 
     process_id = qwikgeo_api_utilities.get_new_process_id()
@@ -218,23 +221,21 @@ async def import_geographic_data_from_geographic_file(
                 detail="There was an error uploading the file(s)"
             )
 
-    utilities.import_processes[process_id] = {
-        "status": "PENDING"
-    }
-
-    background_tasks.add_task(
-        utilities.upload_geographic_file,
-        file_path=file_path,
-        new_table_id=new_table_id,
+    await jobs.create_import_job(
         process_id=process_id,
+        job_type="upload_geographic_file",
         username=username,
-        title=title,
-        description=description,
-        tags=tags,
-        read_access_list=read_access_list,
-        write_access_list=write_access_list,
-        searchable=searchable,
-        app=request.app
+        parameters={
+            "file_path": file_path,
+            "new_table_id": new_table_id,
+            "username": username,
+            "title": title,
+            "description": description,
+            "tags": tags,
+            "read_access_list": read_access_list,
+            "write_access_list": write_access_list,
+            "searchable": searchable
+        }
     )
 
     return models.BaseResponseModel(
@@ -260,7 +261,6 @@ async def import_geographic_data_from_geographic_file(
 )
 async def import_geographic_data_from_csv(
     request: Request,
-    background_tasks: BackgroundTasks,
     map_name: str = Form(...),
     table_column: str = Form(...),
     title: str = Form(...),
@@ -280,6 +280,8 @@ async def import_geographic_data_from_csv(
     https://docs.qwikgeo.com/imports/#geographic-data-from-csv
     """
 
+    await jobs.validate_import_queue_capacity()
+
     valid_file_type = False
 
     valid_file_types = ["csv"]
@@ -326,28 +328,26 @@ async def import_geographic_data_from_csv(
                 detail="There was an error uploading the file(s)"
             )
 
-    utilities.import_processes[process_id] = {
-        "status": "PENDING"
-    }
-
-    background_tasks.add_task(
-        utilities.import_geographic_data_from_csv,
-        file_path=file_path,
-        new_table_id=new_table_id,
-        map_column=map_column,
-        table_column=table_column,
-        map_columns=json.loads(map_columns[0]),
-        table_columns=json.loads(table_columns[0]),
-        map_name=map_name,
+    await jobs.create_import_job(
         process_id=process_id,
-        app=request.app,
+        job_type="import_geographic_data_from_csv",
         username=username,
-        title=title,
-        description=description,
-        tags=tags,
-        read_access_list=read_access_list,
-        write_access_list=write_access_list,
-        searchable=searchable
+        parameters={
+            "file_path": file_path,
+            "new_table_id": new_table_id,
+            "map_column": map_column,
+            "table_column": table_column,
+            "map_columns": json.loads(map_columns[0]),
+            "table_columns": json.loads(table_columns[0]),
+            "map_name": map_name,
+            "username": username,
+            "title": title,
+            "description": description,
+            "tags": tags,
+            "read_access_list": read_access_list,
+            "write_access_list": write_access_list,
+            "searchable": searchable
+        }
     )
 
     return {
@@ -371,7 +371,6 @@ async def import_geographic_data_from_csv(
 )
 async def import_point_data_from_csv(
     request: Request,
-    background_tasks: BackgroundTasks,
     latitude: str = Form(...),
     longitude: str = Form(...),
     table_columns: List = Form(...),
@@ -389,6 +388,8 @@ async def import_point_data_from_csv(
     https://docs.qwikgeo.com/imports/#point-data-from-csv
     """
 
+    await jobs.validate_import_queue_capacity()
+
     valid_file_type = False
 
     valid_file_types = ["csv"]
@@ -430,26 +431,24 @@ async def import_point_data_from_csv(
             )
 
 
-    utilities.import_processes[process_id] = {
-        "status": "PENDING"
-    }
-
-    background_tasks.add_task(
-        utilities.import_point_data_from_csv,
-        file_path=file_path,
-        new_table_id=new_table_id,
-        latitude=latitude,
-        longitude=longitude,
-        table_columns=json.loads(table_columns[0]),
+    await jobs.create_import_job(
         process_id=process_id,
-        app=request.app,
+        job_type="import_point_data_from_csv",
         username=username,
-        title=title,
-        description=description,
-        tags=tags,
-        read_access_list=read_access_list,
-        write_access_list=write_access_list,
-        searchable=searchable
+        parameters={
+            "file_path": file_path,
+            "new_table_id": new_table_id,
+            "latitude": latitude,
+            "longitude": longitude,
+            "table_columns": json.loads(table_columns[0]),
+            "username": username,
+            "title": title,
+            "description": description,
+            "tags": tags,
+            "read_access_list": read_access_list,
+            "write_access_list": write_access_list,
+            "searchable": searchable
+        }
     )
 
     return {
@@ -473,7 +472,6 @@ async def import_point_data_from_csv(
 )
 async def import_geographic_data_from_json_file(
     request: Request,
-    background_tasks: BackgroundTasks,
     map_name: str = Form(...),
     map_column: str = Form(...),
     map_columns: List = Form(...),
@@ -493,6 +491,8 @@ async def import_geographic_data_from_json_file(
     https://docs.qwikgeo.com/imports/#geographic-data-from-json-file
     """
 
+    await jobs.validate_import_queue_capacity()
+
     valid_file_type = False
 
     valid_file_types = ["json"]
@@ -539,28 +539,26 @@ async def import_geographic_data_from_json_file(
                 detail="There was an error uploading the file(s)"
             )
 
-    utilities.import_processes[process_id] = {
-        "status": "PENDING"
-    }
-
-    background_tasks.add_task(
-        utilities.import_geographic_data_from_json_file,
-        file_path=file_path,
-        new_table_id=new_table_id,
-        map_column=map_column,
-        table_column=table_column,
-        map_columns=json.loads(map_columns[0]),
-        table_columns=json.loads(table_columns[0]),
-        map_name=map_name,
+    await jobs.create_import_job(
         process_id=process_id,
-        app=request.app,
+        job_type="import_geographic_data_from_json_file",
         username=username,
-        title=title,
-        description=description,
-        tags=tags,
-        read_access_list=read_access_list,
-        write_access_list=write_access_list,
-        searchable=searchable
+        parameters={
+            "file_path": file_path,
+            "new_table_id": new_table_id,
+            "map_column": map_column,
+            "table_column": table_column,
+            "map_columns": json.loads(map_columns[0]),
+            "table_columns": json.loads(table_columns[0]),
+            "map_name": map_name,
+            "username": username,
+            "title": title,
+            "description": description,
+            "tags": tags,
+            "read_access_list": read_access_list,
+            "write_access_list": write_access_list,
+            "searchable": searchable
+        }
     )
 
     return {
@@ -584,7 +582,6 @@ async def import_geographic_data_from_json_file(
 )
 async def import_point_data_from_json_file(
     request: Request,
-    background_tasks: BackgroundTasks,
     latitude: str = Form(...),
     longitude: str = Form(...),
     table_columns: List = Form(...),
@@ -602,6 +599,8 @@ async def import_point_data_from_json_file(
     https://docs.qwikgeo.com/imports/#point-data-from-json-file
     """
 
+    await jobs.validate_import_queue_capacity()
+
     valid_file_type = False
 
     valid_file_types = ["json"]
@@ -642,26 +641,24 @@ async def import_point_data_from_json_file(
                 detail="There was an error uploading the file(s)"
             )
 
-    utilities.import_processes[process_id] = {
-        "status": "PENDING"
-    }
-
-    background_tasks.add_task(
-        utilities.import_point_data_from_json_file,
-        file_path=file_path,
-        new_table_id=new_table_id,
-        latitude=latitude,
-        longitude=longitude,
-        table_columns=json.loads(table_columns[0]),
+    await jobs.create_import_job(
         process_id=process_id,
-        app=request.app,
+        job_type="import_point_data_from_json_file",
         username=username,
-        title=title,
-        description=description,
-        tags=tags,
-        read_access_list=read_access_list,
-        write_access_list=write_access_list,
-        searchable=searchable
+        parameters={
+            "file_path": file_path,
+            "new_table_id": new_table_id,
+            "latitude": latitude,
+            "longitude": longitude,
+            "table_columns": json.loads(table_columns[0]),
+            "username": username,
+            "title": title,
+            "description": description,
+            "tags": tags,
+            "read_access_list": read_access_list,
+            "write_access_list": write_access_list,
+            "searchable": searchable
+        }
     )
 
     return {
@@ -675,7 +672,6 @@ async def import_point_data_from_json_file(
 )
 async def import_geographic_data_from_json_url(
     request: Request,
-    background_tasks: BackgroundTasks,
     info: models.GeographicJsonUrl,
     username: int=Depends(authentication_handler.JWTBearer())
 ):
@@ -684,6 +680,10 @@ async def import_geographic_data_from_json_url(
     https://docs.qwikgeo.com/imports/#geographic-data-from-json-url
     """
 
+    await jobs.validate_import_queue_capacity()
+
+    merge = await jobs.validate_merge(info.merge, username)
+
     await qwikgeo_api_utilities.validate_item_access(
         model_name="Table",
         query_filter=Q(table_id=info.map_name),
@@ -698,56 +698,33 @@ async def import_geographic_data_from_json_url(
 
     process_url += f"api/v1/imports/status/{process_id}"
 
-    async with aiohttp.ClientSession() as session:
-
-        try:
-
-            async with session.get(info.url) as resp:
-
-                if resp.status == 200:
-
-                    file_path = f"{os.getcwd()}/media/{new_table_id}.json"
-
-                    with open(f"{os.getcwd()}/media/{new_table_id}.json", "w") as my_file:
-                        my_file.write(await resp.text())
-
-                    utilities.import_processes[process_id] = {
-                        "status": "PENDING"
-                    }
-
-                    background_tasks.add_task(
-                        utilities.import_geographic_data_from_json_file,
-                        file_path=file_path,
-                        new_table_id=new_table_id,
-                        map_column=info.map_column,
-                        table_column=info.table_column,
-                        map_columns=info.map_columns,
-                        table_columns=info.table_columns,
-                        map_name=info.map_name,
-                        process_id=process_id,
-                        app=request.app,
-                        username=username,
-                        title=info.title,
-                        description=info.description,
-                        tags=info.tags,
-                        read_access_list=info.read_access_list,
-                        write_access_list=info.write_access_list,
-                        searchable=info.searchable
-                    )
+    await jobs.create_import_job(
+        process_id=process_id,
+        job_type="import_geographic_data_from_json_url",
+        username=username,
+        parameters={
+            "url": info.url,
+            "new_table_id": new_table_id,
+            "map_column": info.map_column,
+            "table_column": info.table_column,
+            "map_columns": info.map_columns,
+            "table_columns": info.table_columns,
+            "map_name": info.map_name,
+            "username": username,
+            "title": info.title,
+            "description": info.description,
+            "tags": info.tags,
+            "read_access_list": info.read_access_list,
+            "write_access_list": info.write_access_list,
+            "searchable": info.searchable,
+            "merge": merge
+        }
+    )
 
-                    return {
-                        "process_id": process_id,
-                        "url": process_url
-                    }
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Invalid URL"
-                )
-        except aiohttp.client_exceptions.ClientConnectorError as exc:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Invalid URL"
-            ) from exc
+    return {
+        "process_id": process_id,
+        "url": process_url
+    }
 
 @router.post(
     path="/point_data_from_json_url",
@@ -755,7 +732,6 @@ async def import_geographic_data_from_json_url(
 )
 async def import_point_data_from_json_url(
     request: Request,
-    background_tasks: BackgroundTasks,
     info: models.PointJsonUrl,
     username: int=Depends(authentication_handler.JWTBearer())
 ):
@@ -764,6 +740,10 @@ async def import_point_data_from_json_url(
     https://docs.qwikgeo.com/imports/#point-data-from-json-url
     """
 
+    await jobs.validate_import_queue_capacity()
+
+    merge = await jobs.validate_merge(info.merge, username)
+
     new_table_id = qwikgeo_api_utilities.get_new_table_id()
 
     process_id = qwikgeo_api_utilities.get_new_process_id()
@@ -772,59 +752,35 @@ async def import_point_data_from_json_url(
 
     process_url += f"api/v1/imports/status/{process_id}"
 
-    async with aiohttp.ClientSession() as session:
-
-        try:
-
-            async with session.get(info.url) as resp:
-
-                if resp.status == 200:
-
-                    file_path = f"{os.getcwd()}/media/{new_table_id}.json"
-
-                    with open(f"{os.getcwd()}/media/{new_table_id}.json", "w") as my_file:
-                        my_file.write(await resp.text())
-
-                    utilities.import_processes[process_id] = {
-                        "status": "PENDING"
-                    }
-
-                    background_tasks.add_task(
-                        utilities.import_point_data_from_json_file,
-                        file_path=file_path,
-                        new_table_id=new_table_id,
-                        latitude=info.latitude,
-                        longitude=info.longitude,
-                        table_columns=info.table_columns,
-                        process_id=process_id,
-                        app=request.app,
-                        username=username,
-                        title=info.title,
-                        description=info.description,
-                        tags=info.tags,
-                        read_access_list=info.read_access_list,
-                        write_access_list=info.write_access_list,
-                        searchable=info.searchable
-                    )
+    await jobs.create_import_job(
+        process_id=process_id,
+        job_type="import_point_data_from_json_url",
+        username=username,
+        parameters={
+            "url": info.url,
+            "new_table_id": new_table_id,
+            "latitude": info.latitude,
+            "longitude": info.longitude,
+            "table_columns": info.table_columns,
+            "username": username,
+            "title": info.title,
+            "description": info.description,
+            "tags": info.tags,
+            "read_access_list": info.read_access_list,
+            "write_access_list": info.write_access_list,
+            "searchable": info.searchable,
+            "merge": merge
+        }
+    )
 
-                    return {
-                        "process_id": process_id,
-                        "url": process_url
-                    }
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Invalid URL"
-                )
-        except aiohttp.client_exceptions.ClientConnectorError as exc:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Invalid URL"
-            ) from exc
+    return {
+        "process_id": process_id,
+        "url": process_url
+    }
 
 @router.post("/geojson_from_url", response_model=models.BaseResponseModel)
 async def import_geojson_from_url(
     request: Request,
-    background_tasks: BackgroundTasks,
     info: models.GeojsonUrl,
     username: int=Depends(authentication_handler.JWTBearer())
 ):
@@ -833,6 +789,10 @@ async def import_geojson_from_url(
     https://docs.qwikgeo.com/imports/#geojson-from-url
     """
 
+    await jobs.validate_import_queue_capacity()
+
+    merge = await jobs.validate_merge(info.merge, username)
+
     new_table_id = qwikgeo_api_utilities.get_new_table_id()
 
     process_id = qwikgeo_api_utilities.get_new_process_id()
@@ -841,48 +801,176 @@ async def import_geojson_from_url(
 
     process_url += f"api/v1/imports/status/{process_id}"
 
-    async with aiohttp.ClientSession() as session:
+    await jobs.create_import_job(
+        process_id=process_id,
+        job_type="import_geojson_from_url",
+        username=username,
+        parameters={
+            "url": info.url,
+            "new_table_id": new_table_id,
+            "username": username,
+            "title": info.title,
+            "description": info.description,
+            "tags": info.tags,
+            "read_access_list": info.read_access_list,
+            "write_access_list": info.write_access_list,
+            "searchable": info.searchable,
+            "merge": merge
+        }
+    )
 
-        try:
+    return {
+        "process_id": process_id,
+        "url": process_url
+    }
 
-            async with session.get(info.url) as resp:
+@router.post(
+    path="/uploads",
+    responses={
+        200: {
+            "description": "Successful Response",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "upload_id": "472e29dc-91a8-41d3-b05f-cee34006e3f7",
+                        "import_type": "geographic_data_from_geographic_file",
+                        "files": [
+                            {
+                                "filename": "states.geojson",
+                                "size": 3221225472,
+                                "offset": 0,
+                                "complete": False
+                            }
+                        ]
+                    }
+                }
+            }
+        }
+    }
+)
+async def create_upload(
+    info: models.UploadSessionModel,
+    username: int=Depends(authentication_handler.JWTBearer())
+):
+    """
+    Create a resumable upload for large files.
+    https://docs.qwikgeo.com/imports/#resumable-upload
+    """
 
-                if resp.status_code == 200:
+    await jobs.validate_import_queue_capacity()
 
-                    file_path = f"{os.getcwd()}/media/{new_table_id}.geojson"
+    return await uploads.create_upload_session(
+        import_type=info.import_type,
+        files=info.files,
+        username=username
+    )
 
-                    with open(f"{os.getcwd()}/media/{new_table_id}.geojson", "w") as my_file:
-                        my_file.write(await resp.text())
+@router.get(
+    path="/uploads/{upload_id}"
+)
+async def upload_status(
+    upload_id: str,
+    username: int=Depends(authentication_handler.JWTBearer())
+):
+    """
+    Return how much of each file of a resumable upload has been received.
+    https://docs.qwikgeo.com/imports/#resumable-upload
+    """
 
-                    utilities.import_processes[process_id] = {
-                        "status": "PENDING"
-                    }
+    upload = await uploads.get_upload_session(upload_id, username)
 
-                    background_tasks.add_task(
-                        utilities.upload_geographic_file,
-                        file_path=file_path,
-                        new_table_id=new_table_id,
-                        process_id=process_id,
-                        username=username,
-                        title=info.title,
-                        description=info.description,
-                        tags=info.tags,
-                        read_access_list=info.read_access_list,
-                        write_access_list=info.write_access_list,
-                        searchable=info.searchable,
-                        app=request.app
-                    )
+    return uploads.get_upload_status(upload)
 
-                    return {
-                        "process_id": process_id,
-                        "url": process_url
-                    }
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Invalid URL"
-                )
-        except aiohttp.client_exceptions.ClientConnectorError as exc:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Invalid URL"
-            ) from exc
\ No newline at end of file
+@router.put(
+    path="/uploads/{upload_id}/{filename}"
+)
+async def upload_chunk(
+    upload_id: str,
+    filename: str,
+    offset: int,
+    request: Request,
+    username: int=Depends(authentication_handler.JWTBearer())
+):
+    """
+    Add a chunk to a file of a resumable upload.
+    https://docs.qwikgeo.com/imports/#resumable-upload
+    """
+
+    upload = await uploads.get_upload_session(upload_id, username)
+
+    return await uploads.write_upload_chunk(
+        upload=upload,
+        filename=filename,
+        offset=offset,
+        stream=request.stream()
+    )
+
+@router.post(
+    path="/uploads/{upload_id}/finalize",
+    response_model=models.BaseResponseModel
+)
+async def finalize_upload(
+    upload_id: str,
+    request: Request,
+    info: models.UploadFinalizeModel,
+    username: int=Depends(authentication_handler.JWTBearer())
+):
+    """
+    Start the import of a completed resumable upload.
+    https://docs.qwikgeo.com/imports/#resumable-upload
+    """
+
+    await jobs.validate_import_queue_capacity()
+
+    upload = await uploads.get_upload_session(upload_id, username)
+
+    with uploads.lock_upload_files(upload):
+        parameters = uploads.get_upload_job_parameters(upload, info)
+
+        parameters['merge'] = await jobs.validate_merge(info.merge, username)
+
+        if "map_name" in parameters:
+            await qwikgeo_api_utilities.validate_item_access(
+                model_name="Table",
+                query_filter=Q(table_id=parameters['map_name']),
+                username=username
+            )
+
+        process_id = qwikgeo_api_utilities.get_new_process_id()
+
+        process_url = str(request.base_url)
+
+        process_url += f"api/v1/imports/status/{process_id}"
+
+        async with in_transaction():
+            await uploads.claim_upload_session(upload)
+
+            await jobs.create_import_job(
+                process_id=process_id,
+                job_type=uploads.UPLOAD_TYPES[upload.import_type]['job_type'],
+                username=username,
+                parameters=parameters
+            )
+
+    return {
+        "process_id": process_id,
+        "url": process_url
+    }
+
+@router.delete(
+    path="/uploads/{upload_id}"
+)
+async def delete_upload(
+    upload_id: str,
+    username: int=Depends(authentication_handler.JWTBearer())
+):
+    """
+    Cancel a resumable upload and remove its files.
+    https://docs.qwikgeo.com/imports/#resumable-upload
+    """
+
+    upload = await uploads.get_upload_session(upload_id, username)
+
+    await uploads.delete_upload_session(upload)
+
+    return {"status": True}
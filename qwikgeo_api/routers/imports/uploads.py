@@ -0,0 +1,409 @@
+"""QwikGeo API - Import Uploads"""
+
+import os
+import fcntl
+import datetime
+import contextlib
+from fastapi import HTTPException, status
+import aiofiles
+from starlette.requests import ClientDisconnect
+from tortoise import timezone
+
+from qwikgeo_api import db_models
+from qwikgeo_api import config
+from qwikgeo_api import utilities
+
+UPLOAD_TYPES = {
+    "geographic_data_from_geographic_file": {
+        "job_type": "upload_geographic_file",
+        "file_types": ["geojson", "shp", "tab", "kml"],
+        "parameters": []
+    },
+    "geographic_data_from_csv": {
+        "job_type": "import_geographic_data_from_csv",
+        "file_types": ["csv"],
+        "parameters": ["map_name", "map_column", "map_columns", "table_column", "table_columns"]
+    },
+    "point_data_from_csv": {
+        "job_type": "import_point_data_from_csv",
+        "file_types": ["csv"],
+        "parameters": ["latitude", "longitude", "table_columns"]
+    },
+    "geographic_data_from_json_file": {
+        "job_type": "import_geographic_data_from_json_file",
+        "file_types": ["json"],
+        "parameters": ["map_name", "map_column", "map_columns", "table_column", "table_columns"]
+    },
+    "point_data_from_json_file": {
+        "job_type": "import_point_data_from_json_file",
+        "file_types": ["json"],
+        "parameters": ["latitude", "longitude", "table_columns"]
+    }
+}
+
+def get_upload_file_path(
+    upload: object,
+    filename: str
+) -> str:
+    """
+    Method to return the path a file of an upload is written to.
+
+    """
+
+    return f"{os.getcwd()}/media/{upload.table_id}_{filename}"
+
+def get_received_bytes(
+    upload: object,
+    filename: str
+) -> int:
+    """
+    Method to return how many bytes of a file have been received.
+
+    """
+
+    file_path = get_upload_file_path(upload, filename)
+
+    if not os.path.exists(file_path):
+        return 0
+
+    return os.path.getsize(file_path)
+
+def get_upload_status(
+    upload: object
+) -> dict:
+    """
+    Method to return the size and received bytes of each file of an upload.
+
+    """
+
+    files = []
+
+    for filename, size in upload.files.items():
+        offset = get_received_bytes(upload, filename)
+
+        files.append({
+            "filename": filename,
+            "size": size,
+            "offset": offset,
+            "complete": offset == size
+        })
+
+    return {
+        "upload_id": upload.upload_id,
+        "import_type": upload.import_type,
+        "files": files
+    }
+
+def remove_upload_files(
+    upload: object
+) -> None:
+    """
+    Method to remove the files of an upload from media.
+
+    """
+
+    for filename in upload.files:
+        file_path = get_upload_file_path(upload, filename)
+
+        if os.path.exists(file_path):
+            os.remove(file_path)
+
+@contextlib.contextmanager
+def lock_upload_file(
+    upload: object,
+    filename: str
+) -> object:
+    """
+    Method to hold an exclusive lock on a file of an upload while it is written or finalized.
+    The lock is shared by every worker on the host, and a 409 is raised while another request holds it.
+
+    """
+
+    try:
+        file_descriptor = os.open(get_upload_file_path(upload, filename), os.O_RDONLY)
+    except FileNotFoundError as error:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Upload {upload.upload_id} does not exist."
+        ) from error
+
+    try:
+        try:
+            fcntl.flock(file_descriptor, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError as error:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Another request is using {filename}."
+            ) from error
+
+        yield
+    finally:
+        os.close(file_descriptor)
+
+@contextlib.contextmanager
+def lock_upload_files(
+    upload: object
+) -> object:
+    """
+    Method to hold an exclusive lock on every file of an upload.
+    Files that were already removed are skipped.
+
+    """
+
+    with contextlib.ExitStack() as stack:
+        for filename in upload.files:
+            if os.path.exists(get_upload_file_path(upload, filename)):
+                stack.enter_context(lock_upload_file(upload, filename))
+
+        yield
+
+async def claim_upload_session(
+    upload: object
+) -> None:
+    """
+    Method to delete an upload session so only one request can start its import.
+    Raises a 404 when the session was already claimed or removed.
+
+    """
+
+    deleted = await db_models.ImportUpload.filter(upload_id=upload.upload_id).delete()
+
+    if deleted == 0:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Upload {upload.upload_id} does not exist."
+        )
+
+async def delete_upload_session(
+    upload: object
+) -> None:
+    """
+    Method to delete an upload session and its files.
+    Raises a 409 while a chunk is being written or the upload is being finalized.
+
+    """
+
+    with lock_upload_files(upload):
+        await claim_upload_session(upload)
+
+        remove_upload_files(upload)
+
+async def delete_expired_upload_sessions() -> None:
+    """
+    Method to delete uploads that have not received a chunk within UPLOAD_SESSION_EXPIRE_IN_SECONDS.
+    Uploads that are being written or finalized are skipped.
+
+    """
+
+    expire_time = timezone.now() - datetime.timedelta(seconds=config.UPLOAD_SESSION_EXPIRE_IN_SECONDS)
+
+    expired_uploads = await db_models.ImportUpload.filter(modified_time__lt=expire_time)
+
+    for upload in expired_uploads:
+        try:
+            with lock_upload_files(upload):
+                deleted = await db_models.ImportUpload.filter(
+                    upload_id=upload.upload_id,
+                    modified_time__lt=expire_time
+                ).delete()
+
+                if deleted:
+                    remove_upload_files(upload)
+        except HTTPException:
+            continue
+
+async def create_upload_session(
+    import_type: str,
+    files: list,
+    username: str
+) -> dict:
+    """
+    Method to create an upload session and the empty files it writes chunks into.
+
+    """
+
+    if import_type not in UPLOAD_TYPES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f'Please select a valid import type. {" ,".join(UPLOAD_TYPES)}'
+        )
+
+    valid_file_type = False
+
+    upload_files = {}
+
+    for upload_file in files:
+        if (
+            os.path.basename(upload_file.filename) != upload_file.filename
+            or upload_file.filename.startswith(".")
+        ):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"{upload_file.filename} is not a valid filename."
+            )
+
+        if upload_file.size < 0 or upload_file.size > config.MAX_UPLOAD_SIZE_IN_BYTES:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Files must be smaller than {config.MAX_UPLOAD_SIZE_IN_BYTES} bytes."
+            )
+
+        if upload_file.filename.split(".")[-1] in UPLOAD_TYPES[import_type]['file_types']:
+            valid_file_type = True
+
+        upload_files[upload_file.filename] = upload_file.size
+
+    if valid_file_type is False:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f'Please upload a valid file type. {" ,".join(UPLOAD_TYPES[import_type]["file_types"])}'
+        )
+
+    await delete_expired_upload_sessions()
+
+    upload = await db_models.ImportUpload.create(
+        upload_id=utilities.get_new_process_id(),
+        username=username,
+        import_type=import_type,
+        table_id=utilities.get_new_table_id(),
+        files=upload_files
+    )
+
+    for filename in upload.files:
+        async with aiofiles.open(get_upload_file_path(upload, filename), "wb"):
+            pass
+
+    return get_upload_status(upload)
+
+async def get_upload_session(
+    upload_id: str,
+    username: str
+) -> object:
+    """
+    Method to return an upload session of a user.
+
+    """
+
+    upload = await db_models.ImportUpload.get_or_none(
+        upload_id=upload_id,
+        username=username
+    )
+
+    if upload is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Upload {upload_id} does not exist."
+        )
+
+    return upload
+
+async def write_upload_chunk(
+    upload: object,
+    filename: str,
+    offset: int,
+    stream: object
+) -> dict:
+    """
+    Method to append a chunk to a file of an upload as it is received.
+    The offset must match the bytes already received, so a client can resume
+    a dropped upload from the offset returned by the upload status.
+    Only one request can write to a file at a time.
+
+    """
+
+    if filename not in upload.files:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"{filename} is not part of upload {upload.upload_id}."
+        )
+
+    with lock_upload_file(upload, filename):
+        if not await db_models.ImportUpload.exists(upload_id=upload.upload_id):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Upload {upload.upload_id} does not exist."
+            )
+
+        received_bytes = get_received_bytes(upload, filename)
+
+        if offset != received_bytes:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Offset {offset} does not match the {received_bytes} bytes received for {filename}."
+            )
+
+        size = upload.files[filename]
+
+        async with aiofiles.open(get_upload_file_path(upload, filename), "ab") as file:
+            try:
+                async for chunk in stream:
+                    if received_bytes + len(chunk) > size:
+                        await file.truncate(offset)
+
+                        raise HTTPException(
+                            status_code=status.HTTP_400_BAD_REQUEST,
+                            detail=f"Chunk is larger than the {size} bytes declared for {filename}."
+                        )
+
+                    await file.write(chunk)
+
+                    received_bytes += len(chunk)
+            except ClientDisconnect:
+                pass
+
+        await db_models.ImportUpload.filter(upload_id=upload.upload_id).update(
+            modified_time=timezone.now()
+        )
+
+    return {
+        "filename": filename,
+        "size": size,
+        "offset": received_bytes,
+        "complete": received_bytes == size
+    }
+
+def get_upload_job_parameters(
+    upload: object,
+    info: object
+) -> dict:
+    """
+    Method to validate that an upload is complete and return the parameters of its import job.
+
+    """
+
+    for upload_file in get_upload_status(upload)['files']:
+        if upload_file['complete'] is False:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Upload of {upload_file['filename']} is not complete."
+            )
+
+    upload_type = UPLOAD_TYPES[upload.import_type]
+
+    file_path = ""
+
+    for filename in upload.files:
+        if filename.split(".")[-1] in upload_type['file_types']:
+            file_path = get_upload_file_path(upload, filename)
+
+    parameters = {
+        "file_path": file_path,
+        "new_table_id": upload.table_id,
+        "username": upload.username,
+        "title": info.title,
+        "description": info.description,
+        "tags": info.tags,
+        "read_access_list": info.read_access_list,
+        "write_access_list": info.write_access_list,
+        "searchable": info.searchable
+    }
+
+    for parameter in upload_type['parameters']:
+        if getattr(info, parameter) is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Please provide {parameter} for a {upload.import_type} import."
+            )
+        parameters[parameter] = getattr(info, parameter)
+
+    return parameters
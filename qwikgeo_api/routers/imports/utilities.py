@@ -1,38 +1,523 @@
 """QwikGeo API - Import Utilities"""
 
 import os
+import re
+import csv
 import json
+import struct
+import asyncio
+import decimal
+import itertools
 
 import datetime
-import subprocess
+import time
 from fastapi import FastAPI
 import aiohttp
-import pandas as pd
+import aiofiles
+import asyncpg
 
 from qwikgeo_api import utilities
 from qwikgeo_api import config
+from qwikgeo_api import executor
+from qwikgeo_api import column_usage
+from qwikgeo_api import response_cache
+from qwikgeo_api.query_builder import quote_identifier
 
 import_processes = {}
 
+BOOLEAN_VALUES = ["true", "false", "t", "f"]
+
+INTEGER_PATTERN = re.compile(r"^[+-]?\d+$")
+
+FLOAT_PATTERN = re.compile(r"^[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?$")
+
+DATE_PATTERN = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+
+TIMESTAMP_PATTERN = re.compile(r"^\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}")
+
+def get_value_type(
+    value: str
+) -> str:
+    """
+    Method used to return the postgres type of a single value from a file.
+
+    """
+
+    value = value.strip()
+
+    if value.lower() in BOOLEAN_VALUES:
+        return "boolean"
+
+    if INTEGER_PATTERN.match(value):
+        if -2**63 <= int(value) < 2**63:
+            return "bigint"
+        return "numeric"
+
+    if FLOAT_PATTERN.match(value):
+        return "double precision"
+
+    if DATE_PATTERN.match(value):
+        try:
+            datetime.date.fromisoformat(value)
+            return "date"
+        except ValueError:
+            return "text"
+
+    if TIMESTAMP_PATTERN.match(value):
+        try:
+            timestamp = datetime.datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return "text"
+        if timestamp.tzinfo is None:
+            return "timestamp"
+        return "timestamptz"
+
+    return "text"
+
+def get_wider_type(
+    current_type: str,
+    value_type: str
+) -> str:
+    """
+    Method used to return a type that can hold values of both types.
+
+    """
+
+    if current_type is None or current_type == value_type:
+        return value_type
+
+    for types in [
+        ["bigint", "numeric", "double precision"],
+        ["date", "timestamp", "timestamptz"]
+    ]:
+        if current_type in types and value_type in types:
+            return types[max(types.index(current_type), types.index(value_type))]
+
+    return "text"
+
+def get_csv_column_types(
+    file_path: str,
+    sample_size: int=None
+) -> list:
+    """
+    Method used to return the name and postgres type of each column of a csv file.
+    Types are inferred from the first sample_size rows, or every row when sample_size is None.
+
+    """
+
+    with open(file_path, newline="", encoding="utf-8-sig") as csv_file:
+        reader = csv.reader(csv_file)
+
+        names = next(reader, [])
+
+        column_types = [None] * len(names)
+
+        for row_number, row in enumerate(reader):
+            if sample_size is not None and row_number >= sample_size:
+                break
+            for index, value in enumerate(row[:len(names)]):
+                if value.strip() == "" or column_types[index] == "text":
+                    continue
+                column_types[index] = get_wider_type(column_types[index], get_value_type(value))
+
+    return [(name, column_type or "text") for name, column_type in zip(names, column_types)]
+
+async def copy_csv_to_new_table(
+    con: asyncpg.Connection,
+    table_id: str,
+    file_path: str,
+    text_columns: list=None
+) -> list:
+    """
+    Method used to create a table from a csv file and copy the file into it.
+    Rows are numbered in file order in a gid column, unless the file has its own gid column.
+    Column types are inferred from a sample of rows. If the sample types do not
+    fit every row, the types are inferred from the whole file and the copy is run again.
+    Returns the columns of the table.
+
+    """
+
+    column_types = await executor.run_in_process(
+        "import",
+        get_csv_column_types,
+        file_path,
+        config.IMPORT_SCHEMA_SAMPLE_ROWS
+    )
+
+    for attempt in range(2):
+        columns = []
+
+        create_table_sql = f"""CREATE TABLE user_data."{table_id}" ("""
+
+        for name, column_type in column_types:
+            column = utilities.remove_bad_characters(name)
+            if text_columns is not None and column in text_columns:
+                column_type = "text"
+            columns.append(column)
+            create_table_sql += f'"{column}" {column_type},'
+
+        if "gid" not in columns:
+            create_table_sql += '"gid" serial,'
+
+        create_table_sql = create_table_sql[:-1]
+
+        create_table_sql += ");"
+
+        await con.fetch(f"""DROP TABLE IF EXISTS user_data."{table_id}";""")
+
+        await con.fetch(create_table_sql)
+
+        try:
+            await con.copy_to_table(
+                table_id,
+                source=file_path,
+                schema_name="user_data",
+                columns=columns,
+                format="csv",
+                delimiter=",",
+                header=True
+            )
+            return columns
+        except asyncpg.exceptions.DataError:
+            if attempt == 1 or not config.IMPORT_SCHEMA_WIDEN_ON_ERROR:
+                raise
+
+        column_types = await executor.run_in_process(
+            "import",
+            get_csv_column_types,
+            file_path,
+            None
+        )
+
+def iter_json_records(
+    file_path: str
+) -> object:
+    """
+    Method used to read the records of a json array one at a time.
+    Only one chunk of the file and the current record are kept in memory.
+    A record that can not be decoded within IMPORT_JSON_MAX_RECORD_SIZE characters is an error.
+
+    """
+
+    decoder = json.JSONDecoder()
+
+    with open(file_path, encoding="utf-8-sig") as json_file:
+        buffer = ""
+        position = 0
+        end_of_file = False
+        started = False
+
+        while True:
+            while position < len(buffer) and (buffer[position].isspace() or (started and buffer[position] == ",")):
+                position += 1
+
+            if position >= len(buffer):
+                if end_of_file:
+                    raise ValueError("The json file ended before the array was closed.")
+                chunk = json_file.read(config.IMPORT_JSON_CHUNK_SIZE)
+                end_of_file = chunk == ""
+                buffer = buffer[position:] + chunk
+                position = 0
+                continue
+
+            if not started:
+                if buffer[position] != "[":
+                    raise ValueError("The json file must contain an array of records.")
+                started = True
+                position += 1
+                continue
+
+            if buffer[position] == "]":
+                return
+
+            try:
+                record, position = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                if end_of_file or len(buffer) - position > config.IMPORT_JSON_MAX_RECORD_SIZE:
+                    raise
+                chunk = json_file.read(config.IMPORT_JSON_CHUNK_SIZE)
+                end_of_file = chunk == ""
+                buffer = buffer[position:] + chunk
+                position = 0
+                continue
+
+            if not isinstance(record, dict):
+                raise ValueError("The json file must contain an array of records.")
+
+            yield record
+
+def get_json_value_type(
+    value: object
+) -> str:
+    """
+    Method used to return the postgres type of a single value from a json file.
+
+    """
+
+    if isinstance(value, bool):
+        return "boolean"
+
+    if isinstance(value, int):
+        if -2**63 <= value < 2**63:
+            return "bigint"
+        return "numeric"
+
+    if isinstance(value, float):
+        return "double precision"
+
+    if isinstance(value, (dict, list)):
+        return "jsonb"
+
+    return get_value_type(str(value))
+
+def get_json_column_types(
+    file_path: str,
+    sample_size: int=None
+) -> list:
+    """
+    Method used to return the name and postgres type of each key in the records of a json file.
+    Types are inferred from the first sample_size records, or every record when sample_size is None.
+
+    """
+
+    column_types = {}
+
+    for record_number, record in enumerate(iter_json_records(file_path)):
+        if sample_size is not None and record_number >= sample_size:
+            break
+        for key, value in record.items():
+            if key not in column_types:
+                column_types[key] = None
+            if value is None or value == "" or column_types[key] == "text":
+                continue
+            column_types[key] = get_wider_type(column_types[key], get_json_value_type(value))
+
+    return [(name, column_type or "text") for name, column_type in column_types.items()]
+
+def convert_value(
+    value: object,
+    column_type: str
+) -> object:
+    """
+    Method used to convert a json value into the python type used to copy it into a column.
+
+    """
+
+    if value is None or value == "":
+        return None
+
+    if column_type == "jsonb":
+        return json.dumps(value)
+
+    if column_type == "text":
+        if isinstance(value, (dict, list)):
+            return json.dumps(value)
+        return str(value)
+
+    if column_type == "boolean":
+        if isinstance(value, bool):
+            return value
+        if str(value).strip().lower() not in BOOLEAN_VALUES:
+            raise ValueError(f"{value} is not a boolean.")
+        return str(value).strip().lower() in ["true", "t"]
+
+    if isinstance(value, bool):
+        raise ValueError(f"{value} is not a {column_type}.")
+
+    if column_type == "bigint":
+        if isinstance(value, float) or not INTEGER_PATTERN.match(str(value).strip()):
+            raise ValueError(f"{value} is not an integer.")
+        return int(value)
+
+    if column_type == "numeric":
+        return decimal.Decimal(str(value).strip())
+
+    if column_type == "double precision":
+        return float(value)
+
+    if column_type == "date":
+        return datetime.date.fromisoformat(str(value).strip())
+
+    return datetime.datetime.fromisoformat(str(value).strip().replace("Z", "+00:00"))
+
+def get_point_ewkb(
+    longitude: object,
+    latitude: object
+) -> bytes:
+    """
+    Method used to return a point in wgs84 as extended well known binary, or None for invalid coordinates.
+
+    """
+
+    try:
+        longitude = float(longitude)
+        latitude = float(latitude)
+    except (TypeError, ValueError):
+        return None
+
+    return struct.pack("<BIIdd", 1, 0x20000001, 4326, longitude, latitude)
+
+def get_json_record_batch(
+    records: object,
+    column_types: list,
+    batch_size: int,
+    latitude: str=None,
+    longitude: str=None
+) -> list:
+    """
+    Method used to convert the next batch of json records into rows for a copy.
+    Raises a ValueError for a key that is not one of the columns.
+
+    """
+
+    batch = []
+
+    names = {name for name, _ in column_types}
+
+    for record in itertools.islice(records, batch_size):
+        for key in record:
+            if key not in names:
+                raise ValueError(f"{key} was not found in the records used to infer the column types.")
+        row = [
+            convert_value(record.get(name), column_type) for name, column_type in column_types
+        ]
+        if latitude is not None:
+            row.append(get_point_ewkb(record.get(longitude), record.get(latitude)))
+        batch.append(tuple(row))
+
+    return batch
+
+async def copy_json_to_new_table(
+    con: asyncpg.Connection,
+    table_id: str,
+    file_path: str,
+    text_columns: list=None,
+    latitude: str=None,
+    longitude: str=None
+) -> list:
+    """
+    Method used to create a table from a json file and copy its records into it in batches.
+    When latitude and longitude are given, a point geometry column is written in the same pass.
+    Records are numbered in file order in a gid column, unless the file has its own gid key.
+    Column types are inferred from a sample of records. If the sample types do not
+    fit every record or a record has a key that is not in the sample, the types are
+    inferred from the whole file and the copy is run again.
+    Returns the columns of the table.
+
+    """
+
+    column_types = await executor.run_in_process(
+        "import",
+        get_json_column_types,
+        file_path,
+        config.IMPORT_SCHEMA_SAMPLE_ROWS
+    )
+
+    if latitude is not None:
+        await con.set_type_codec(
+            "geometry",
+            schema="public",
+            encoder=bytes,
+            decoder=bytes,
+            format="binary"
+        )
+
+    try:
+        for attempt in range(2):
+            columns = []
+
+            create_table_sql = f"""CREATE TABLE user_data."{table_id}" ("""
+
+            for index, (name, column_type) in enumerate(column_types):
+                column = utilities.remove_bad_characters(name)
+                if text_columns is not None and column in text_columns:
+                    column_type = "text"
+                    column_types[index] = (name, column_type)
+                columns.append(column)
+                create_table_sql += f'"{column}" {column_type},'
+
+            if "gid" not in columns:
+                create_table_sql += '"gid" serial,'
+
+            if latitude is not None:
+                record_latitude = latitude
+                record_longitude = longitude
+                for name, _ in column_types:
+                    if utilities.remove_bad_characters(name) == latitude:
+                        record_latitude = name
+                    if utilities.remove_bad_characters(name) == longitude:
+                        record_longitude = name
+                create_table_sql += '"geom" geometry(Point, 4326),'
+                copy_columns = columns + ["geom"]
+            else:
+                record_latitude = None
+                record_longitude = None
+                copy_columns = columns
+
+            create_table_sql = create_table_sql[:-1]
+
+            create_table_sql += ");"
+
+            await con.fetch(f"""DROP TABLE IF EXISTS user_data."{table_id}";""")
+
+            await con.fetch(create_table_sql)
+
+            records = iter_json_records(file_path)
+
+            try:
+                while True:
+                    batch = await executor.run_in_thread(
+                        "import",
+                        get_json_record_batch,
+                        records,
+                        column_types,
+                        config.IMPORT_BATCH_SIZE,
+                        record_latitude,
+                        record_longitude
+                    )
+
+                    if not batch:
+                        return columns
+
+                    await con.copy_records_to_table(
+                        table_id,
+                        records=batch,
+                        schema_name="user_data",
+                        columns=copy_columns
+                    )
+            except json.JSONDecodeError:
+                raise
+            except (ValueError, TypeError, ArithmeticError, asyncpg.exceptions.DataError):
+                if attempt == 1 or not config.IMPORT_SCHEMA_WIDEN_ON_ERROR:
+                    raise
+            finally:
+                records.close()
+
+            column_types = await executor.run_in_process(
+                "import",
+                get_json_column_types,
+                file_path,
+                None
+            )
+    finally:
+        if latitude is not None:
+            await con.reset_type_codec("geometry", schema="public")
+
 async def upload_csv_to_db_with_latitude_and_longitude(
     file_path: str,
     new_table_id: str,
     latitude: str,
     longitude: str,
     table_columns: list,
-    app: FastAPI
+    app: FastAPI,
+    process_id: str=None,
+    staging: bool=False
 ) -> None:
     """
     Method to upload data from from a csv file with latitude and longitude columns into db.
 
     """
 
-    pd.options.display.max_rows = 10
-
-    data_frame = pd.read_csv(file_path)
-
-    columns = ""
-
     formatted_table_columns = ""
 
     for col in table_columns:
@@ -40,37 +525,14 @@ async def upload_csv_to_db_with_latitude_and_longitude(
 
     formatted_table_columns = formatted_table_columns[:-1]
 
-    create_table_sql = f"""CREATE TABLE user_data."{new_table_id}" ("""
-
-    for name, data_type in data_frame.dtypes.iteritems():
-        columns += f"{utilities.remove_bad_characters(name)},"
-        create_table_sql += f'"{utilities.remove_bad_characters(name)}"'
-        if data_type == "object" or data_type == "datetime64":
-            create_table_sql += " text,"
-        if data_type == "int64":
-            create_table_sql += " integer,"
-        if data_type == "float64":
-            create_table_sql += " double precision,"
-
-    create_table_sql = create_table_sql[:-1]
-
-    columns = columns[:-1]
-
-    create_table_sql += ");"
-
     pool = app.state.database
 
     async with pool.acquire() as con:
-        await con.fetch(f"""DROP TABLE IF EXISTS user_data."{new_table_id}";""")
-
-        await con.fetch(create_table_sql)
-
-        insert_sql = f"""COPY user_data."{new_table_id}"({columns})
-        FROM '{file_path}'
-        DELIMITER ','
-        CSV HEADER;"""
-
-        await con.fetch(insert_sql)
+        await copy_csv_to_new_table(
+            con=con,
+            table_id=new_table_id,
+            file_path=file_path
+        )
 
         add_geom_sql = f"""
             SELECT AddGeometryColumn ('user_data','{new_table_id}','geom',4326,'POINT',2);                
@@ -87,7 +549,9 @@ async def upload_csv_to_db_with_latitude_and_longitude(
 
         await clean_up_table(
             table_id=new_table_id,
-            app=app
+            app=app,
+            process_id=process_id,
+            staging=staging
         )
 
         media_directory = os.listdir(f"{os.getcwd()}/media/")
@@ -103,21 +567,17 @@ async def upload_csv_to_db_with_geographic_data(
     table_column: str,
     table_columns: list,
     map_columns: list,
-    app: FastAPI
+    app: FastAPI,
+    process_id: str=None,
+    staging: bool=False
 ) -> None:
     """
     Method to upload data from from a csv file with geographic data into db.
 
     """
 
-    pd.options.display.max_rows = 10
-
-    data_frame = pd.read_csv(file_path)
-
     table_column = utilities.remove_bad_characters(table_column)
 
-    columns = ""
-
     formatted_table_columns = ""
 
     formatted_map_columns = ""
@@ -129,39 +589,125 @@ async def upload_csv_to_db_with_geographic_data(
     for column in map_columns:
         formatted_map_columns += f"b.{utilities.remove_bad_characters(column)},"
 
-    create_table_sql = f"""CREATE TABLE user_data."{new_table_id}_temp" ("""
+    selected_columns = [utilities.remove_bad_characters(column) for column in table_columns + map_columns]
 
-    for name, data_type in data_frame.dtypes.iteritems():
-        columns += f"{utilities.remove_bad_characters(name)},"
-        create_table_sql += f'"{utilities.remove_bad_characters(name)}"'
-        if utilities.remove_bad_characters(name) == table_column:
-            create_table_sql += " text,"
-        else:
-            if data_type == "object" or data_type == "datetime64":
-                create_table_sql += " text,"
-            if data_type == "int64":
-                create_table_sql += " integer,"
-            if data_type == "float64":
-                create_table_sql += " double precision,"
+    if "gid" not in selected_columns:
+        formatted_table_columns += "a.gid,"
+
+    pool = app.state.database
+
+    async with pool.acquire() as con:
+        await copy_csv_to_new_table(
+            con=con,
+            table_id=f"{new_table_id}_temp",
+            file_path=file_path,
+            text_columns=[table_column]
+        )
+
+        join_sql = f"""CREATE TABLE user_data."{new_table_id}" AS
+            SELECT {formatted_table_columns} {formatted_map_columns} geom
+            FROM user_data."{new_table_id}_temp" as a
+            LEFT JOIN user_data."{map_name}" as b
+            ON a."{table_column}" = b."{map_column}";
+        """
+
+        await con.fetch(join_sql)
+
+        await con.fetch(f"""DROP TABLE IF EXISTS user_data."{new_table_id}_temp";""")
+
+        await clean_up_table(
+            table_id=new_table_id,
+            app=app,
+            process_id=process_id,
+            staging=staging
+        )
+
+        media_directory = os.listdir(f"{os.getcwd()}/media/")
+        for file in media_directory:
+            if new_table_id in file:
+                os.remove(f"{os.getcwd()}/media/{file}")
 
-    create_table_sql = create_table_sql[:-1]
-    columns = columns[:-1]
+async def upload_json_to_db_with_latitude_and_longitude(
+    file_path: str,
+    new_table_id: str,
+    latitude: str,
+    longitude: str,
+    app: FastAPI,
+    process_id: str=None,
+    staging: bool=False
+) -> None:
+    """
+    Method to upload data from a json file with latitude and longitude columns into db.
 
-    create_table_sql += ");"
+    """
 
     pool = app.state.database
 
     async with pool.acquire() as con:
-        await con.fetch(f"""DROP TABLE IF EXISTS user_data."{new_table_id}_temp";""")
+        await copy_json_to_new_table(
+            con=con,
+            table_id=new_table_id,
+            file_path=file_path,
+            latitude=latitude,
+            longitude=longitude
+        )
 
-        await con.fetch(create_table_sql)
+        await clean_up_table(
+            table_id=new_table_id,
+            app=app,
+            process_id=process_id,
+            staging=staging
+        )
+
+        media_directory = os.listdir(f"{os.getcwd()}/media/")
+        for file in media_directory:
+            if new_table_id in file:
+                os.remove(f"{os.getcwd()}/media/{file}")
+
+async def upload_json_to_db_with_geographic_data(
+    file_path: str,
+    new_table_id: str,
+    map_name: str,
+    map_column: str,
+    table_column: str,
+    table_columns: list,
+    map_columns: list,
+    app: FastAPI,
+    process_id: str=None,
+    staging: bool=False
+) -> None:
+    """
+    Method to upload data from a json file with geographic data into db.
 
-        insert_sql = f"""COPY user_data."{new_table_id}_temp" ({columns})
-        FROM '{file_path}'
-        DELIMITER ','
-        CSV HEADER;"""
+    """
+
+    table_column = utilities.remove_bad_characters(table_column)
+
+    formatted_table_columns = ""
+
+    formatted_map_columns = ""
+
+    for col in table_columns:
+        if col not in map_columns:
+            formatted_table_columns += f"a.{utilities.remove_bad_characters(col)},"
+
+    for column in map_columns:
+        formatted_map_columns += f"b.{utilities.remove_bad_characters(column)},"
+
+    selected_columns = [utilities.remove_bad_characters(column) for column in table_columns + map_columns]
+
+    if "gid" not in selected_columns:
+        formatted_table_columns += "a.gid,"
 
-        await con.fetch(insert_sql)
+    pool = app.state.database
+
+    async with pool.acquire() as con:
+        await copy_json_to_new_table(
+            con=con,
+            table_id=f"{new_table_id}_temp",
+            file_path=file_path,
+            text_columns=[table_column]
+        )
 
         join_sql = f"""CREATE TABLE user_data."{new_table_id}" AS
             SELECT {formatted_table_columns} {formatted_map_columns} geom
@@ -176,7 +722,9 @@ async def upload_csv_to_db_with_geographic_data(
 
         await clean_up_table(
             table_id=new_table_id,
-            app=app
+            app=app,
+            process_id=process_id,
+            staging=staging
         )
 
         media_directory = os.listdir(f"{os.getcwd()}/media/")
@@ -213,6 +761,55 @@ async def validate_table(
         return False
 
 
+def get_geojson_lines(
+    geojson: str
+) -> tuple:
+    """
+    Method used to convert a page of geojson into one feature per line and return any error.
+
+    """
+
+    data = json.loads(geojson)
+
+    if 'error' in data:
+        return None, data['error']
+
+    lines = "".join(f"{json.dumps(feature)}\n" for feature in data.get('features') or [])
+
+    return lines, None
+
+async def fetch_arcgis_page(
+    session: aiohttp.ClientSession,
+    url: str,
+    payload: dict,
+    semaphore: asyncio.Semaphore
+) -> str:
+    """
+    Method used to fetch a page of features from an arcgis service as geojson lines.
+    Failed requests are retried with an exponential backoff.
+
+    """
+
+    for attempt in range(config.ARCGIS_REQUEST_MAX_ATTEMPTS):
+        try:
+            async with semaphore:
+                async with session.post(f"{url}/query", data=payload) as resp:
+                    resp.raise_for_status()
+                    geojson = await resp.text()
+
+            lines, error = await executor.run_in_process("import_json", get_geojson_lines, geojson)
+
+            if error is None:
+                return lines
+            error = Exception(f"ArcGIS Service returned an error: {error}")
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as exc:
+            error = exc
+
+        if attempt < config.ARCGIS_REQUEST_MAX_ATTEMPTS - 1:
+            await asyncio.sleep(config.ARCGIS_REQUEST_RETRY_DELAY_IN_SECONDS * 2 ** attempt)
+
+    raise error
+
 async def get_arcgis_data(
     url: str,
     table_id: str,
@@ -226,15 +823,20 @@ async def get_arcgis_data(
     searchable: bool,
     app: FastAPI,
     token: str=None,
-    filter: str="1=1"
+    filter: str="1=1",
+    merge: dict=None
 ) -> None:
     """
     Method get arcgis data from a given url and load it into a database.
+    Pages of features are fetched concurrently and appended to a file in the order of the service,
+    with at most twice ARCGIS_MAX_CONCURRENT_REQUESTS pages held in memory.
 
     """
 
     start = datetime.datetime.now()
 
+    file_path = f"{os.getcwd()}/media/{table_id}.geojsonl"
+
     try:
         service_url = f"{url}?f=json"
 
@@ -249,117 +851,137 @@ async def get_arcgis_data(
 
                 max_number_of_features_per_query = data['maxRecordCount']
 
-                feature_stats_url = f"{url}/query?where={filter}&returnGeometry=false&returnIdsOnly=true&f=json"
-
-                async with session.get(feature_stats_url) as feature_resp:
+            feature_stats_payload = {
+                'f': 'json',
+                'where': filter,
+                'returnGeometry': 'false',
+                'returnIdsOnly': 'true'
+            }
 
-                    data = await feature_resp.text()
+            if token is not None:
+                feature_stats_payload['token'] = token
 
-                    data = json.loads(data)
+            async with session.post(f"{url}/query", data=feature_stats_payload) as feature_resp:
 
-                    object_ids = data['objectIds']
+                data = await feature_resp.text()
 
-                    number_of_features = len(data['objectIds'])
+                data = await executor.run_in_process("import_json", json.loads, data)
 
-                    error = ""
+            if 'error' in data:
+                raise Exception(f"No data within ArcGIS Service. Error: {str(data['error'])}")
 
-                    if number_of_features <= max_number_of_features_per_query:
+            object_ids = data['objectIds'] or []
 
-                        async with session.get(f"{url}/query?where={filter}&outFields=*&returnGeometry=true&geometryPrecision=6&outSR=4326&f=geojson") as resp:
+            pages = [
+                object_ids[x: x + max_number_of_features_per_query]
+                for x in range(0, len(object_ids), max_number_of_features_per_query)
+            ]
 
-                            data = await resp.json()
+            import_processes[process_id]['total_pages'] = len(pages)
+            import_processes[process_id]['pages_completed'] = 0
 
-                            if 'error' in data:
-                                error = data['error']
+            semaphore = asyncio.Semaphore(config.ARCGIS_MAX_CONCURRENT_REQUESTS)
 
-                            with open(f'{table_id}.geojson', 'w') as json_file:
-                                json.dump(data, json_file)
+            page_slots = asyncio.Semaphore(config.ARCGIS_MAX_CONCURRENT_REQUESTS * 2)
 
-                    else:
-                        start_counter = 0
+            pages_written = [asyncio.Event() for _ in pages]
 
-                        feature_collection = {
-                            "type": "FeatureCollection",
-                            "features": []
-                        }
+            async with aiofiles.open(file_path, "w") as geojson_file:
 
-                        for x in range(
-                            start_counter,
-                            number_of_features,
-                            max_number_of_features_per_query
-                        ):
-                            ids_requested = object_ids[x: x + max_number_of_features_per_query ]
-                            payload = {
-                                'f': 'geojson',
-                                'where': filter,
-                                'objectIds': str( ids_requested )[1:-1],
-                                'outSR': '4326',
-                                'returnGeometry': 'true',
-                                'outFields': '*',
-                                'geometryPrecision': '4'
-                            }
+                async def import_page(page_number, ids_requested):
+                    payload = {
+                        'f': 'geojson',
+                        'where': filter,
+                        'objectIds': str( ids_requested )[1:-1],
+                        'outSR': '4326',
+                        'returnGeometry': 'true',
+                        'outFields': '*',
+                        'geometryPrecision': '6'
+                    }
 
-                            async with session.post( f"{url}/query", data=payload ) as resp:
+                    if token is not None:
+                        payload['token'] = token
 
-                                data = await resp.json()
+                    async with page_slots:
+                        lines = await fetch_arcgis_page(session, url, payload, semaphore)
 
-                                if 'error' in data:
-                                    error = data['error']
+                        if page_number > 0:
+                            await pages_written[page_number - 1].wait()
 
-                                feature_collection['features'] += data['features']
+                        await geojson_file.write(lines)
 
-                        with open(f'{table_id}.geojson', 'w') as json_file:
-                            json.dump(feature_collection, json_file)                
+                    pages_written[page_number].set()
 
-                load_geographic_data_to_server(
-                    table_id=table_id,
-                    file_path=f'{table_id}.geojson'
-                )
+                    import_processes[process_id]['pages_completed'] += 1
 
-                valid_table = await validate_table(
-                    table_id=table_id,
-                    app=app
-                )
+                page_tasks = [
+                    asyncio.ensure_future(import_page(page_number, page))
+                    for page_number, page in enumerate(pages)
+                ]
 
-                if valid_table:
+                try:
+                    await asyncio.gather(*page_tasks)
+                except BaseException:
+                    for page_task in page_tasks:
+                        page_task.cancel()
+                    await asyncio.gather(*page_tasks, return_exceptions=True)
+                    raise
 
-                    await clean_up_table(
-                        table_id=table_id,
-                        app=app
-                    )
+        await load_geographic_data_to_server(
+            table_id=table_id,
+            file_path=file_path,
+            process_id=process_id
+        )
 
-                    item = {
-                        "user_id": username,
-                        "table_id": table_id,
-                        "title": title,
-                        "tags": tags,
-                        "description": description,
-                        "read_access_list": read_access_list,
-                        "write_access_list": write_access_list,
-                        "searchable": searchable
-                    }
+        valid_table = await validate_table(
+            table_id=table_id,
+            app=app
+        )
 
-                    await utilities.create_single_item_in_database(
-                        item=item,
-                        model_name="Table"
-                    )
+        if valid_table:
 
-                    import_processes[process_id]['status'] = "SUCCESS"
-                    import_processes[process_id]['table_id'] = table_id
-                else:
-                    import_processes[process_id]['status'] = "FAILURE"
-                    import_processes[process_id]['error'] = f"No data within ArcGIS Service. Error: {str(error)}"
-                import_processes[process_id]['completion_time'] = datetime.datetime.now()
-                import_processes[process_id]['run_time_in_seconds'] = datetime.datetime.now()-start
-    except Exception as error:
-        if os.path.exists(f'{table_id}.geojson'):
-            os.remove(f'{table_id}.geojson')
-        import_processes[process_id]['status'] = "FAILURE"
-        import_processes[process_id]['error'] = str(error)
-        import_processes[process_id]['completion_time'] = datetime.datetime.now()
-        import_processes[process_id]['run_time_in_seconds'] = datetime.datetime.now()-start
+            await clean_up_table(
+                table_id=table_id,
+                app=app,
+                process_id=process_id,
+                staging=merge is not None
+            )
 
-async def upload_geographic_file(
+            item = {
+                "user_id": username,
+                "table_id": table_id,
+                "title": title,
+                "tags": tags,
+                "description": description,
+                "read_access_list": read_access_list,
+                "write_access_list": write_access_list,
+                "searchable": searchable
+            }
+
+            saved_table_id = await save_imported_table(
+                table_id=table_id,
+                item=item,
+                process_id=process_id,
+                app=app,
+                merge=merge
+            )
+
+            import_processes[process_id]['status'] = "SUCCESS"
+            import_processes[process_id]['table_id'] = saved_table_id
+        else:
+            import_processes[process_id]['status'] = "FAILURE"
+            import_processes[process_id]['error'] = "No data within ArcGIS Service."
+        import_processes[process_id]['completion_time'] = datetime.datetime.now()
+        import_processes[process_id]['run_time_in_seconds'] = datetime.datetime.now()-start
+    except Exception as error:
+        if os.path.exists(file_path):
+            os.remove(file_path)
+        import_processes[process_id]['status'] = "FAILURE"
+        import_processes[process_id]['error'] = str(error)
+        import_processes[process_id]['completion_time'] = datetime.datetime.now()
+        import_processes[process_id]['run_time_in_seconds'] = datetime.datetime.now()-start
+
+async def upload_geographic_file(
     file_path: str,
     new_table_id: str,
     process_id: str,
@@ -370,7 +992,8 @@ async def upload_geographic_file(
     read_access_list: list,
     write_access_list: list,
     searchable: bool,
-    app: FastAPI
+    app: FastAPI,
+    merge: dict=None
 ) -> None:
     """
     Method to upload data from geographic file.
@@ -380,9 +1003,10 @@ async def upload_geographic_file(
     start = datetime.datetime.now()
 
     try:
-        load_geographic_data_to_server(
+        await load_geographic_data_to_server(
             table_id=new_table_id,
-            file_path=file_path
+            file_path=file_path,
+            process_id=process_id
         )
 
         valid_table = await validate_table(
@@ -394,7 +1018,9 @@ async def upload_geographic_file(
 
             await clean_up_table(
                 table_id=new_table_id,
-                app=app
+                app=app,
+                process_id=process_id,
+                staging=merge is not None
             )
             
             item = {
@@ -408,13 +1034,16 @@ async def upload_geographic_file(
                 "searchable": searchable
             }
 
-            await utilities.create_single_item_in_database(
+            saved_table_id = await save_imported_table(
+                table_id=new_table_id,
                 item=item,
-                model_name="Table"
+                process_id=process_id,
+                app=app,
+                merge=merge
             )
 
             import_processes[process_id]['status'] = "SUCCESS"
-            import_processes[process_id]['new_table_id'] = new_table_id
+            import_processes[process_id]['new_table_id'] = saved_table_id
         else:
             import_processes[process_id]['status'] = "FAILURE"
             import_processes[process_id]['error'] = "No data within files loaded."
@@ -446,7 +1075,8 @@ async def import_geographic_data_from_csv(
     read_access_list: list,
     write_access_list: list,
     searchable: bool,
-    app: FastAPI
+    app: FastAPI,
+    merge: dict=None
 ) -> None:
     """
     Method to upload data from from a csv file with geographic data.
@@ -464,7 +1094,9 @@ async def import_geographic_data_from_csv(
             table_column=table_column,
             table_columns=table_columns,
             map_columns=map_columns,
-            app=app
+            app=app,
+            process_id=process_id,
+            staging=merge is not None
         )
 
         item = {
@@ -478,12 +1110,15 @@ async def import_geographic_data_from_csv(
             "searchable": searchable
         }
 
-        await utilities.create_single_item_in_database(
+        saved_table_id = await save_imported_table(
+            table_id=new_table_id,
             item=item,
-            model_name="Table"
+            process_id=process_id,
+            app=app,
+            merge=merge
         )
         import_processes[process_id]['status'] = "SUCCESS"
-        import_processes[process_id]['new_table_id'] = new_table_id
+        import_processes[process_id]['new_table_id'] = saved_table_id
         import_processes[process_id]['completion_time'] = datetime.datetime.now()
         import_processes[process_id]['run_time_in_seconds'] = datetime.datetime.now()-start
     except Exception as error:
@@ -510,7 +1145,8 @@ async def import_point_data_from_csv(
     read_access_list: list,
     write_access_list: list,
     searchable: bool,
-    app: FastAPI
+    app: FastAPI,
+    merge: dict=None
 ) -> None:
     """
     Method to upload data from csv with lat lng columns.
@@ -526,7 +1162,9 @@ async def import_point_data_from_csv(
             latitude=latitude,
             longitude=longitude,
             table_columns=table_columns,
-            app=app
+            app=app,
+            process_id=process_id,
+            staging=merge is not None
         )
 
         item = {
@@ -540,12 +1178,15 @@ async def import_point_data_from_csv(
             "searchable": searchable
         }
 
-        await utilities.create_single_item_in_database(
+        saved_table_id = await save_imported_table(
+            table_id=new_table_id,
             item=item,
-            model_name="Table"
+            process_id=process_id,
+            app=app,
+            merge=merge
         )
         import_processes[process_id]['status'] = "SUCCESS"
-        import_processes[process_id]['new_table_id'] = new_table_id
+        import_processes[process_id]['new_table_id'] = saved_table_id
         import_processes[process_id]['completion_time'] = datetime.datetime.now()
         import_processes[process_id]['run_time_in_seconds'] = datetime.datetime.now()-start
     except Exception as error:
@@ -572,7 +1213,8 @@ async def import_point_data_from_json_file(
     read_access_list: list,
     write_access_list: list,
     searchable: bool,
-    app: FastAPI
+    app: FastAPI,
+    merge: dict=None
 ) -> None:
     """
     Method to upload data from csv with lat lng columns.
@@ -582,17 +1224,14 @@ async def import_point_data_from_json_file(
     start = datetime.datetime.now()
 
     try:
-        df = pd.read_json(file_path)
-
-        df.to_csv(f"{os.getcwd()}/media/{new_table_id}.csv", index=False, sep=',', encoding="utf-8")
-
-        await upload_csv_to_db_with_latitude_and_longitude(
-            file_path=f"{os.getcwd()}/media/{new_table_id}.csv",
+        await upload_json_to_db_with_latitude_and_longitude(
+            file_path=file_path,
             new_table_id=new_table_id,
             latitude=latitude,
             longitude=longitude,
-            table_columns=table_columns,
-            app=app
+            app=app,
+            process_id=process_id,
+            staging=merge is not None
         )
     
         item = {
@@ -606,12 +1245,15 @@ async def import_point_data_from_json_file(
             "searchable": searchable
         }
 
-        await utilities.create_single_item_in_database(
+        saved_table_id = await save_imported_table(
+            table_id=new_table_id,
             item=item,
-            model_name="Table"
+            process_id=process_id,
+            app=app,
+            merge=merge
         )
         import_processes[process_id]['status'] = "SUCCESS"
-        import_processes[process_id]['new_table_id'] = new_table_id
+        import_processes[process_id]['new_table_id'] = saved_table_id
         import_processes[process_id]['completion_time'] = datetime.datetime.now()
         import_processes[process_id]['run_time_in_seconds'] = datetime.datetime.now()-start
     except Exception as error:
@@ -640,7 +1282,8 @@ async def import_geographic_data_from_json_file(
     read_access_list: list,
     write_access_list: list,
     searchable: bool,
-    app: FastAPI
+    app: FastAPI,
+    merge: dict=None
 ) -> None:
     """
     Method to upload data from from a json file with geographic data.
@@ -650,19 +1293,17 @@ async def import_geographic_data_from_json_file(
     start = datetime.datetime.now()
 
     try:
-        df = pd.read_json(file_path)
-
-        df.to_csv(f"{os.getcwd()}/media/{new_table_id}.csv", index=False, sep=',', encoding="utf-8")
-
-        await upload_csv_to_db_with_geographic_data(
-            file_path=f"{os.getcwd()}/media/{new_table_id}.csv",
+        await upload_json_to_db_with_geographic_data(
+            file_path=file_path,
             new_table_id=new_table_id,
             map_name=map_name,
             map_column=map_column,
             table_column=table_column,
             table_columns=table_columns,
             map_columns=map_columns,
-            app=app
+            app=app,
+            process_id=process_id,
+            staging=merge is not None
         )
 
         item = {
@@ -676,12 +1317,15 @@ async def import_geographic_data_from_json_file(
             "searchable": searchable
         }
 
-        await utilities.create_single_item_in_database(
+        saved_table_id = await save_imported_table(
+            table_id=new_table_id,
             item=item,
-            model_name="Table"
+            process_id=process_id,
+            app=app,
+            merge=merge
         )
         import_processes[process_id]['status'] = "SUCCESS"
-        import_processes[process_id]['new_table_id'] = new_table_id
+        import_processes[process_id]['new_table_id'] = saved_table_id
         import_processes[process_id]['completion_time'] = datetime.datetime.now()
         import_processes[process_id]['run_time_in_seconds'] = datetime.datetime.now()-start
     except Exception as error:
@@ -694,66 +1338,743 @@ async def import_geographic_data_from_json_file(
         import_processes[process_id]['completion_time'] = datetime.datetime.now()
         import_processes[process_id]['run_time_in_seconds'] = datetime.datetime.now()-start
 
-def load_geographic_data_to_server(
+async def download_file(
+    url: str,
+    file_path: str,
+    process_id: str
+) -> None:
+    """
+    Method used to stream a file from a url to disk and report the bytes downloaded in the status of an import.
+    The download fails after DOWNLOAD_TIMEOUT_IN_SECONDS, or when no data arrives for DOWNLOAD_READ_TIMEOUT_IN_SECONDS.
+
+    """
+
+    timeout = aiohttp.ClientTimeout(
+        total=config.DOWNLOAD_TIMEOUT_IN_SECONDS,
+        sock_read=config.DOWNLOAD_READ_TIMEOUT_IN_SECONDS
+    )
+
+    try:
+        async with aiohttp.ClientSession(timeout=timeout) as session:
+            async with session.get(url) as resp:
+                if resp.status != 200:
+                    raise Exception(f"Invalid URL. The url returned a status code of {resp.status}.")
+
+                if resp.content_length is not None and resp.content_length > config.MAX_DOWNLOAD_SIZE_IN_BYTES:
+                    raise Exception(f"The file is larger than {config.MAX_DOWNLOAD_SIZE_IN_BYTES} bytes.")
+
+                import_processes[process_id]['download_size_in_bytes'] = resp.content_length
+                import_processes[process_id]['downloaded_bytes'] = 0
+
+                async with aiofiles.open(file_path, "wb") as file:
+                    async for chunk in resp.content.iter_chunked(config.DOWNLOAD_CHUNK_SIZE):
+                        import_processes[process_id]['downloaded_bytes'] += len(chunk)
+                        if import_processes[process_id]['downloaded_bytes'] > config.MAX_DOWNLOAD_SIZE_IN_BYTES:
+                            raise Exception(f"The file is larger than {config.MAX_DOWNLOAD_SIZE_IN_BYTES} bytes.")
+                        await file.write(chunk)
+    except asyncio.TimeoutError as error:
+        raise Exception(
+            f"The download did not finish within {config.DOWNLOAD_TIMEOUT_IN_SECONDS} seconds "
+            f"or stopped sending data for {config.DOWNLOAD_READ_TIMEOUT_IN_SECONDS} seconds."
+        ) from error
+
+async def import_geographic_data_from_json_url(
+    url: str,
+    new_table_id: str,
+    process_id: str,
+    map_name: str,
+    map_column: str,
+    table_column: str,
+    table_columns: list,
+    map_columns: list,
+    username: str,
+    title: str,
+    tags: list,
+    description: str,
+    read_access_list: list,
+    write_access_list: list,
+    searchable: bool,
+    app: FastAPI,
+    merge: dict=None
+) -> None:
+    """
+    Method to download a json file with geographic data from a url and upload it.
+
+    """
+
+    start = datetime.datetime.now()
+
+    file_path = f"{os.getcwd()}/media/{new_table_id}.json"
+
+    try:
+        await download_file(
+            url=url,
+            file_path=file_path,
+            process_id=process_id
+        )
+    except Exception as error:
+        media_directory = os.listdir(f"{os.getcwd()}/media/")
+        for file in media_directory:
+            if new_table_id in file:
+                os.remove(f"{os.getcwd()}/media/{file}")
+        import_processes[process_id]['status'] = "FAILURE"
+        import_processes[process_id]['error'] = str(error)
+        import_processes[process_id]['completion_time'] = datetime.datetime.now()
+        import_processes[process_id]['run_time_in_seconds'] = datetime.datetime.now()-start
+        return
+
+    await import_geographic_data_from_json_file(
+        file_path=file_path,
+        new_table_id=new_table_id,
+        process_id=process_id,
+        map_name=map_name,
+        map_column=map_column,
+        table_column=table_column,
+        table_columns=table_columns,
+        map_columns=map_columns,
+        username=username,
+        title=title,
+        tags=tags,
+        description=description,
+        read_access_list=read_access_list,
+        write_access_list=write_access_list,
+        searchable=searchable,
+        app=app,
+        merge=merge
+    )
+
+async def import_point_data_from_json_url(
+    url: str,
+    new_table_id: str,
+    process_id: str,
+    latitude: str,
+    longitude: str,
+    table_columns: list,
+    username: str,
+    title: str,
+    tags: list,
+    description: str,
+    read_access_list: list,
+    write_access_list: list,
+    searchable: bool,
+    app: FastAPI,
+    merge: dict=None
+) -> None:
+    """
+    Method to download a json file with lat lng columns from a url and upload it.
+
+    """
+
+    start = datetime.datetime.now()
+
+    file_path = f"{os.getcwd()}/media/{new_table_id}.json"
+
+    try:
+        await download_file(
+            url=url,
+            file_path=file_path,
+            process_id=process_id
+        )
+    except Exception as error:
+        media_directory = os.listdir(f"{os.getcwd()}/media/")
+        for file in media_directory:
+            if new_table_id in file:
+                os.remove(f"{os.getcwd()}/media/{file}")
+        import_processes[process_id]['status'] = "FAILURE"
+        import_processes[process_id]['error'] = str(error)
+        import_processes[process_id]['completion_time'] = datetime.datetime.now()
+        import_processes[process_id]['run_time_in_seconds'] = datetime.datetime.now()-start
+        return
+
+    await import_point_data_from_json_file(
+        file_path=file_path,
+        new_table_id=new_table_id,
+        process_id=process_id,
+        latitude=latitude,
+        longitude=longitude,
+        table_columns=table_columns,
+        username=username,
+        title=title,
+        tags=tags,
+        description=description,
+        read_access_list=read_access_list,
+        write_access_list=write_access_list,
+        searchable=searchable,
+        app=app,
+        merge=merge
+    )
+
+async def import_geojson_from_url(
+    url: str,
+    new_table_id: str,
+    process_id: str,
+    username: str,
+    title: str,
+    tags: list,
+    description: str,
+    read_access_list: list,
+    write_access_list: list,
+    searchable: bool,
+    app: FastAPI,
+    merge: dict=None
+) -> None:
+    """
+    Method to download a geojson file from a url and upload it.
+
+    """
+
+    start = datetime.datetime.now()
+
+    file_path = f"{os.getcwd()}/media/{new_table_id}.geojson"
+
+    try:
+        await download_file(
+            url=url,
+            file_path=file_path,
+            process_id=process_id
+        )
+    except Exception as error:
+        media_directory = os.listdir(f"{os.getcwd()}/media/")
+        for file in media_directory:
+            if new_table_id in file:
+                os.remove(f"{os.getcwd()}/media/{file}")
+        import_processes[process_id]['status'] = "FAILURE"
+        import_processes[process_id]['error'] = str(error)
+        import_processes[process_id]['completion_time'] = datetime.datetime.now()
+        import_processes[process_id]['run_time_in_seconds'] = datetime.datetime.now()-start
+        return
+
+    await upload_geographic_file(
+        file_path=file_path,
+        new_table_id=new_table_id,
+        process_id=process_id,
+        username=username,
+        title=title,
+        tags=tags,
+        description=description,
+        read_access_list=read_access_list,
+        write_access_list=write_access_list,
+        searchable=searchable,
+        app=app,
+        merge=merge
+    )
+
+async def read_ogr2ogr_progress(
+    stream: asyncio.StreamReader,
+    process_id: str=None
+) -> None:
+    """
+    Method used to read the progress output of ogr2ogr into the status of an import.
+
+    """
+
+    output = ""
+
+    while True:
+        chunk = await stream.read(64)
+
+        if not chunk:
+            break
+
+        output += chunk.decode("utf-8", errors="ignore")
+
+        percentages = re.findall(r"(\d+)(?=\.|\s|$)", output)
+
+        if process_id in import_processes and percentages:
+            import_processes[process_id]['progress'] = min(int(percentages[-1]), 100)
+
+async def load_geographic_data_to_server(
     table_id: str,
-    file_path: str
+    file_path: str,
+    process_id: str=None
 ) -> None:
     """
     Method used to load a geographic file into the database.
 
     """
-    host = config.DB_HOST
-    username = config.DB_USERNAME
-    password = config.DB_PASSWORD
-    database = config.DB_DATABASE
-    subprocess.call(f'ogr2ogr -f "PostgreSQL" "PG:host={host} user={username} dbname={database} password={password} port={config.DB_PORT}" "{file_path}" -lco GEOMETRY_NAME=geom -lco FID=gid -nlt PROMOTE_TO_MULTI -lco PRECISION=no -nln user_data.{table_id} -overwrite', shell=True)
-    media_directory = os.listdir(f"{os.getcwd()}/media/")
-    for file in media_directory:
-        if table_id in file:
-            os.remove(f"{os.getcwd()}/media/{file}")
-async def clean_up_table(
+
+    command = [
+        "ogr2ogr",
+        "-progress",
+        "-f", "PostgreSQL",
+        f"PG:host={config.DB_HOST} user={config.DB_USERNAME} dbname={config.DB_DATABASE} port={config.DB_PORT}",
+        file_path,
+        "-lco", "GEOMETRY_NAME=geom",
+        "-lco", "FID=gid",
+        "-nlt", "PROMOTE_TO_MULTI",
+        "-lco", "PRECISION=no",
+        "-nln", f"user_data.{table_id}",
+        "-overwrite"
+    ]
+
+    environment = dict(os.environ)
+    environment['PGPASSWORD'] = config.DB_PASSWORD
+
+    try:
+        async with executor.get_category_semaphore("import"):
+            process = await asyncio.create_subprocess_exec(
+                *command,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                env=environment
+            )
+
+            try:
+                _, stderr, return_code = await asyncio.wait_for(
+                    asyncio.gather(
+                        read_ogr2ogr_progress(process.stdout, process_id),
+                        process.stderr.read(),
+                        process.wait()
+                    ),
+                    timeout=config.OGR2OGR_TIMEOUT_IN_SECONDS
+                )
+            except asyncio.TimeoutError as exc:
+                process.kill()
+                await process.wait()
+                raise RuntimeError(
+                    f"ogr2ogr did not finish within {config.OGR2OGR_TIMEOUT_IN_SECONDS} seconds."
+                ) from exc
+            except asyncio.CancelledError:
+                process.kill()
+                await process.wait()
+                raise
+
+        if return_code != 0:
+            raise RuntimeError(
+                f"ogr2ogr failed with exit code {return_code}: {stderr.decode('utf-8', errors='ignore').strip()}"
+            )
+    finally:
+        media_directory = os.listdir(f"{os.getcwd()}/media/")
+        for file in media_directory:
+            if table_id in file:
+                os.remove(f"{os.getcwd()}/media/{file}")
+
+async def get_table_columns(
+    con: object,
+    table_id: str
+) -> dict:
+    """
+    Method to return the columns of a table in user_data and their types in order.
+
+    """
+
+    columns = await con.fetch("""
+    SELECT attname AS column_name, format_type(atttypid, atttypmod) AS column_type
+    FROM pg_attribute
+    WHERE attrelid = $1::regclass
+    AND attnum > 0
+    AND NOT attisdropped
+    ORDER BY attnum;
+    """, f'user_data."{table_id}"')
+
+    return {column['column_name']: column['column_type'] for column in columns}
+
+def get_repaired_geometry_sql(
+    geom_type: str
+) -> str:
+    """
+    Method used to return the sql that repairs an invalid geom so it still fits the type of its column.
+    An invalid single part geometry that is split into several parts by the repair is kept as it is.
+
+    """
+
+    match = re.match(r"^geometry\((multi)?(point|linestring|polygon)(zm|z|m)?,", geom_type.lower())
+
+    if match is None:
+        if "geometrycollection" in geom_type.lower():
+            return f"ST_ForceCollection(ST_MakeValid(geom))::{geom_type}"
+        return f"ST_Multi(ST_CollectionExtract(ST_MakeValid(geom)))::{geom_type}"
+
+    collection_type = {"point": 1, "linestring": 2, "polygon": 3}[match.group(2)]
+
+    extracted_geom = f"ST_CollectionExtract(ST_MakeValid(geom), {collection_type})"
+
+    if match.group(1):
+        return f"ST_Multi({extracted_geom})::{geom_type}"
+
+    return f"""CASE
+        WHEN ST_NumGeometries({extracted_geom}) = 1 THEN ST_GeometryN({extracted_geom}, 1)::{geom_type}
+        ELSE geom
+    END"""
+
+async def clean_up_staging_table(
     table_id: str,
-    app: FastAPI
-):
-    """Method to clean up table in postgres after upload."""
+    app: FastAPI,
+    process_id: str=None
+) -> None:
+    """
+    Method to prepare a table that is merged into an existing table and then dropped.
+    Null geometries are removed and invalid geometries repaired in place, so the gid
+    keeps the order of the source rows and no index or statistics are built.
 
+    """
+
+    timings = {}
 
     pool = app.state.database
 
     async with pool.acquire() as con:
 
-        await con.fetch(f"""
-        DELETE FROM user_data.{table_id}
+        start = time.perf_counter()
+
+        columns = await get_table_columns(con, table_id)
+
+        geom_type = columns.get("geom", "geometry")
+
+        await con.execute(f"""
+        DELETE FROM user_data."{table_id}"
         WHERE geom IS NULL;
         """)
 
-        await con.fetch(f"""
-        CREATE INDEX {table_id}_geom_idx
-        ON user_data.{table_id}
-        USING GIST (geom);
+        await con.execute(f"""
+        UPDATE user_data."{table_id}"
+        SET geom = {get_repaired_geometry_sql(geom_type)}
+        WHERE NOT ST_IsValid(geom);
         """)
 
-        await con.fetch(f"""
-        CLUSTER user_data.{table_id}
-        USING {table_id}_geom_idx;
-        """)
+        timings['repair_geometries'] = time.perf_counter() - start
 
-        await con.fetch(f"""
-        ALTER TABLE user_data.{table_id} 
-        DROP COLUMN IF EXISTS gid;
-        """)
+    if process_id in import_processes:
+        import_processes[process_id]['finalize_timings_in_seconds'] = timings
 
-        await con.fetch(f"""
-        ALTER TABLE user_data.{table_id} 
-        ADD COLUMN gid SERIAL PRIMARY KEY;
-        """)
+async def clean_up_table(
+    table_id: str,
+    app: FastAPI,
+    process_id: str=None,
+    staging: bool=False
+) -> None:
+    """
+    Method to build the final version of a table in postgres after upload.
+    The table is rewritten once without null geometries, with repaired geometries and a new gid.
+    Rows are written in the btree order of their geometry, so nearby features mostly
+    end up on the same pages without a CLUSTER.
+    Staging tables of a merge are only cleaned with clean_up_staging_table.
 
-        await con.fetch(f"""
-        UPDATE user_data.{table_id}
-        SET geom = ST_Multi(ST_CollectionExtract(ST_MakeValid(geom)))
-        WHERE ST_IsValid(geom) = false;
-        """)
+    """
+
+    if staging:
+        await clean_up_staging_table(
+            table_id=table_id,
+            app=app,
+            process_id=process_id
+        )
+        return
+
+    timings = {}
+
+    pool = app.state.database
+
+    async with pool.acquire() as con:
+
+        start = time.perf_counter()
+
+        columns = await get_table_columns(con, table_id)
+
+        formatted_columns = ""
+
+        geom_type = columns.get("geom", "geometry")
+
+        for column in columns:
+            if column not in ["gid", "geom"]:
+                formatted_columns += f"{quote_identifier(column)},"
+
+        async with con.transaction():
+            await con.execute(f"""DROP TABLE IF EXISTS user_data."{table_id}_finalized";""")
+
+            row_count = await con.execute(f"""
+            CREATE TABLE user_data."{table_id}_finalized" AS
+            SELECT {formatted_columns} geom,
+            (ROW_NUMBER() OVER (ORDER BY geom))::integer AS gid
+            FROM (
+                SELECT {formatted_columns}
+                CASE
+                    WHEN ST_IsValid(geom) THEN geom
+                    ELSE {get_repaired_geometry_sql(geom_type)}
+                END AS geom
+                FROM user_data."{table_id}"
+                WHERE geom IS NOT NULL
+            ) AS repaired
+            ORDER BY geom;
+            """)
+
+            row_count = int(row_count.split()[-1])
+
+            await con.execute(f"""DROP TABLE user_data."{table_id}";""")
+
+            await con.execute(f"""
+            ALTER TABLE user_data."{table_id}_finalized"
+            RENAME TO "{table_id}";
+            """)
+
+            timings['build_table'] = time.perf_counter() - start
+
+            start = time.perf_counter()
+
+            await con.execute(f"""
+            CREATE SEQUENCE user_data."{table_id}_gid_seq"
+            START WITH {row_count + 1}
+            OWNED BY user_data."{table_id}".gid;
+            """)
+
+            await con.execute(f"""
+            ALTER TABLE user_data."{table_id}"
+            ALTER COLUMN gid SET DEFAULT nextval('user_data."{table_id}_gid_seq"'),
+            ADD PRIMARY KEY (gid);
+            """)
+
+            timings['primary_key'] = time.perf_counter() - start
+
+            start = time.perf_counter()
+
+            await con.execute(f"""
+            CREATE INDEX "{table_id}_geom_idx"
+            ON user_data."{table_id}"
+            USING GIST (geom);
+            """)
+
+            timings['spatial_index'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+
+        await con.execute(f"""ANALYZE user_data."{table_id}";""")
+
+        timings['analyze'] = time.perf_counter() - start
+
+    if process_id in import_processes:
+        import_processes[process_id]['row_count'] = row_count
+        import_processes[process_id]['finalize_timings_in_seconds'] = timings
+
+async def merge_table(
+    staging_table_id: str,
+    table_id: str,
+    mode: str,
+    key_columns: list,
+    app: FastAPI,
+    process_id: str=None
+) -> None:
+    """
+    Method to append or upsert the rows of a staging table into an existing table in one statement.
+    Columns of the staging table that the existing table does not have are ignored.
+    An upsert is rejected when a staging row has an empty key column, and when
+    several staging rows share a key the last source row, by gid, is used.
+    Only the cached tiles that intersect the inserted, updated or replaced geometries are removed.
+
+    """
+
+    pool = app.state.database
+
+    start = time.perf_counter()
+
+    try:
+        async with pool.acquire() as con:
+            columns = await get_table_columns(con, table_id)
+
+            staging_columns = await get_table_columns(con, staging_table_id)
+
+            merge_columns = [
+                column for column in columns if column != "gid" and column in staging_columns
+            ]
+
+            if "geom" not in merge_columns:
+                raise ValueError(f"Table {table_id} does not have a geom column.")
+
+            for column in key_columns:
+                if column not in merge_columns:
+                    raise ValueError(f"Key column {column} does not exist in both tables.")
+
+            if mode == "upsert" and not key_columns:
+                raise ValueError("Please provide key_columns to upsert rows.")
+
+            if mode == "upsert":
+                null_key_filter = " OR ".join(
+                    f"{quote_identifier(column)} IS NULL" for column in key_columns
+                )
+
+                null_keys = await con.fetchval(f"""
+                SELECT EXISTS (
+                    SELECT 1
+                    FROM user_data."{staging_table_id}"
+                    WHERE {null_key_filter}
+                );
+                """)
+
+                if null_keys:
+                    raise ValueError("Rows with an empty key column can not be upserted.")
+
+            srid = await con.fetchval(f"""
+            SELECT ST_SRID(geom)
+            FROM user_data."{table_id}"
+            WHERE geom IS NOT NULL
+            LIMIT 1;
+            """)
+
+            formatted_columns = ""
+
+            formatted_values = ""
+
+            formatted_updates = ""
+
+            for column in merge_columns:
+                if column == "geom" and srid:
+                    value = f"ST_Transform(s.geom, {srid})::{columns[column]}"
+                else:
+                    value = f"s.{quote_identifier(column)}::{columns[column]}"
+
+                formatted_columns += f"{quote_identifier(column)},"
+                formatted_values += f"{value},"
+                formatted_updates += f"{quote_identifier(column)} = {value},"
+
+            formatted_columns = formatted_columns[:-1]
+            formatted_values = formatted_values[:-1]
+            formatted_updates = formatted_updates[:-1]
+
+            if mode == "upsert":
+                formatted_keys = ",".join(quote_identifier(column) for column in key_columns)
+
+                key_filter = " AND ".join(
+                    f"t.{quote_identifier(column)} = s.{quote_identifier(column)}::{columns[column]}"
+                    for column in key_columns
+                )
+
+                merge_query = f"""
+                WITH staging AS (
+                    SELECT DISTINCT ON ({formatted_keys}) *
+                    FROM user_data."{staging_table_id}"
+                    ORDER BY {formatted_keys}, gid DESC
+                ),
+                updated AS (
+                    UPDATE user_data."{table_id}" AS t
+                    SET {formatted_updates}
+                    FROM staging AS s, user_data."{table_id}" AS old
+                    WHERE old.gid = t.gid
+                    AND {key_filter}
+                    RETURNING old.geom AS old_geom, t.geom AS new_geom
+                ),
+                inserted AS (
+                    INSERT INTO user_data."{table_id}" ({formatted_columns})
+                    SELECT {formatted_values}
+                    FROM staging AS s
+                    WHERE NOT EXISTS (
+                        SELECT 1
+                        FROM user_data."{table_id}" AS t
+                        WHERE {key_filter}
+                    )
+                    RETURNING geom
+                ),
+                changed AS (
+                    SELECT old_geom AS geom FROM updated
+                    UNION ALL
+                    SELECT new_geom FROM updated
+                    UNION ALL
+                    SELECT geom FROM inserted
+                )
+                """
+            else:
+                merge_query = f"""
+                WITH updated AS (
+                    SELECT NULL::geometry AS old_geom
+                    WHERE false
+                ),
+                inserted AS (
+                    INSERT INTO user_data."{table_id}" ({formatted_columns})
+                    SELECT {formatted_values}
+                    FROM user_data."{staging_table_id}" AS s
+                    RETURNING geom
+                ),
+                changed AS (
+                    SELECT geom FROM inserted
+                )
+                """
+
+            merge_query += """
+            SELECT (SELECT COUNT(*) FROM updated) AS updated_rows,
+            (SELECT COUNT(*) FROM inserted) AS inserted_rows,
+            COUNT(*) AS changed_geometries,
+            CASE WHEN COUNT(*) <= $1 THEN
+                array_agg(ARRAY[ST_XMin(box), ST_YMin(box), ST_XMax(box), ST_YMax(box)])
+            END AS bounding_boxes
+            FROM (
+                SELECT Box2D(ST_Transform(geom, 4326)) AS box
+                FROM changed
+                WHERE geom IS NOT NULL
+            ) AS changed_boxes;
+            """
+
+            result = await con.fetchrow(merge_query, config.TILE_INVALIDATION_MAX_FEATURES)
+
+            await con.execute(f"""ANALYZE user_data."{table_id}";""")
+
+        column_usage.record_column_usage(
+            table_id,
+            key_columns,
+            "filter",
+            (time.perf_counter() - start) * 1000
+        )
+
+        if result['changed_geometries'] > config.TILE_INVALIDATION_MAX_FEATURES:
+            await executor.run_in_thread("import", utilities.delete_user_tile_cache, table_id)
+
+            removed_tiles = None
+        elif result['bounding_boxes']:
+            removed_tiles = await executor.run_in_thread(
+                "import",
+                utilities.delete_user_tile_cache_in_bounds,
+                table_id,
+                result['bounding_boxes']
+            )
+        else:
+            removed_tiles = 0
+
+        await response_cache.invalidate_table(table_id)
+
+        await utilities.update_table_metadata(
+            table_id=table_id,
+            app=app,
+            estimated=True
+        )
+    finally:
+        async with pool.acquire() as con:
+            await con.execute(f"""DROP TABLE IF EXISTS user_data."{staging_table_id}";""")
+
+    if process_id in import_processes:
+        import_processes[process_id]['inserted_rows'] = result['inserted_rows']
+        import_processes[process_id]['updated_rows'] = result['updated_rows']
+        import_processes[process_id]['removed_tiles'] = removed_tiles
+        import_processes[process_id]['merge_time_in_seconds'] = time.perf_counter() - start
+
+async def save_imported_table(
+    table_id: str,
+    item: dict,
+    process_id: str,
+    app: FastAPI,
+    merge: dict=None
+) -> str:
+    """
+    Method to create the item of an imported table, or merge the table into an
+    existing table, and return the id of the table that holds the data.
+
+    """
+
+    if merge is not None:
+        await merge_table(
+            staging_table_id=table_id,
+            table_id=merge['table_id'],
+            mode=merge['mode'],
+            key_columns=merge['key_columns'],
+            app=app,
+            process_id=process_id
+        )
+
+        return merge['table_id']
+
+    await utilities.create_single_item_in_database(
+        item=item,
+        model_name="Table"
+    )
+
+    await utilities.update_table_metadata(
+        table_id=item['table_id'],
+        app=app
+    )
 
-        await con.fetch(f"""
-        VACUUM ANALYZE user_data.{table_id};
-        """)
\ No newline at end of file
+    return table_id
@@ -112,6 +112,8 @@ async def create_group(
         for name in group.group_admins:
             await db_models.GroupAdmin.create(username=name.username, group_id_id=new_group.group_id)
 
+        utilities.clear_access_cache()
+
         return await db_models.Group_Pydantic.from_tortoise_orm(new_group)
     except exceptions.IntegrityError as exc:
         raise HTTPException(status_code=400, detail="Group name already exist.") from exc
@@ -218,6 +220,7 @@ async def update_group(
             await db_models.GroupUser.filter(
                 id=name.id, group_id_id=group_id
             ).update(username=name.username)
+        utilities.clear_access_cache()
         return await db_models.Group_Pydantic.from_queryset_single(
             db_models.Group.get(group_id=group_id)
         )
@@ -280,6 +283,7 @@ async def delete_group(
         deleted_count = await db_models.Group.filter(group_id=group_id).delete()
         if not deleted_count:
             raise HTTPException(status_code=404, detail="Group not found")
+        utilities.clear_access_cache()
         return {"status": True}
     except exceptions.DoesNotExist as exc:
         raise HTTPException(status_code=404, detail="Group not found.") from exc
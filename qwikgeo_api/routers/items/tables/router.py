@@ -10,6 +10,7 @@ import qwikgeo_api.routers.items.tables.models as models
 from qwikgeo_api import utilities
 from qwikgeo_api import db_models
 from qwikgeo_api import authentication_handler
+from qwikgeo_api import response_cache
 
 router = APIRouter()
 
@@ -177,6 +178,11 @@ async def create_table(
             model_name="Table"
         )
 
+        await utilities.update_table_metadata(
+            table_id=new_table_id,
+            app=request.app
+        )
+
         return {"status": True, "table_id": new_table_id}
 
 @router.delete(
@@ -245,4 +251,6 @@ async def delete_table(
         if os.path.exists(f'{os.getcwd()}/cache/user_data_{table_id}'):
             shutil.rmtree(f'{os.getcwd()}/cache/user_data_{table_id}')
 
+        await response_cache.invalidate_table(table_id)
+
         return {"status": True}
@@ -6,6 +6,8 @@ from fastapi import APIRouter, HTTPException, Depends
 from tortoise import exceptions
 
 from qwikgeo_api import db_models
+from qwikgeo_api import utilities
+from qwikgeo_api import executor
 import qwikgeo_api.routers.items.users.models as models
 from qwikgeo_api import authentication_handler
 
@@ -41,10 +43,12 @@ async def create_user(
     More information at https://docs.qwikgeo.com/users/#create-user
     """
 
+    password_hash = await executor.run_in_thread("password", bcrypt.hash, user.password_hash)
+
     try:
         user_obj = db_models.User(
             username=user.username,
-            password_hash=bcrypt.hash(user.password_hash),
+            password_hash=password_hash,
             first_name=user.first_name,
             last_name=user.last_name,
             email=user.email,
@@ -172,6 +176,7 @@ async def delete_user(
     deleted_count = await db_models.User.filter(username=username).delete()
     if not deleted_count:
         raise HTTPException(status_code=404, detail="User not found.")
+    utilities.clear_access_cache()
     return models.Status(message="Deleted user.")
 
 @router.get(
@@ -2,32 +2,50 @@
 
 import os
 import json
+import math
+import asyncio
 import random
 import re
 import string
 import uuid
+import time
 import datetime
 import subprocess
 import shutil
-from functools import reduce
 import jwt
+import lark
 from fastapi.security import OAuth2PasswordBearer
 from fastapi import Depends, FastAPI, HTTPException, status
-from pygeofilter.backends.sql import to_sql_where
 from pygeofilter.parsers.ecql import parse
 import aiohttp
 import pandas as pd
 import tortoise
-from tortoise.query_utils import Prefetch
-from tortoise.expressions import Q
+from tortoise.expressions import Q, Subquery
 from jwt.exceptions import ExpiredSignatureError, InvalidSignatureError, DecodeError
 import asyncpg
+from cachetools import LRUCache, TTLCache
 
 from qwikgeo_api import db_models
 from qwikgeo_api import config
+from qwikgeo_api import column_usage
+from qwikgeo_api import view_counter
+from qwikgeo_api import executor
+from qwikgeo_api.query_builder import QueryBuilder, quote_identifier, to_parameterized_sql_where
 
 import_processes = {}
 
+cql_filter_cache = LRUCache(maxsize=config.CQL_FILTER_CACHE_SIZE)
+
+access_cache = TTLCache(
+    maxsize=config.ACCESS_CACHE_MAX_SIZE,
+    ttl=max(config.ACCESS_CACHE_TTL_IN_SECONDS, 1)
+)
+
+user_groups_cache = TTLCache(
+    maxsize=config.ACCESS_CACHE_MAX_SIZE,
+    ttl=max(config.ACCESS_CACHE_TTL_IN_SECONDS, 1)
+)
+
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl='token')
 
 async def get_all_tables_from_db(
@@ -92,6 +110,40 @@ def get_database_serializer_name(model_name):
     elif model_name == "Group":
         return db_models.Group_Pydantic
 
+def clear_access_cache() -> None:
+    """
+    Method to clear cached access decisions and group memberships.
+    Used whenever items, access lists, groups or group users change.
+
+    """
+
+    access_cache.clear()
+    user_groups_cache.clear()
+
+def get_access_cache_key(
+    query_filter,
+    model_name: str,
+    username: str,
+    write_access: bool
+) -> tuple:
+    """
+    Method to return the cache key of an access decision or None if it can not be cached.
+
+    """
+
+    if config.ACCESS_CACHE_TTL_IN_SECONDS <= 0:
+        return None
+
+    if not isinstance(query_filter, Q) or query_filter.children or query_filter._is_negated:
+        return None
+
+    return (
+        get_database_model_name(model_name).__name__,
+        tuple(sorted((key, str(value)) for key, value in query_filter.filters.items())),
+        username,
+        write_access
+    )
+
 async def validate_item_access(
     query_filter,
     model_name: str,
@@ -100,6 +152,43 @@ async def validate_item_access(
 ) -> bool:
     """
     Method to validate if user has access to item in portal.
+    Decisions are cached for ACCESS_CACHE_TTL_IN_SECONDS.
+
+    """
+
+    cache_key = get_access_cache_key(query_filter, model_name, username, write_access)
+
+    if cache_key is not None and cache_key in access_cache:
+        denied = access_cache[cache_key]
+    else:
+        try:
+            await check_item_access(
+                query_filter=query_filter,
+                model_name=model_name,
+                username=username,
+                write_access=write_access
+            )
+            denied = None
+        except HTTPException as exc:
+            denied = (exc.status_code, exc.detail)
+
+        if cache_key is not None:
+            access_cache[cache_key] = denied
+
+    if denied is not None:
+        raise HTTPException(
+            status_code=denied[0],
+            detail=denied[1]
+        )
+
+async def check_item_access(
+    query_filter,
+    model_name: str,
+    username: str,
+    write_access: bool=False,
+) -> None:
+    """
+    Method to check in the database if user has access to item in portal.
 
     """
 
@@ -170,44 +259,32 @@ async def get_multiple_items_in_database(
     database_model_name = get_database_model_name(model_name)
     database_model_serializer = get_database_serializer_name(model_name)
 
-    user_groups = await get_user_groups(username)
-
-    portal_items = await db_models.ItemReadAccessListPydantic.from_queryset(db_models.ItemReadAccessList.filter(
-        reduce(lambda x, y: x | y, [Q(name=group) for group in user_groups])
-    ))
-
     default_filter = None
 
     if model_name not in ["Group","ItemOut"]:
 
-        portal_ids = []
+        user_groups = await get_user_groups(username)
 
-        for portal_item in portal_items:
-            portal_ids.append(portal_item.portal_id.portal_id)
-        
-        default_filter = Q(item_id__in=portal_ids)
+        readable_portal_ids = Subquery(
+            db_models.ItemReadAccessList.filter(name__in=user_groups).values("portal_id_id")
+        )
+
+        default_filter = Q(item_id__in=readable_portal_ids)
 
         if model_name == "Item":
-            default_filter = Q(portal_id__in=portal_ids)
+            default_filter = Q(portal_id__in=readable_portal_ids)
+
+    queryset = database_model_name.filter()
+
+    if default_filter is not None:
+        queryset = queryset.filter(default_filter)
 
     if query_filter != "":
-        if default_filter == None:
-            items = await database_model_serializer.from_queryset(
-                database_model_name.filter(query_filter).limit(limit).offset(offset)
-            )
-        else:
-            items = await database_model_serializer.from_queryset(
-                database_model_name.filter(default_filter, query_filter).limit(limit).offset(offset)
-            )
-    else:
-        if default_filter == None:
-            items = await database_model_serializer.from_queryset(
-                database_model_name.filter().limit(limit).offset(offset)
-            )
-        else:
-            items = await database_model_serializer.from_queryset(
-                database_model_name.filter(default_filter).limit(limit).offset(offset)
-            )
+        queryset = queryset.filter(query_filter)
+
+    items = await database_model_serializer.from_queryset(
+        queryset.limit(limit).offset(offset)
+    )
 
     return items
 
@@ -237,18 +314,10 @@ async def get_item_in_database(
     )
 
     if model_name not in ['Item','ItemOut']:
-        item = await db_models.Item_Pydantic.from_queryset_single(
-            db_models.Item.get(portal_id=portal_item.item.portal_id)
-        )
-
-        await db_models.Item.filter(
-            portal_id=portal_item.item.portal_id
-        ).update(views=item.views+1)
+        view_counter.record_view(portal_item.item.portal_id)
     else:
-        await db_models.Item.filter(
-            query_filter
-        ).update(views=portal_item.views+1)
-    
+        view_counter.record_view(portal_item.portal_id)
+
     return portal_item
 
 async def create_single_item_in_database(
@@ -288,6 +357,8 @@ async def create_single_item_in_database(
 
     await database_model_name.create(**item)
 
+    clear_access_cache()
+
     return db_item
 
 async def update_single_item_in_database(
@@ -339,6 +410,8 @@ async def delete_single_item_in_database(
 
     await database_model_name.filter(query_filter).delete()
 
+    clear_access_cache()
+
 async def update_read_and_write_access_list(
     portal_id: str,
     read_access_list: list,
@@ -357,6 +430,8 @@ async def update_read_and_write_access_list(
     for name in write_access_list:
         await db_models.ItemWriteAccessList.create(name=name, portal_id_id=portal_id)
 
+    clear_access_cache()
+
 async def get_token_header(
     token: str=Depends(oauth2_scheme)
 ) -> str:
@@ -378,21 +453,25 @@ async def get_user_groups(
     username: str
 ) -> list:
     """
-    Method to return a list of groups a user has access to within the portal.
+    Method to return the user's username and the names of the groups they belong to.
 
     """
 
+    if config.ACCESS_CACHE_TTL_IN_SECONDS > 0 and username in user_groups_cache:
+        return list(user_groups_cache[username])
+
     groups_plus_username = [username]
 
-    groups = (
-        await db_models.Group.all()
-        .prefetch_related(Prefetch(
-            "group_users", queryset=db_models.GroupUser.filter(username=username)
-        ))
+    group_names = (
+        await db_models.Group.filter(group_users__username=username)
+        .distinct()
+        .values_list("name", flat=True)
     )
 
-    for group in groups:
-        groups_plus_username.append(group.name)
+    groups_plus_username.extend(group_names)
+
+    if config.ACCESS_CACHE_TTL_IN_SECONDS > 0:
+        user_groups_cache[username] = list(groups_plus_username)
 
     return groups_plus_username
 
@@ -418,7 +497,7 @@ async def authenticate_user(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail='Invalid username or password.'
         )
-    if not user.verify_password(password):
+    if not await executor.run_in_thread("password", user.verify_password, password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail='Invalid username or password.'
@@ -449,17 +528,16 @@ async def get_tile(
 
     async with pool.acquire() as con:
 
-
-        sql_field_query = f"""
+        sql_field_query = """
         SELECT column_name
         FROM information_schema.columns
-        WHERE table_name = '{table_id}'
+        WHERE table_name = $1
         AND column_name != 'geom';
         """
 
         field_mapping = {}
 
-        db_fields = await con.fetch(sql_field_query)
+        db_fields = await con.fetch(sql_field_query, table_id)
 
         for field in db_fields:
             field_mapping[field['column_name']] = field['column_name']
@@ -469,37 +547,50 @@ async def get_tile(
 
             for field in db_fields:
                 column = field['column_name']
-                field_list += f', "{column}"'
+                field_list += f', {quote_identifier(column)}'
         else:
-            field_list = f',"{fields}"'
+            field_list = f',{quote_identifier(fields)}'
 
-        sql_vector_query = f"""
-        SELECT ST_AsMVT(tile, 'user_data.{table_id}', 4096)
+        sql_vector_query = QueryBuilder(f"""
+        SELECT ST_AsMVT(tile, $1, 4096)
         FROM (
             WITH
             bounds AS (
-                SELECT ST_TileEnvelope({z}, {x}, {y}) as geom
+                SELECT ST_TileEnvelope($2, $3, $4) as geom
             )
             SELECT
                 ST_AsMVTGeom(
                     ST_Transform("table".geom, 3857)
                     ,bounds.geom
                 ) AS mvtgeom {field_list}
-            FROM user_data.{table_id} as "table", bounds
+            FROM user_data.{quote_identifier(table_id)} as "table", bounds
             WHERE ST_Intersects(
                 ST_Transform("table".geom, 4326),
                 ST_Transform(bounds.geom, 4326)
             )
 
-        """
+        """, f"user_data.{table_id}", z, x, y)
+
+        filter_columns = []
+
+        like_columns = []
+
         if cql_filter:
-            ast = parse(cql_filter)
-            where_statement = to_sql_where(ast, field_mapping)
-            sql_vector_query += f" AND {where_statement}"
+            filter_columns = get_cql_filter_columns(cql_filter, field_mapping)
+            like_columns = get_cql_like_columns(cql_filter, field_mapping)
+            sql_vector_query.add(" AND ").add(get_cql_where_clause(cql_filter, field_mapping))
 
-        sql_vector_query += f"LIMIT {config.MAX_FEATURES_PER_TILE}) as tile"
+        sql_vector_query.add(" LIMIT $1) as tile", config.MAX_FEATURES_PER_TILE)
 
-        tile = await con.fetchval(sql_vector_query)
+        start = time.perf_counter()
+
+        tile = await sql_vector_query.fetchval(con)
+
+        query_time_in_ms = (time.perf_counter() - start) * 1000
+
+        column_usage.record_column_usage(table_id, filter_columns, "filter", query_time_in_ms)
+
+        column_usage.record_column_usage(table_id, like_columns, "like", query_time_in_ms)
 
         if fields is None and cql_filter is None and config.CACHE_AGE_IN_SECONDS > 0:
 
@@ -517,39 +608,209 @@ async def get_tile(
 
         return tile, False
 
-async def get_table_geometry_type(
+def get_geometry_type_name(
+    geometry_type: str
+) -> str:
+    """
+    Method used to convert a PostGIS geometry type into point, line or polygon.
+
+    """
+
+    if geometry_type is None:
+        return "unknown"
+
+    geom_type = 'point'
+
+    if 'Polygon' in geometry_type:
+        geom_type = 'polygon'
+    elif 'Line' in geometry_type:
+        geom_type = 'line'
+
+    return geom_type
+
+async def update_table_metadata(
     table_id: str,
-    app: FastAPI
-) -> list:
+    app: FastAPI,
+    estimated: bool=False
+) -> dict:
     """
-    Method used to retrieve the geometry type for a given table.
+    Method used to compute the geometry type, bounds and center of a table
+    and store them on the table model.
+    With estimated, the bounds come from the planner statistics of the table when they exist.
 
     """
 
     pool = app.state.database
 
+    metadata = {
+        "geometry_type": "unknown",
+        "bounding_box": [],
+        "center": []
+    }
+
     async with pool.acquire() as con:
         geometry_query = f"""
         SELECT ST_GeometryType(geom) as geom_type
-        FROM user_data.{table_id}
+        FROM user_data.{quote_identifier(table_id)}
+        WHERE geom IS NOT NULL
+        LIMIT 1
         """
+
+        extent_query = f"""
+        SELECT ST_XMin(extent) AS xmin, ST_YMin(extent) AS ymin,
+        ST_XMax(extent) AS xmax, ST_YMax(extent) AS ymax
+        FROM (
+            SELECT ST_Extent(geom) AS extent
+            FROM user_data.{quote_identifier(table_id)}
+        ) AS table_extent
+        """
+
+        estimated_extent_query = """
+        SELECT ST_XMin(extent) AS xmin, ST_YMin(extent) AS ymin,
+        ST_XMax(extent) AS xmax, ST_YMax(extent) AS ymax
+        FROM (
+            SELECT ST_EstimatedExtent('user_data', $1, 'geom') AS extent
+        ) AS table_extent
+        """
+
         try:
-            geometry_type = await con.fetchval(geometry_query)
+            metadata['geometry_type'] = get_geometry_type_name(
+                await con.fetchval(geometry_query)
+            )
+
+            extent = None
+
+            if estimated:
+                try:
+                    extent = await con.fetchrow(estimated_extent_query, table_id)
+                except asyncpg.exceptions.PostgresError:
+                    extent = None
+
+            if extent is None or extent['xmin'] is None:
+                extent = await con.fetchrow(extent_query)
         except asyncpg.exceptions.UndefinedTableError:
-            return "unknown"
-        
-        if geometry_type is None:
-            return "unknown"
+            return metadata
+
+    if extent['xmin'] is not None:
+        metadata['bounding_box'] = [extent['xmin'], extent['ymin'], extent['xmax'], extent['ymax']]
+        metadata['center'] = [(extent['xmin'] + extent['xmax']) / 2, (extent['ymin'] + extent['ymax']) / 2]
+
+    await db_models.Table.filter(table_id=table_id).update(**metadata)
 
+    return metadata
 
-        geom_type = 'point'
+async def expand_table_metadata(
+    table_id: str,
+    gid: int,
+    con
+) -> None:
+    """
+    Method used to grow the stored bounds of a table to include the geometry of a feature.
 
-        if 'Polygon' in geometry_type:
-            geom_type = 'polygon'
-        elif 'Line' in geometry_type:
-            geom_type = 'line'
+    """
 
-        return geom_type
+    feature_query = f"""
+    SELECT ST_GeometryType(geom) AS geom_type,
+    ST_XMin(geom) AS xmin, ST_YMin(geom) AS ymin,
+    ST_XMax(geom) AS xmax, ST_YMax(geom) AS ymax
+    FROM user_data.{quote_identifier(table_id)}
+    WHERE gid = $1
+    """
+
+    feature = await con.fetchrow(feature_query, gid)
+
+    if feature is None or feature['xmin'] is None:
+        return
+
+    table = await db_models.Table.get(table_id=table_id)
+
+    bounding_box = [feature['xmin'], feature['ymin'], feature['xmax'], feature['ymax']]
+
+    if table.bounding_box:
+        bounding_box = [
+            min(table.bounding_box[0], bounding_box[0]),
+            min(table.bounding_box[1], bounding_box[1]),
+            max(table.bounding_box[2], bounding_box[2]),
+            max(table.bounding_box[3], bounding_box[3])
+        ]
+
+    geometry_type = table.geometry_type
+
+    if geometry_type in [None, "unknown"]:
+        geometry_type = get_geometry_type_name(feature['geom_type'])
+
+    await db_models.Table.filter(table_id=table_id).update(
+        geometry_type=geometry_type,
+        bounding_box=bounding_box,
+        center=[(bounding_box[0] + bounding_box[2]) / 2, (bounding_box[1] + bounding_box[3]) / 2]
+    )
+
+async def get_table_metadata(
+    table_id: str,
+    app: FastAPI
+) -> dict:
+    """
+    Method used to retrieve the stored geometry type, bounds and center of a table.
+    Tables without stored metadata are estimated once and stored.
+
+    """
+
+    table = await db_models.Table.get(table_id=table_id)
+
+    if table.geometry_type is None:
+        return await update_table_metadata(
+            table_id=table_id,
+            app=app,
+            estimated=True
+        )
+
+    return {
+        "geometry_type": table.geometry_type,
+        "bounding_box": table.bounding_box,
+        "center": table.center
+    }
+
+async def get_multiple_table_metadata(
+    tables: list,
+    app: FastAPI
+) -> list:
+    """
+    Method used to retrieve the stored metadata of multiple tables.
+    Tables without stored metadata are estimated concurrently, bounded by a semaphore.
+
+    """
+
+    metadata_query_semaphore = app.state.metadata_query_semaphore
+
+    async def get_metadata(table):
+        if table.geometry_type is not None:
+            return {
+                "geometry_type": table.geometry_type,
+                "bounding_box": table.bounding_box,
+                "center": table.center
+            }
+
+        async with metadata_query_semaphore:
+            return await update_table_metadata(
+                table_id=table.table_id,
+                app=app,
+                estimated=True
+            )
+
+    return await asyncio.gather(*[get_metadata(table) for table in tables])
+
+async def get_table_geometry_type(
+    table_id: str,
+    app: FastAPI
+) -> str:
+    """
+    Method used to retrieve the geometry type for a given table.
+
+    """
+
+    metadata = await get_table_metadata(table_id, app)
+
+    return metadata['geometry_type']
 
 async def get_table_center(
     table_id: str,
@@ -560,64 +821,136 @@ async def get_table_center(
 
     """
 
-    pool = app.state.database
+    metadata = await get_table_metadata(table_id, app)
 
-    async with pool.acquire() as con:
-        query = f"""
-        SELECT ST_X(ST_Centroid(ST_Union(geom))) as x,
-        ST_Y(ST_Centroid(ST_Union(geom))) as y
-        FROM user_data.{table_id}
-        """
-        center = await con.fetch(query)
+    return metadata['center']
 
-        return [center[0][0],center[0][1]]
+def compile_cql_filter(
+    cql_filter: str,
+    field_mapping: dict
+) -> tuple:
+    """
+    Method to compile a cql filter into a sql where clause, bind parameters and columns.
+    Compiled filters and invalid filter messages are cached by filter text and table columns.
+
+    """
+
+    cache_key = (cql_filter, tuple(sorted(field_mapping.items())))
+
+    if cache_key in cql_filter_cache:
+        compiled_filter, error_message = cql_filter_cache[cache_key]
+    else:
+        error_message = None
+        compiled_filter = None
+
+        try:
+            compiled_filter = to_parameterized_sql_where(parse(cql_filter), field_mapping)
+        except lark.exceptions.UnexpectedInput:
+            error_message = "Invalid operator used in filter."
+        except KeyError:
+            error_message = "Invalid column in filter parameter."
+
+        cql_filter_cache[cache_key] = (compiled_filter, error_message)
+
+    if error_message is not None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=error_message
+        )
+
+    return compiled_filter
+
+def get_cql_where_clause(
+    cql_filter: str,
+    field_mapping: dict
+) -> QueryBuilder:
+    """
+    Method to compile a cql filter into a sql where clause with bind parameters.
+
+    """
+
+    sql, args, columns, like_columns = compile_cql_filter(cql_filter, field_mapping)
+
+    return QueryBuilder(sql, *args)
+
+def get_cql_filter_columns(
+    cql_filter: str,
+    field_mapping: dict
+) -> list:
+    """
+    Method to return the columns used within a cql filter.
+
+    """
+
+    sql, args, columns, like_columns = compile_cql_filter(cql_filter, field_mapping)
+
+    return list(columns)
+
+def get_cql_like_columns(
+    cql_filter: str,
+    field_mapping: dict
+) -> list:
+    """
+    Method to return the columns matched with like within a cql filter.
+
+    """
+
+    sql, args, columns, like_columns = compile_cql_filter(cql_filter, field_mapping)
+
+    return list(like_columns)
 
 async def generate_where_clause(
     info: object,
+    table_id: str,
     con,
     no_where: bool=False
-) -> str:
+) -> QueryBuilder:
     """
     Method to generate where clause.
 
     """
 
-    query = ""
+    query = QueryBuilder()
 
     if info.filter:
-        sql_field_query = f"""
+        sql_field_query = """
             SELECT column_name
             FROM information_schema.columns
-            WHERE table_name = '{info.table}'
+            WHERE table_name = $1
             AND column_name != 'geom';
         """
 
-        db_fields = await con.fetch(sql_field_query)
+        db_fields = await con.fetch(sql_field_query, table_id)
 
         field_mapping = {}
 
         for field in db_fields:
             field_mapping[field['column_name']] = field['column_name']
 
-        ast = parse(info.filter)
-        filter = to_sql_where(ast, field_mapping)
+        filter = get_cql_where_clause(info.filter, field_mapping)
 
         if no_where is False:
-            query += " WHERE "
+            query.add(" WHERE ")
         else:
-            query += " AND "
-        query += f" {filter}"
+            query.add(" AND ")
+        query.add(" ").add(filter)
 
     if info.coordinates and info.geometry_type and info.spatial_relationship:
         if info.filter:
-            query += " AND "
+            query.add(" AND ")
         else:
             if no_where is False:
-                query += " WHERE "
+                query.add(" WHERE ")
+            else:
+                query.add(" AND ")
         if info.geometry_type == 'POLYGON':
-            query += f"{info.spatial_relationship}(ST_GeomFromText('{info.geometry_type}(({info.coordinates}))',4326) ,{info.table}.geom)"
+            geometry = f"{info.geometry_type}(({info.coordinates}))"
         else:
-            query += f"{info.spatial_relationship}(ST_GeomFromText('{info.geometry_type}({info.coordinates})',4326) ,{info.table}.geom)"
+            geometry = f"{info.geometry_type}({info.coordinates})"
+        query.add(
+            f"{info.spatial_relationship}(ST_GeomFromText($1,4326) ,user_data.{quote_identifier(table_id)}.geom)",
+            geometry
+        )
 
     return query
 
@@ -665,14 +998,14 @@ async def get_table_columns(
     async with pool.acquire() as con:
 
 
-        sql_field_query = f"""
+        sql_field_query = """
         SELECT column_name
         FROM information_schema.columns
-        WHERE table_name = '{table_id}'
+        WHERE table_name = $1
         AND column_name != 'geom';
         """
 
-        db_fields = await con.fetch(sql_field_query)
+        db_fields = await con.fetch(sql_field_query, table_id)
 
         fields = []
 
@@ -685,173 +1018,284 @@ async def get_table_columns(
 
         return fields
 
+async def run_with_connection(
+    pool: asyncpg.Pool,
+    method
+) -> object:
+    """
+    Method used to run a query method on its own connection from the pool.
+
+    """
+
+    async with pool.acquire() as con:
+        return await method(con)
+
+async def gather_queries(
+    *coroutines
+) -> list:
+    """
+    Method used to run queries at the same time and cancel the remaining queries when one fails.
+
+    """
+
+    tasks = [asyncio.ensure_future(coroutine) for coroutine in coroutines]
+
+    try:
+        return await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
 async def get_table_geojson(
     table_id: str,
     app: FastAPI,
-    filter: str=None,
+    filter: QueryBuilder=None,
     bbox :str=None,
     limit: int=200000,
     offset: int=0,
-    properties: str="*",
+    properties: object="*",
     sortby: str="gid",
     sortdesc: int=1,
     srid: int=4326,
-    return_geometry: bool=True
+    return_geometry: bool=True,
+    precision: int=None,
+    simplify: float=None
 ) -> object:
     """
     Method used to retrieve the table geojson.
+    The filter and properties can be sql strings or QueryBuilders with bind parameters.
 
     """
 
     pool = app.state.database
 
-    async with pool.acquire() as con:
-        if return_geometry:
-            query = """
-            SELECT
-            json_build_object(
-                'type', 'FeatureCollection',
-                'features', json_agg(ST_AsGeoJSON(t.*)::json)
-            )
-            FROM (
-            """
+    if not isinstance(filter, QueryBuilder):
+        filter = QueryBuilder(filter or "")
 
-            if properties != '*' and properties != "":
-                query += f"SELECT {properties},ST_Transform(geom,{srid})"
-            else:
-                query += f"SELECT ST_Transform(geom,{srid}), gid"
-        
-        else:
-            if properties != '*' and properties != "":
-                query = f"SELECT {properties}, gid"
-            else:
-                query = f"SELECT gid"
-        
-        query += f" FROM user_data.{table_id} "
+    if not isinstance(properties, QueryBuilder):
+        properties = QueryBuilder(properties)
 
-        count_query = f"""SELECT COUNT(*) FROM user_data.{table_id} """
+    query = QueryBuilder()
 
-        if filter != "" :
-            query += f"WHERE {filter}"
-            count_query += f"WHERE {filter}"
+    if return_geometry:
+        geojson_function = "ST_AsGeoJSON(t.*)"
 
-        if bbox is not None:
-            if filter != "":
-                query += " AND "
-                count_query += " AND "
-            else:
-                query += " WHERE "
-                count_query += " WHERE "
-            coords = bbox.split(',')
-            query += f" ST_INTERSECTS(geom,ST_MakeEnvelope({coords[0]}, {coords[1]}, {coords[2]}, {coords[3]}, 4326)) "
-            count_query += f" ST_INTERSECTS(geom,ST_MakeEnvelope({coords[0]}, {coords[1]}, {coords[2]}, {coords[3]}, 4326)) "
+        if precision is not None:
+            geojson_function = f"ST_AsGeoJSON(t.*, '', {query.add_param(precision)}::integer)"
+
+        query.add(f"""
+        SELECT
+        json_build_object(
+            'type', 'FeatureCollection',
+            'features', json_agg({geojson_function}::json)
+        )
+        FROM (
+        """)
 
-        if sortby != "gid":
-            sort = "asc"
-            if sortdesc != 1:
-                sort = "desc"
-            query += f" ORDER BY {sortby} {sort}"
+        geometry = "geom"
 
-        query += f" OFFSET {offset} LIMIT {limit}"
+        if simplify is not None:
+            geometry = f"ST_SimplifyPreserveTopology(geom,{query.add_param(float(simplify))}::double precision)"
 
-        if return_geometry:
+        if properties.sql != '*' and properties.sql != "":
+            query.add("SELECT ").add(properties)
+            query.add(f",ST_Transform({geometry},{query.add_param(srid)}::integer)")
+        else:
+            query.add(f"SELECT ST_Transform({geometry},{query.add_param(srid)}::integer), gid")
 
-            query += ") AS t;"
+    else:
+        if properties.sql != '*' and properties.sql != "":
+            query.add("SELECT ").add(properties).add(", gid")
+        else:
+            query.add("SELECT gid")
 
+    query.add(f" FROM user_data.{quote_identifier(table_id)} ")
+
+    count_query = QueryBuilder(f"""SELECT COUNT(*) FROM user_data.{quote_identifier(table_id)} """)
+
+    if filter.sql != "":
+        query.add("WHERE ").add(filter)
+        count_query.add("WHERE ").add(filter)
+
+    if bbox is not None:
+        if filter.sql != "":
+            query.add(" AND ")
+            count_query.add(" AND ")
+        else:
+            query.add(" WHERE ")
+            count_query.add(" WHERE ")
         try:
-            if return_geometry:
-                geojson = await con.fetchrow(query)
-            else:
-                featuresJson = await con.fetch(query)
-        except asyncpg.exceptions.InvalidTextRepresentationError as error:
+            coords = [float(coord) for coord in bbox.split(',')]
+        except ValueError as exc:
             raise HTTPException(
                 status_code=400,
-                detail=str(error)
-            )
-        except asyncpg.exceptions.UndefinedFunctionError as error:
+                detail="bbox must be a comma separated list of four numbers."
+            ) from exc
+        if len(coords) != 4:
             raise HTTPException(
                 status_code=400,
-                detail=str(error)
+                detail="bbox must be a comma separated list of four numbers."
             )
-        count = await con.fetchrow(count_query)
+        bbox_filter = " ST_INTERSECTS(geom,ST_MakeEnvelope($1, $2, $3, $4, 4326)) "
+        query.add(bbox_filter, *coords)
+        count_query.add(bbox_filter, *coords)
+
+    if sortby != "gid":
+        sort = "asc"
+        if sortdesc != 1:
+            sort = "desc"
+        query.add(f" ORDER BY {quote_identifier(sortby)} {sort}")
+
+    query.add(" OFFSET $1 LIMIT $2", offset, limit)
+
+    if return_geometry:
 
+        query.add(") AS t;")
+
+    async def fetch_features(con):
         if return_geometry:
+            return await query.fetchrow(con)
+        return await query.fetch(con)
+
+    async def fetch_count(con):
+        return await count_query.fetchrow(con)
+
+    count_query_semaphore = app.state.count_query_semaphore
 
-            formatted_geojson = json.loads(geojson['json_build_object'])
-
-            if formatted_geojson['features'] is not None:
-                for feature in formatted_geojson['features']:
-                    if 'st_transform' in feature['properties']:
-                        del feature['properties']['st_transform']
-                    if 'geom' in feature['properties']:
-                        del feature['properties']['geom']
-                    feature['id'] = feature['properties']['gid']
-                    if properties == "":
-                        feature['properties'].pop("gid")
+    try:
+        if count_query_semaphore.locked():
+            async with pool.acquire() as con:
+                features = await fetch_features(con)
+                count = await fetch_count(con)
         else:
+            async with count_query_semaphore:
+                features, count = await gather_queries(
+                    run_with_connection(pool, fetch_features),
+                    run_with_connection(pool, fetch_count)
+                )
+    except (
+        asyncpg.exceptions.InvalidTextRepresentationError,
+        asyncpg.exceptions.UndefinedFunctionError
+    ) as error:
+        raise HTTPException(
+            status_code=400,
+            detail=str(error)
+        ) from error
+
+    if return_geometry:
+
+        formatted_geojson = await executor.run_in_thread(
+            "json",
+            format_geojson,
+            features['json_build_object'],
+            properties.sql != ""
+        )
+    else:
 
-            formatted_geojson = {
-                "type": "FeatureCollection",
-                "features": []
+        formatted_geojson = {
+            "type": "FeatureCollection",
+            "features": []
+        }
+
+        for feature in features:
+            geojsonFeature = {
+                "type": "Feature",
+                "geometry": None,
+                "properties": {},
+                "id": feature['gid']
             }
+            featureProperties = dict(feature)
+            for property in featureProperties:
+                if property not in ['geom', 'st_transform']:
+                    geojsonFeature['properties'][property] = featureProperties[property]
+            if properties.sql == "":
+                geojsonFeature['properties'].pop("gid")
+            formatted_geojson['features'].append(geojsonFeature)
+
+    formatted_geojson['numberMatched'] = count['count']
+    formatted_geojson['numberReturned'] = 0
+    if formatted_geojson['features'] is not None:
+        formatted_geojson['numberReturned'] = len(formatted_geojson['features'])
+
+    return formatted_geojson
+
+def format_geojson(
+    geojson: str,
+    keep_gid: bool
+) -> dict:
+    """
+    Method used to parse a feature collection from the database and set the id of each feature.
 
-            for feature in featuresJson:
-                geojsonFeature = {
-                    "type": "Feature",
-                    "geometry": None,
-                    "properties": {},
-                    "id": feature['gid']
-                }
-                featureProperties = dict(feature)
-                for property in featureProperties:
-                    if property not in ['geom', 'st_transform']:
-                        geojsonFeature['properties'][property] = featureProperties[property]
-                if properties == "":
-                    geojsonFeature['properties'].pop("gid")
-                formatted_geojson['features'].append(geojsonFeature)
-
-        formatted_geojson['numberMatched'] = count['count']
-        formatted_geojson['numberReturned'] = 0
-        if formatted_geojson['features'] is not None:
-            formatted_geojson['numberReturned'] = len(formatted_geojson['features'])
-
-        return formatted_geojson
+    """
 
-async def get_table_bounds(
-    table_id: str,
-    app: FastAPI
-) -> list:
+    formatted_geojson = json.loads(geojson)
+
+    if formatted_geojson['features'] is not None:
+        for feature in formatted_geojson['features']:
+            if 'st_transform' in feature['properties']:
+                del feature['properties']['st_transform']
+            if 'geom' in feature['properties']:
+                del feature['properties']['geom']
+            feature['id'] = feature['properties']['gid']
+            if not keep_gid:
+                feature['properties'].pop("gid")
+
+    return formatted_geojson
+
+def get_simplify_tolerance(
+    simplify: float=None,
+    zoom: int=None
+) -> float:
     """
-    Method used to retrieve the bounds for a given table.
+    Method used to get a simplification tolerance in degrees from a tolerance or a zoom level.
 
     """
 
-    pool = app.state.database
+    if simplify is not None and simplify < 0:
+        raise HTTPException(
+            status_code=400,
+            detail="simplify must be greater than or equal to 0."
+        )
 
-    async with pool.acquire() as con:
+    if zoom is not None:
+        if zoom < 0 or zoom > 22:
+            raise HTTPException(
+                status_code=400,
+                detail="zoom must be between 0 and 22."
+            )
+        if simplify is None:
+            simplify = 360 / (256 * 2**zoom)
 
-        query = f"""
-        SELECT ST_Extent(geom)
-        FROM user_data.{table_id}
-        """
+    return simplify
 
-        table_extent = []
+def validate_precision(
+    precision: int=None
+) -> None:
+    """
+    Method used to validate the coordinate precision of a geojson response.
 
-        try:
-            extent = await con.fetchval(query)
-        except asyncpg.exceptions.UndefinedTableError:
-            return []
-        
-        if extent is None:
-            return []
+    """
 
-        extent = extent.replace('BOX(','').replace(')','')
+    if precision is not None and (precision < 0 or precision > 15):
+        raise HTTPException(
+            status_code=400,
+            detail="precision must be between 0 and 15."
+        )
+
+async def get_table_bounds(
+    table_id: str,
+    app: FastAPI
+) -> list:
+    """
+    Method used to retrieve the bounds for a given table.
 
-        for corner in extent.split(','):
-            table_extent.append(float(corner.split(' ')[0]))
-            table_extent.append(float(corner.split(' ')[1]))
+    """
 
-        return table_extent
+    metadata = await get_table_metadata(table_id, app)
+
+    return metadata['bounding_box']
 
 def delete_user_tile_cache(
     table_id: str
@@ -864,6 +1308,79 @@ def delete_user_tile_cache(
     if os.path.exists(f'{os.getcwd()}/cache/user_data_{table_id}'):
         shutil.rmtree(f'{os.getcwd()}/cache/user_data_{table_id}')
 
+def get_tile_range(
+    bounding_box: list,
+    z: int
+) -> list:
+    """
+    Method used to return the first and last column and row of the web mercator tiles
+    at a zoom level that cover a bounding box in longitude and latitude.
+
+    """
+
+    tile_count = 2 ** z
+
+    tile_range = []
+
+    for longitude in [bounding_box[0], bounding_box[2]]:
+        column = int((longitude + 180) / 360 * tile_count)
+        tile_range.append(min(max(column, 0), tile_count - 1))
+
+    for latitude in [bounding_box[3], bounding_box[1]]:
+        latitude = math.radians(min(max(latitude, -85.0511), 85.0511))
+        row = int((1 - math.asinh(math.tan(latitude)) / math.pi) / 2 * tile_count)
+        tile_range.append(min(max(row, 0), tile_count - 1))
+
+    return tile_range
+
+def delete_user_tile_cache_in_bounds(
+    table_id: str,
+    bounding_boxes: list
+) -> int:
+    """
+    Method to remove the cached tiles of a user's table that intersect
+    a list of bounding boxes and return how many were removed.
+
+    """
+
+    table_cache = f'{os.getcwd()}/cache/user_data_{table_id}'
+
+    if not os.path.exists(table_cache):
+        return 0
+
+    removed_tiles = 0
+
+    for tile_matrix_set_id in os.listdir(table_cache):
+        for z in os.listdir(f'{table_cache}/{tile_matrix_set_id}'):
+            if not z.isdigit():
+                continue
+
+            tile_ranges = [get_tile_range(bounding_box, int(z)) for bounding_box in bounding_boxes]
+
+            for x in os.listdir(f'{table_cache}/{tile_matrix_set_id}/{z}'):
+                if not x.isdigit():
+                    continue
+
+                column_ranges = [
+                    tile_range for tile_range in tile_ranges if tile_range[0] <= int(x) <= tile_range[1]
+                ]
+
+                if not column_ranges:
+                    continue
+
+                for y in os.listdir(f'{table_cache}/{tile_matrix_set_id}/{z}/{x}'):
+                    if not y.isdigit():
+                        continue
+
+                    if any(tile_range[2] <= int(y) <= tile_range[3] for tile_range in column_ranges):
+                        try:
+                            os.remove(f'{table_cache}/{tile_matrix_set_id}/{z}/{x}/{y}')
+                            removed_tiles += 1
+                        except FileNotFoundError:
+                            continue
+
+    return removed_tiles
+
 def check_if_username_in_access_list(
     username: str,
     access_list: list,
@@ -0,0 +1,77 @@
+"""QwikGeo API - View Counter"""
+
+import asyncio
+import logging
+from fastapi import FastAPI
+
+from qwikgeo_api import config
+
+logger = logging.getLogger(__name__)
+
+pending_views = {}
+
+def record_view(
+    portal_id: object
+) -> None:
+    """
+    Method to record a view of an item.
+    Views are kept in memory until they are flushed to the database.
+
+    """
+
+    portal_id = str(portal_id)
+
+    pending_views[portal_id] = pending_views.get(portal_id, 0) + 1
+
+async def flush_views(
+    app: FastAPI
+) -> None:
+    """
+    Method to write the pending views of every item to the database in one update.
+    Views that fail to be written are kept for the next flush.
+
+    """
+
+    if not pending_views:
+        return
+
+    views = dict(pending_views)
+
+    pending_views.clear()
+
+    update_query = """
+    UPDATE item
+    SET views = item.views + pending_views.count
+    FROM (
+        SELECT UNNEST($1::uuid[]) AS portal_id, UNNEST($2::integer[]) AS count
+    ) AS pending_views
+    WHERE item.portal_id = pending_views.portal_id;
+    """
+
+    pool = app.state.database
+
+    try:
+        async with pool.acquire() as con:
+            await con.execute(update_query, list(views.keys()), list(views.values()))
+    except Exception:
+        for portal_id, count in views.items():
+            pending_views[portal_id] = pending_views.get(portal_id, 0) + count
+
+        logger.exception("Failed to flush the views of %s items.", len(views))
+
+async def flush_views_periodically(
+    app: FastAPI
+) -> None:
+    """
+    Method to flush item views on an interval.
+    Errors are logged and the next flush is still scheduled.
+
+    """
+
+    while True:
+        await asyncio.sleep(config.VIEW_COUNT_FLUSH_INTERVAL_IN_SECONDS)
+
+        try:
+            await flush_views(app)
+        except Exception:
+            logger.exception("Failed to flush item views.")
@@ -0,0 +1,155 @@
+"""QwikGeo API - Benchmark of the group membership lookup
+
+Seeds a number of groups, times the previous get_user_groups query, which
+loaded every group with a prefetch of its group users, against the current
+single join on groupuser and removes the seeded groups afterwards.
+
+Usage:
+    python scripts/benchmark_user_groups.py --groups 10000 --memberships 25 --runs 20
+
+The database settings are read from the same environment variables as the API.
+
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+from tortoise import Tortoise
+from tortoise.query_utils import Prefetch
+
+from qwikgeo_api import db_models
+from qwikgeo_api import utilities
+from qwikgeo_api.main import DB_CONFIG
+
+GROUP_NAME_PREFIX = "benchmark_group_"
+BENCHMARK_USERNAME = "benchmark_user"
+
+async def seed_groups(
+    groups: int,
+    memberships: int
+) -> None:
+    """
+    Method used to create the benchmark groups and add the benchmark user to some of them.
+
+    """
+
+    new_groups = [
+        db_models.Group(group_id=uuid.uuid4(), name=f"{GROUP_NAME_PREFIX}{index}")
+        for index in range(groups)
+    ]
+
+    await db_models.Group.bulk_create(new_groups, batch_size=1000)
+
+    step = max(groups // max(memberships, 1), 1)
+
+    group_users = []
+
+    for index, group in enumerate(new_groups):
+        username = f"{BENCHMARK_USERNAME}_{index}"
+        if index % step == 0 and index // step < memberships:
+            username = BENCHMARK_USERNAME
+        group_users.append(db_models.GroupUser(group_id_id=group.group_id, username=username))
+
+    await db_models.GroupUser.bulk_create(group_users, batch_size=1000)
+
+async def remove_groups() -> None:
+    """
+    Method used to delete the benchmark groups and their group users.
+
+    """
+
+    await db_models.Group.filter(name__startswith=GROUP_NAME_PREFIX).delete()
+
+async def get_user_groups_with_prefetch(
+    username: str
+) -> list:
+    """
+    Method used to run the previous get_user_groups query, which returned the
+    name of every group.
+
+    """
+
+    groups_plus_username = [username]
+
+    groups = (
+        await db_models.Group.all()
+        .prefetch_related(Prefetch(
+            "group_users", queryset=db_models.GroupUser.filter(username=username)
+        ))
+    )
+
+    for group in groups:
+        groups_plus_username.append(group.name)
+
+    return groups_plus_username
+
+async def get_user_groups_with_join(
+    username: str
+) -> list:
+    """
+    Method used to run the current get_user_groups query without the cache.
+
+    """
+
+    utilities.clear_access_cache()
+
+    return await utilities.get_user_groups(username)
+
+async def time_query(
+    query: object,
+    runs: int
+) -> tuple:
+    """
+    Method used to return the average and the best time of a query in milliseconds.
+
+    """
+
+    timings = []
+
+    for _ in range(runs):
+        start = time.perf_counter()
+        await query(BENCHMARK_USERNAME)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    return sum(timings) / len(timings), min(timings)
+
+async def main(
+    groups: int,
+    memberships: int,
+    runs: int
+) -> None:
+    """
+    Method used to seed the groups, time both queries and clean up.
+
+    """
+
+    await Tortoise.init(config=DB_CONFIG)
+
+    try:
+        await remove_groups()
+
+        await seed_groups(groups, memberships)
+
+        for name, query in (
+            ("prefetch (old)", get_user_groups_with_prefetch),
+            ("join (new)", get_user_groups_with_join)
+        ):
+            returned_groups = len(await query(BENCHMARK_USERNAME)) - 1
+
+            average, best = await time_query(query, runs)
+
+            print(f"{name}: {returned_groups} groups returned, average {average:.2f} ms, best {best:.2f} ms")
+    finally:
+        await remove_groups()
+
+        await Tortoise.close_connections()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the group membership lookup.")
+    parser.add_argument("--groups", type=int, default=10000, help="Number of groups to seed.")
+    parser.add_argument("--memberships", type=int, default=25, help="Number of groups the benchmark user belongs to.")
+    parser.add_argument("--runs", type=int, default=20, help="Number of times each query is run.")
+    args = parser.parse_args()
+
+    asyncio.run(main(args.groups, args.memberships, args.runs))